@@ -0,0 +1,167 @@
+"""Compare encode/decode cost and wire size of the message codecs.
+
+Each row times serialization together with the per-message logging of its
+publish and consume path, with logging at INFO as in the services. The
+baseline is the path before codecs, which logged every body at INFO.
+
+Run from the service directory:
+
+    python -m benchmarks.message_codecs [iterations]
+"""
+
+import logging
+import os
+import sys
+import timeit
+from datetime import date, time
+
+from pydantic import BaseModel
+
+from src.models.db.appointment import AppointmentStatus, TimePreference
+from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.appointment_message import AppointmentMessage
+from src.models.msg.codecs import CODECS, MessageCodec, ModelType
+
+DEFAULT_ITERATIONS = 100_000
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+logger = logging.getLogger(__name__)
+
+
+class BaselineCodec(MessageCodec):
+    """The path before codecs: pydantic JSON, with every body logged at INFO."""
+
+    content_type = "baseline (INFO log)"
+
+    def encode(self, message: BaseModel) -> bytes:
+        """Serialize a message and log its body, as publishing did.
+
+        Args:
+            message (BaseModel): The message to serialize.
+
+        Returns:
+            bytes: The UTF-8 JSON document.
+
+        """
+        body = message.model_dump_json().encode()
+        logger.info("Published message: %s", body)
+        return body
+
+    def decode(self, model: type[ModelType], body: bytes) -> ModelType:
+        """Log a body and validate it, as consuming did.
+
+        Args:
+            model (type[ModelType]): The message class.
+            body (bytes): The JSON document.
+
+        Returns:
+            ModelType: The validated message.
+
+        """
+        logger.info("Received message: %s", body)
+        return model.model_validate_json(body)
+
+
+class LoggedCodec(MessageCodec):
+    """A codec with the size-only DEBUG logging of today's publish path."""
+
+    def __init__(self, codec: MessageCodec) -> None:
+        """Wrap a codec.
+
+        Args:
+            codec (MessageCodec): The codec to time.
+
+        """
+        self._codec = codec
+        self.content_type = codec.content_type
+
+    def encode(self, message: BaseModel) -> bytes:
+        """Serialize a message and log its size.
+
+        Args:
+            message (BaseModel): The message to serialize.
+
+        Returns:
+            bytes: The encoded message.
+
+        """
+        body = self._codec.encode(message)
+        logger.debug("Published %d-byte message", len(body))
+        return body
+
+    def decode(self, model: type[ModelType], body: bytes) -> ModelType:
+        """Log a body's size and deserialize it.
+
+        Args:
+            model (type[ModelType]): The message class.
+            body (bytes): The encoded message.
+
+        Returns:
+            ModelType: The validated message.
+
+        """
+        logger.debug("Received %d-byte message", len(body))
+        return self._codec.decode(model, body)
+
+
+def measure(
+    codec: MessageCodec, message: AbstractMessage, iterations: int
+) -> tuple[float, float, int]:
+    """Time one codec on one message.
+
+    Args:
+        codec (MessageCodec): The codec to measure.
+        message (AbstractMessage): The message to encode and decode.
+        iterations (int): Number of encodes and decodes timed.
+
+    Returns:
+        tuple[float, float, int]: Encode and decode microseconds per message,
+            and the encoded size in bytes.
+
+    """
+    body = codec.encode(message)
+    model = type(message)
+    if codec.decode(model, body) != message:
+        raise AssertionError(f"{codec.content_type} did not round-trip.")
+    encode = timeit.timeit(lambda: codec.encode(message), number=iterations)
+    decode = timeit.timeit(lambda: codec.decode(model, body), number=iterations)
+    return encode / iterations * 1e6, decode / iterations * 1e6, len(body)
+
+
+def _log_at_info() -> None:
+    """Log at the services' INFO level into a discarded stream."""
+    handler = logging.StreamHandler(open(os.devnull, "w"))  # noqa: SIM115
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def main(iterations: int = DEFAULT_ITERATIONS) -> None:
+    """Print encode/decode time and encoded size per codec, after the baseline.
+
+    Args:
+        iterations (int): Number of encodes and decodes timed per codec.
+
+    """
+    message = AppointmentMessage(
+        appointment_id=12345,
+        patient_id=678,
+        doctor_id=42,
+        appointment_date=date(2026, 10, 16),
+        time_preference=TimePreference.AM,
+        assigned_time=time(9, 0),
+        status=AppointmentStatus.SCHEDULED,
+    )
+    print(f"AppointmentMessage, {iterations} iterations")
+    print(f"{'content type':<22}{'encode µs':>11}{'decode µs':>11}{'bytes':>7}")
+    _log_at_info()
+    codecs = [BaselineCodec(), *(LoggedCodec(codec) for codec in CODECS.values())]
+    for codec in codecs:
+        content_type = codec.content_type
+        encode, decode, size = measure(codec, message, iterations)
+        print(f"{content_type:<22}{encode:>11.2f}{decode:>11.2f}{size:>7}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITERATIONS)
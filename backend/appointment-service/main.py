@@ -2,6 +2,7 @@
 
 import logging
 import os
+import uuid
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator
 
@@ -9,13 +10,16 @@ from dotenv import load_dotenv
 from fastapi import FastAPI
 
 import src.logger_config  # noqa: F401, I001
+from src.api.dependencies import engine, outbox_relay, read_engine
 from src.api.routes.appointment_routes import router as appointment_router
 from src.messaging.messaging_manager import messaging_manager
 from src.messaging.pubsub_exchanges import (
     APPOINTMENT_CREATED,
+    APPOINTMENT_QUEUE_REORDERED,
     APPOINTMENT_STATUS_CHANGED,
 )
 from src.messaging.pubsub_facade import PubSubFacade
+from src.services.event_subscriptions import subscribe_event_handlers
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +29,14 @@ if not AMQP_URL:
     logger.error("AMQP_URL not set in environment variables")
     raise ValueError("AMQP_URL not set in environment variables")
 
+# Each replica keeps its own caches, so it needs its own copy of the events.
+REPLICA_ID = uuid.uuid4().hex[:8]
+
 messaging_manager.add_pubsubs(
     [
         PubSubFacade(AMQP_URL, APPOINTMENT_CREATED),
         PubSubFacade(AMQP_URL, APPOINTMENT_STATUS_CHANGED),
+        PubSubFacade(AMQP_URL, APPOINTMENT_QUEUE_REORDERED),
     ]
 )
 
@@ -47,7 +55,10 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
     logger.info("Starting up messaging manager...")
     await messaging_manager.start_all()
     logger.info("Messaging manager started.")
+    subscribe_event_handlers(messaging_manager, REPLICA_ID)
+    outbox_relay.start()
     yield
+    await outbox_relay.stop()
     logger.info("Shutting down messaging manager...")
     await messaging_manager.stop_all()
     logger.info("Messaging manager stopped.")
@@ -67,3 +78,13 @@ def root() -> dict[str, str]:
 def health() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics() -> dict[str, dict]:
+    """Database connection pool and event publisher metrics endpoint."""
+    stats: dict[str, dict] = {"db_pool": engine.pool.stats()}
+    if read_engine is not None:
+        stats["db_read_pool"] = read_engine.pool.stats()
+    stats["publishers"] = messaging_manager.publish_stats()
+    return stats
@@ -11,7 +11,7 @@ from sqlmodel import SQLModel
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.models.db import appointment  # noqa: F401
+from src.models.db import appointment, outbox_event  # noqa: F401
 
 load_dotenv()
 
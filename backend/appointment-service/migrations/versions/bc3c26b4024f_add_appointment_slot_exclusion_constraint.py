@@ -0,0 +1,40 @@
+"""add appointment slot exclusion constraint
+
+Revision ID: bc3c26b4024f
+Revises: df409e9d2aa9
+Create Date: 2026-10-16 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bc3c26b4024f'
+down_revision: Union[str, Sequence[str], None] = 'df409e9d2aa9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails if the table already holds double-booked active slots; resolve
+    # those by hand before upgrading.
+    op.create_exclude_constraint(
+        'ex_appointment_doctor_slot',
+        'appointment',
+        ('doctor_id', '='),
+        ('appointment_date', '='),
+        ('assigned_time', '='),
+        using='btree',
+        where=sa.text("status <> 'CANCELLED'"),
+        deferrable=True,
+        initially='IMMEDIATE',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_appointment_doctor_slot', 'appointment')
@@ -0,0 +1,61 @@
+"""Connection pool instrumentation for the /metrics endpoint."""
+
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that counts checkouts and time spent waiting.
+
+    A checkout counts as a wait when every pooled connection is in use and
+    the overflow is exhausted, i.e. when the request has to queue for a
+    connection to be returned.
+    """
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        saturated = (
+            self.checkedin() == 0
+            and self._max_overflow > -1
+            and self.overflow() >= self._max_overflow
+        )
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            if saturated:
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - started
+        self.checkouts += 1
+        return connection
+
+    def stats(self) -> dict[str, int | float]:
+        """Return the current pool gauges and lifetime counters.
+
+        Returns:
+            dict[str, int | float]: Pool size, connections in and out, overflow
+                in use, and checkout, wait and timeout counts.
+
+        """
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 6),
+            "timeouts": self.timeouts,
+        }
@@ -3,16 +3,24 @@
 from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
 from src.api.dependencies import get_appointment_service
+from src.models.dto.appointment_bulk_create_request import (
+    AppointmentBulkCreateRequest,
+)
+from src.models.dto.appointment_bulk_result import AppointmentBulkResult
 from src.models.dto.appointment_create_request import AppointmentCreateRequest
+from src.models.dto.appointment_page import AppointmentPage
 from src.models.dto.appointment_response import AppointmentResponse
 from src.models.dto.appointment_status_update_request import (
     AppointmentStatusUpdateRequest,
 )
+from src.models.dto.patient_history_query import PatientHistoryQuery
 from src.models.dto.queue_reorder_request import QueueReorderRequest
 from src.services.appointment_service import AppointmentService
+from src.services.queue_broadcaster import QueueBroadcaster, queue_broadcaster
 
 MESSAGE = "message"
 NOT_FOUND_MESSAGE = "Appointment not found"
@@ -38,12 +46,30 @@ async def create_appointment(
 
     """
     try:
-        return service.create_appointment(request)
+        return await service.create_appointment(request)
     except ValueError as e:
         response.status_code = status.HTTP_409_CONFLICT
         return {MESSAGE: str(e)}
 
 
+@router.post("/bulk", status_code=status.HTTP_200_OK)
+async def create_appointments(
+    request: AppointmentBulkCreateRequest,
+    service: Annotated[AppointmentService, Depends(get_appointment_service)],
+) -> list[AppointmentBulkResult]:
+    """Book a batch of appointments in one transaction.
+
+    Args:
+        request (AppointmentBulkCreateRequest): The rows to book.
+        service (AppointmentService): The appointment service.
+
+    Returns:
+        list[AppointmentBulkResult]: Per-row created/conflict results.
+
+    """
+    return await service.create_appointments(request)
+
+
 @router.get("/{appointment_id}", status_code=status.HTTP_200_OK)
 async def get_appointment(
     appointment_id: int,
@@ -61,49 +87,140 @@ async def get_appointment(
         AppointmentResponse: The appointment details.
 
     """
-    appointment = service.get_appointment(appointment_id)
+    appointment = await service.get_appointment(appointment_id)
     if appointment is None:
         response.status_code = status.HTTP_404_NOT_FOUND
         return {MESSAGE: NOT_FOUND_MESSAGE}
     return appointment
 
 
-@router.get("/queue/day", status_code=status.HTTP_200_OK)
+@router.get(
+    "/queue/day",
+    status_code=status.HTTP_200_OK,
+    response_model=list[AppointmentResponse],
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Queue unchanged"}},
+)
 async def get_queue(
     doctor_id: int,
     appointment_date: date,
     service: Annotated[AppointmentService, Depends(get_appointment_service)],
-) -> list[AppointmentResponse]:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """Get the ordered queue for a doctor on a specific date.
 
+    The response carries an ETag; a request whose If-None-Match holds the
+    current tag gets 304 Not Modified with no body.
+
+    Args:
+        doctor_id (int): The doctor's ID.
+        appointment_date (date): The date of the session.
+        service (AppointmentService): The appointment service.
+        if_none_match (str | None): ETags the client already has.
+
+    Returns:
+        Response: Appointments ordered by assigned time, or 304.
+
+    """
+    snapshot = await service.get_queue_snapshot(doctor_id, appointment_date)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match is not None and (
+        if_none_match.strip() == "*"
+        or snapshot.etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=snapshot.body, media_type="application/json", headers=headers
+    )
+
+
+@router.get("/queue/day/events", status_code=status.HTTP_200_OK)
+async def stream_queue_events(
+    doctor_id: int,
+    appointment_date: date,
+    request: Request,
+    service: Annotated[AppointmentService, Depends(get_appointment_service)],
+    broadcaster: Annotated[QueueBroadcaster, Depends(lambda: queue_broadcaster)],
+) -> StreamingResponse:
+    """Stream live changes to the queue of a doctor on a specific date.
+
+    The stream is Server-Sent Events: a snapshot event with the whole queue,
+    then upsert, remove and reordered events as it changes. A resync event
+    means changes were dropped and the client should reload the queue.
+
     Args:
         doctor_id (int): The doctor's ID.
         appointment_date (date): The date of the session.
+        request (Request): The incoming request, polled for disconnects.
         service (AppointmentService): The appointment service.
+        broadcaster (QueueBroadcaster): The shared queue broadcaster.
 
     Returns:
-        list[AppointmentResponse]: Appointments ordered by assigned time.
+        StreamingResponse: A text/event-stream response.
 
     """
-    return service.get_queue(doctor_id, appointment_date)
+
+    async def load_snapshot() -> bytes:
+        snapshot = await service.get_queue_snapshot(doctor_id, appointment_date)
+        # The stream may stay open for hours; do not hold a pooled connection.
+        await service.release_connections()
+        return snapshot.body
+
+    return StreamingResponse(
+        broadcaster.stream(
+            doctor_id, appointment_date, load_snapshot, request.is_disconnected
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/patient/{patient_id}", status_code=status.HTTP_200_OK)
 async def get_patient_appointments(
     patient_id: int,
+    query: Annotated[PatientHistoryQuery, Query()],
     service: Annotated[AppointmentService, Depends(get_appointment_service)],
-) -> list[AppointmentResponse]:
-    """Get all appointments for a patient.
+    response: Response,
+) -> AppointmentPage | dict:
+    """Get a page of a patient's appointments, newest first.
 
     Args:
         patient_id (int): The patient's ID.
+        query (PatientHistoryQuery): Filters, page size and cursor.
         service (AppointmentService): The appointment service.
+        response (Response): The FastAPI response object.
 
     Returns:
-        list[AppointmentResponse]: The patient's appointments.
+        AppointmentPage: The appointments and the cursor of the next page.
 
     """
-    return service.get_patient_appointments(patient_id)
+    try:
+        return await service.get_patient_appointments(patient_id, query)
+    except ValueError as e:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return {MESSAGE: str(e)}
+
+
+@router.get("/patient/{patient_id}/stream", status_code=status.HTTP_200_OK)
+async def stream_patient_appointments(
+    patient_id: int,
+    query: Annotated[PatientHistoryQuery, Query()],
+    service: Annotated[AppointmentService, Depends(get_appointment_service)],
+) -> StreamingResponse:
+    """Stream a patient's whole history as newline-delimited JSON.
+
+    Args:
+        patient_id (int): The patient's ID.
+        query (PatientHistoryQuery): Date range and status filters.
+        service (AppointmentService): The appointment service.
+
+    Returns:
+        StreamingResponse: One AppointmentResponse per line.
+
+    """
+    return StreamingResponse(
+        service.stream_patient_appointments(patient_id, query),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.patch("/{appointment_id}/status", status_code=status.HTTP_200_OK)
@@ -125,7 +242,11 @@ async def update_status(
         AppointmentResponse: The updated appointment.
 
     """
-    result = service.update_status(appointment_id, request)
+    try:
+        result = await service.update_status(appointment_id, request)
+    except ValueError as e:
+        response.status_code = status.HTTP_409_CONFLICT
+        return {MESSAGE: str(e)}
     if result is None:
         response.status_code = status.HTTP_404_NOT_FOUND
         return {MESSAGE: NOT_FOUND_MESSAGE}
@@ -154,7 +275,7 @@ async def reorder_queue(
 
     """
     try:
-        return service.reorder_queue(doctor_id, appointment_date, request)
+        return await service.reorder_queue(doctor_id, appointment_date, request)
     except ValueError as e:
         response.status_code = status.HTTP_400_BAD_REQUEST
         return {MESSAGE: str(e)}
@@ -0,0 +1,276 @@
+"""Concurrent message consumption shared by the messaging facades."""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from aio_pika.abc import AbstractIncomingMessage, AbstractQueue
+
+from src.messaging.retry import RetryPolicy, RetryRouter
+from src.models.msg.abstract_message import AbstractMessage
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_PREFETCH_COUNT = int(os.getenv("CONSUMER_PREFETCH_COUNT", "10"))
+CONSUMER_CONCURRENCY = int(os.getenv("CONSUMER_CONCURRENCY", "1"))
+CONSUMER_BATCH_SIZE = int(os.getenv("CONSUMER_BATCH_SIZE", "100"))
+CONSUMER_BATCH_MAX_WAIT_SECONDS = float(
+    os.getenv("CONSUMER_BATCH_MAX_WAIT_SECONDS", "1")
+)
+
+
+@dataclass(frozen=True)
+class ConsumerOptions:
+    """How a facade consumes its queue.
+
+    Attributes:
+        prefetch_count (int): Unacknowledged messages the broker may deliver
+            ahead of the handlers.
+        concurrency (int): Handlers allowed to run at the same time.
+        ordering_key (Callable[[Any], Hashable] | None): Maps a message to a
+            key; messages with the same key are handled one at a time, in
+            delivery order. None lets all messages run concurrently.
+        retry (RetryPolicy): Attempts and backoff for failed messages.
+
+    """
+
+    prefetch_count: int = CONSUMER_PREFETCH_COUNT
+    concurrency: int = CONSUMER_CONCURRENCY
+    ordering_key: Callable[[Any], Hashable] | None = None
+    retry: RetryPolicy = RetryPolicy()
+
+
+@dataclass(frozen=True)
+class BatchOptions:
+    """How a facade groups its queue into batches.
+
+    Attributes:
+        size (int): Messages per batch; also the channel prefetch, so a full
+            batch can be in flight.
+        max_wait_seconds (float): Longest time a batch waits to fill after
+            its first message arrived.
+        retry (RetryPolicy): Attempts and backoff for failed messages.
+
+    """
+
+    size: int = CONSUMER_BATCH_SIZE
+    max_wait_seconds: float = CONSUMER_BATCH_MAX_WAIT_SECONDS
+    retry: RetryPolicy = RetryPolicy()
+
+
+async def consume(
+    queue: AbstractQueue,
+    message_class: type[AbstractMessage],
+    on_message: Callable[[Any], Awaitable[Any]],
+    options: ConsumerOptions,
+    retries: RetryRouter | None = None,
+) -> None:
+    """Run handlers for the messages of a queue with bounded concurrency.
+
+    Each message is acknowledged once its handler finished. A failing handler
+    hands its message to ``retries`` before the ack; messages that cannot be
+    decoded are dead-lettered. Without a router, failures are only logged.
+    The next message is read while handlers run, up to
+    ``options.concurrency`` at once. When the consumer is cancelled, running
+    handlers are cancelled and their messages are requeued.
+
+    Args:
+        queue (AbstractQueue): The queue to consume from.
+        message_class (type[AbstractMessage]): The class to decode messages into.
+        on_message (Callable[[Any], Awaitable[Any]]): Async callback per message.
+        options (ConsumerOptions): Concurrency and ordering settings.
+        retries (RetryRouter | None): Where failed messages go.
+
+    """
+    slots = asyncio.Semaphore(options.concurrency)
+    running: set[asyncio.Task] = set()
+    last_by_key: dict[Hashable, asyncio.Task] = {}
+
+    def forget(task: asyncio.Task, key: Hashable) -> None:
+        if last_by_key.get(key) is task:
+            del last_by_key[key]
+
+    try:
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                await slots.acquire()
+                logger.debug("Received %d-byte message", len(message.body))
+                try:
+                    event = message_class.from_bytes(message.body, message.content_type)
+                except Exception as e:
+                    slots.release()
+                    logger.exception("Error decoding message: %s", e)
+                    await _dead_letter(message, e, retries)
+                    continue
+                key = options.ordering_key(event) if options.ordering_key else None
+                task = asyncio.create_task(
+                    _handle(message, event, on_message, last_by_key.get(key), retries)
+                )
+                running.add(task)
+                task.add_done_callback(running.discard)
+                task.add_done_callback(lambda _: slots.release())
+                if key is not None:
+                    last_by_key[key] = task
+                    task.add_done_callback(partial(forget, key=key))
+        await asyncio.gather(*running)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def _handle(
+    message: AbstractIncomingMessage,
+    event: AbstractMessage,
+    on_message: Callable[[Any], Awaitable[Any]],
+    previous: asyncio.Task | None,
+    retries: RetryRouter | None,
+) -> None:
+    """Handle one message once the previous message with its key is done.
+
+    If the failed message cannot be handed to ``retries``, it is requeued
+    rather than acknowledged, so it is not lost.
+
+    Args:
+        message (AbstractIncomingMessage): The delivery to acknowledge.
+        event (AbstractMessage): The decoded message.
+        on_message (Callable[[Any], Awaitable[Any]]): Async callback.
+        previous (asyncio.Task | None): The handler of the previous message
+            with the same ordering key.
+        retries (RetryRouter | None): Where a failed message goes.
+
+    """
+    if previous is not None:
+        await asyncio.wait([previous])
+    try:
+        async with message.process(requeue=True):
+            try:
+                await on_message(event)
+            except Exception as e:
+                logger.exception("Error processing message: %s", e)
+                if retries is not None:
+                    await retries.retry(message, e)
+    except Exception as e:
+        logger.exception("Requeued message that could not be retried: %s", e)
+
+
+async def _dead_letter(
+    message: AbstractIncomingMessage, error: Exception, retries: RetryRouter | None
+) -> None:
+    """Acknowledge a message that cannot be decoded, dead-lettering it first.
+
+    Args:
+        message (AbstractIncomingMessage): The delivery.
+        error (Exception): The decoding error.
+        retries (RetryRouter | None): Where the message goes.
+
+    """
+    try:
+        async with message.process(requeue=True):
+            if retries is not None:
+                await retries.dead_letter(message, error)
+    except Exception as e:
+        logger.exception("Requeued message that could not be dead-lettered: %s", e)
+
+
+async def consume_batches(
+    queue: AbstractQueue,
+    message_class: type[AbstractMessage],
+    on_batch: Callable[[list[Any]], Awaitable[Any]],
+    options: BatchOptions,
+    retries: RetryRouter | None = None,
+) -> None:
+    """Hand the messages of a queue to a callback in batches.
+
+    A batch is delivered when it holds ``options.size`` messages or
+    ``options.max_wait_seconds`` after its first message, whichever comes
+    first. The whole batch is then acknowledged with a single multiple-ack
+    of its last delivery. When the callback fails, every message of the
+    batch is handed to ``retries`` first; undecodable messages are
+    dead-lettered. Without a router, failures are only logged.
+
+    Args:
+        queue (AbstractQueue): The queue to consume from; its channel must
+            carry no other consumer, since the ack covers every earlier
+            delivery on the channel.
+        message_class (type[AbstractMessage]): The class to decode messages into.
+        on_batch (Callable[[list[Any]], Awaitable[Any]]): Async callback per batch.
+        options (BatchOptions): Batch size and time limit.
+        retries (RetryRouter | None): Where failed messages go.
+
+    """
+    loop = asyncio.get_running_loop()
+    async with queue.iterator() as queue_iter:
+        ended = False
+        while not ended:
+            try:
+                batch = [await anext(queue_iter)]
+            except StopAsyncIteration:
+                return
+            deadline = loop.time() + options.max_wait_seconds
+            while len(batch) < options.size:
+                try:
+                    batch.append(
+                        await asyncio.wait_for(
+                            anext(queue_iter), max(deadline - loop.time(), 0)
+                        )
+                    )
+                except TimeoutError:
+                    break
+                except StopAsyncIteration:
+                    ended = True
+                    break
+            await _handle_batch(batch, message_class, on_batch, retries)
+
+
+async def _handle_batch(
+    batch: list[AbstractIncomingMessage],
+    message_class: type[AbstractMessage],
+    on_batch: Callable[[list[Any]], Awaitable[Any]],
+    retries: RetryRouter | None,
+) -> None:
+    """Decode, handle and acknowledge one batch of deliveries.
+
+    If failed messages cannot be handed to ``retries``, the whole batch is
+    requeued rather than acknowledged.
+
+    Args:
+        batch (list[AbstractIncomingMessage]): The deliveries, in order.
+        message_class (type[AbstractMessage]): The class to decode messages into.
+        on_batch (Callable[[list[Any]], Awaitable[Any]]): Async callback.
+        retries (RetryRouter | None): Where failed messages go.
+
+    """
+    events = []
+    decoded = []
+    undecodable = []
+    for message in batch:
+        try:
+            events.append(message_class.from_bytes(message.body, message.content_type))
+            decoded.append(message)
+        except Exception as e:
+            logger.exception("Error decoding message: %s", e)
+            undecodable.append((message, e))
+    logger.debug("Received batch of %d messages", len(batch))
+    failed = []
+    try:
+        if events:
+            await on_batch(events)
+    except Exception as e:
+        logger.exception("Error processing batch: %s", e)
+        failed = [(message, e) for message in decoded]
+    if retries is not None:
+        try:
+            for message, error in undecodable:
+                await retries.dead_letter(message, error)
+            for message, error in failed:
+                await retries.retry(message, error)
+        except Exception as e:
+            logger.exception("Requeued batch that could not be retried: %s", e)
+            await batch[-1].nack(multiple=True, requeue=True)
+            return
+    await batch[-1].ack(multiple=True)
@@ -5,9 +5,17 @@ from contextlib import suppress
 from typing import Awaitable, Callable, TypeVar
 
 import aio_pika
-from aio_pika.abc import AbstractRobustQueue
-
+from aio_pika.abc import AbstractQueue, AbstractRobustConnection
+
+from src.messaging.consumer import (
+    BatchOptions,
+    ConsumerOptions,
+    consume,
+    consume_batches,
+)
+from src.messaging.retry import RetryPolicy, RetryRouter
 from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.codecs import MESSAGE_CONTENT_TYPE
 
 MessageType = TypeVar("MessageType", bound=AbstractMessage)
 
@@ -27,7 +35,8 @@ class DirectMessageFacade:
         """
         self._amqp_url = amqp_url
         self._exchange_name = exchange_name
-        self._connection: aio_pika.RobustConnection | None = None
+        self._connection: AbstractRobustConnection | None = None
+        self._owns_connection = False
         self._channel: aio_pika.RobustChannel | None = None
         self._exchange: aio_pika.Exchange | None = None
         try:
@@ -36,14 +45,20 @@ class DirectMessageFacade:
             self._loop: AbstractEventLoop = asyncio.new_event_loop()
         self._consumer_task: asyncio.Task | None = None
 
-    async def connect(self) -> None:
-        """Establish connection to the AMQP broker and declare a direct exchange.
+    async def connect(self, connection: AbstractRobustConnection | None = None) -> None:
+        """Open a channel on the AMQP broker and declare a direct exchange.
+
+        Args:
+            connection (AbstractRobustConnection | None): A connection shared
+                with other facades, which stays open when this facade closes.
+                Without one the facade opens and owns its own connection.
 
         Raises:
             aio_pika.exceptions.AMQPConnectionError: Connection to the broker failed.
 
         """
-        self._connection = await aio_pika.connect_robust(
+        self._owns_connection = connection is None
+        self._connection = connection or await aio_pika.connect_robust(
             self._amqp_url, loop=self._loop
         )
         self._channel = await self._connection.channel()
@@ -56,7 +71,11 @@ class DirectMessageFacade:
         await self._cancel_consumer_task()
         if self._channel and not self._channel.is_closed:
             await self._channel.close()
-        if self._connection and not self._connection.is_closed:
+        if (
+            self._owns_connection
+            and self._connection
+            and not self._connection.is_closed
+        ):
             await self._connection.close()
 
     async def _cancel_consumer_task(self) -> None:
@@ -81,8 +100,8 @@ class DirectMessageFacade:
         if not self._exchange:
             raise RuntimeError("Exchange is not initialized. Call connect() first.")
         msg = aio_pika.Message(
-            body=message.to_bytes(),
-            content_type="application/json",
+            body=message.to_bytes(MESSAGE_CONTENT_TYPE),
+            content_type=MESSAGE_CONTENT_TYPE,
             delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
         )
         await self._exchange.publish(msg, routing_key=routing_key)
@@ -93,6 +112,7 @@ class DirectMessageFacade:
         queue_name: str,
         on_message: Callable[[MessageType], Awaitable],
         message_type: type[MessageType],
+        options: ConsumerOptions | None = None,
     ) -> None:
         """Subscribe to messages from the direct exchange with a specific routing key.
 
@@ -101,6 +121,7 @@ class DirectMessageFacade:
             queue_name (str): The name of the queue to bind to the exchange.
             on_message (Callable[[MessageType], Awaitable]): Async callback to process received messages.
             message_type (Type[MessageType]): The class type of the message for deserialization.
+            options (ConsumerOptions | None): Prefetch, concurrency and ordering; defaults to ConsumerOptions().
 
         Raises:
             RuntimeError: If the messaging infrastructure is not properly initialized.
@@ -114,7 +135,51 @@ class DirectMessageFacade:
             return  # Already consuming
 
         self._consumer_task = self._loop.create_task(
-            self._consume(routing_key, queue_name, on_message, message_type)
+            self._consume(
+                routing_key,
+                queue_name,
+                on_message,
+                message_type,
+                options or ConsumerOptions(),
+            )
+        )
+
+    def subscribe_batch(
+        self,
+        routing_key: str,
+        queue_name: str,
+        on_batch: Callable[[list[MessageType]], Awaitable],
+        message_type: type[MessageType],
+        options: BatchOptions | None = None,
+    ) -> None:
+        """Subscribe to messages with a specific routing key, in batches.
+
+        Args:
+            routing_key (str): The routing key to bind the queue to.
+            queue_name (str): The name of the queue to bind to the exchange.
+            on_batch (Callable[[list[MessageType]], Awaitable]): Async callback receiving each batch of decoded messages.
+            message_type (Type[MessageType]): The class type of the message for deserialization.
+            options (BatchOptions | None): Batch size and time limit; defaults to BatchOptions().
+
+        Raises:
+            RuntimeError: If the messaging infrastructure is not properly initialized.
+
+        """  # noqa: E501
+        if not self._channel or not self._exchange:
+            raise RuntimeError(
+                "Channel or exchange is not initialized. Call connect() first."
+            )
+        if self._consumer_task is not None and not self._consumer_task.done():
+            return  # Already consuming
+
+        self._consumer_task = self._loop.create_task(
+            self._consume_batches(
+                routing_key,
+                queue_name,
+                on_batch,
+                message_type,
+                options or BatchOptions(),
+            )
         )
 
     async def _consume(
@@ -123,6 +188,7 @@ class DirectMessageFacade:
         queue_name: str,
         on_message: Callable[[MessageType], Awaitable],
         message_class: type[AbstractMessage],
+        options: ConsumerOptions,
     ) -> None:
         """Consume messages from the specified queue and process them.
 
@@ -131,36 +197,77 @@ class DirectMessageFacade:
             queue_name (str): The name of the queue to bind to the exchange.
             on_message (Callable[[MessageType], Awaitable]): Async callback to process received messages.
             message_class (Type[AbstractMessage]): The class type of the message for deserialization.
+            options (ConsumerOptions): Prefetch, concurrency and ordering.
 
         """  # noqa: E501
-        queue = await self._channel.declare_queue(queue_name, durable=True)
-        await queue.bind(self._exchange, routing_key=routing_key)
-
-        await self._consume_messages(message_class, on_message, queue)
+        queue = await self._declare_queue(
+            routing_key, queue_name, options.prefetch_count
+        )
+        retries = await self._declare_retries(queue_name, options.retry)
+        await consume(queue, message_class, on_message, options, retries)
 
-    @staticmethod
-    async def _consume_messages(
+    async def _consume_batches(
+        self,
+        routing_key: str,
+        queue_name: str,
+        on_batch: Callable[[list[MessageType]], Awaitable],
         message_class: type[AbstractMessage],
-        on_message: Callable[[MessageType], Awaitable],
-        queue: AbstractRobustQueue,
+        options: BatchOptions,
     ) -> None:
-        """Process messages from the queue using the provided callback.
+        """Consume messages from the specified queue in batches.
 
         Args:
+            routing_key (str): The routing key to bind the queue to.
+            queue_name (str): The name of the queue to bind to the exchange.
+            on_batch (Callable[[list[MessageType]], Awaitable]): Async callback per batch.
             message_class (Type[AbstractMessage]): The class type of the message for deserialization.
-            on_message (Callable[[MessageType], Awaitable]): Async callback to process received messages.
-            queue (AbstractRobustQueue): The queue to consume messages from.
+            options (BatchOptions): Batch size and time limit.
 
         """  # noqa: E501
-        async with queue.iterator() as queue_iter:
-            async for message in queue_iter:
-                async with message.process():
-                    try:
-                        logger.info("Received message: %s", message.body)
-                        event = message_class.from_bytes(message.body)
-                        await on_message(event)
-                    except Exception as e:
-                        logger.exception("Error processing message: %s", e)
+        queue = await self._declare_queue(routing_key, queue_name, options.size)
+        retries = await self._declare_retries(queue_name, options.retry)
+        await consume_batches(queue, message_class, on_batch, options, retries)
+
+    async def _declare_queue(
+        self, routing_key: str, queue_name: str, prefetch_count: int
+    ) -> AbstractQueue:
+        """Set the channel prefetch, then declare a durable queue and bind it.
+
+        Args:
+            routing_key (str): The routing key to bind the queue to.
+            queue_name (str): The name of the queue.
+            prefetch_count (int): Unacknowledged deliveries allowed on the channel.
+
+        Returns:
+            AbstractQueue: The bound queue.
+
+        """
+        await self._channel.set_qos(prefetch_count=prefetch_count)
+        queue = await self._channel.declare_queue(queue_name, durable=True)
+        await queue.bind(self._exchange, routing_key=routing_key)
+        return queue
+
+    async def _declare_retries(
+        self, queue_name: str, policy: RetryPolicy
+    ) -> RetryRouter:
+        """Declare the retry and dead-letter queues of a consumed queue.
+
+        Args:
+            queue_name (str): The consumed queue.
+            policy (RetryPolicy): Attempts and backoff.
+
+        Returns:
+            RetryRouter: The router for the queue's failed messages.
+
+        """
+        retries = RetryRouter(self._channel, self._exchange_name, queue_name, policy)
+        await retries.declare()
+        return retries
+
+    @property
+    def amqp_url(self) -> str:
+        """Get the URL of the AMQP broker used by this facade."""
+        return self._amqp_url
 
     @property
     def exchange_name(self) -> str:
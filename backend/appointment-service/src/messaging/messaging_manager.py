@@ -1,5 +1,9 @@
+import asyncio
 import logging
 
+import aio_pika
+from aio_pika.abc import AbstractRobustConnection
+
 from .direct_message_facade import DirectMessageFacade
 from .pubsub_facade import PubSubFacade
 
@@ -7,39 +11,59 @@ logger = logging.getLogger(__name__)
 
 
 class MessagingManager:
-    """Manager for handling multiple messaging facades (PubSub and DirectMessage)."""
+    """Manager for handling multiple messaging facades (PubSub and DirectMessage).
+
+    The manager opens one robust connection per broker URL and every facade
+    on that broker gets its own channel on it, so adding an exchange adds a
+    channel rather than a TCP connection.
+    """
 
     def __init__(self) -> None:
         """Initialize the MessagingManager with empty lists for facades."""
         self._pubsubs: list[PubSubFacade] = []
         self._directs: list[DirectMessageFacade] = []
+        self._connections: dict[str, AbstractRobustConnection] = {}
 
     async def start_all(self) -> None:
-        """Start all messaging facades by establishing their connections."""
-        for facade in self._pubsubs:
-            logger.info(
-                "Connecting PubSubFacade for exchange '%s'", facade.exchange_name
-            )
-            await facade.connect()
-        for facade in self._directs:
-            logger.info(
-                "Connecting DirectMessageFacade for exchange '%s'", facade.exchange_name
-            )
-            await facade.connect()
+        """Start all messaging facades on shared connections, concurrently."""
+        facades = [*self._pubsubs, *self._directs]
+        urls = list(dict.fromkeys(facade.amqp_url for facade in facades))
+        connections = await asyncio.gather(
+            *(aio_pika.connect_robust(url) for url in urls)
+        )
+        self._connections = dict(zip(urls, connections, strict=True))
+        logger.info(
+            "Connecting %d messaging facades over %d connections",
+            len(facades),
+            len(self._connections),
+        )
+        await asyncio.gather(
+            *(facade.connect(self._connections[facade.amqp_url]) for facade in facades)
+        )
         logger.info("All messaging facades started.")
 
     async def stop_all(self) -> None:
-        """Stop all messaging facades by closing their connections."""
-        for facade in self._pubsubs:
-            logger.info("Closing PubSubFacade for exchange '%s'", facade.exchange_name)
-            await facade.close()
-        for facade in self._directs:
-            logger.info(
-                "Closing DirectMessageFacade for exchange '%s'", facade.exchange_name
-            )
-            await facade.close()
+        """Stop all messaging facades, then close the shared connections."""
+        await asyncio.gather(
+            *(facade.close() for facade in [*self._pubsubs, *self._directs])
+        )
+        for connection in self._connections.values():
+            if not connection.is_closed:
+                await connection.close()
+        self._connections = {}
         logger.info("All messaging facades stopped.")
 
+    def publish_stats(self) -> dict[str, dict[str, int | float]]:
+        """Return the confirmed publish statistics of every PubSubFacade.
+
+        Returns:
+            dict[str, dict[str, int | float]]: Statistics keyed by exchange name.
+
+        """
+        return {
+            facade.exchange_name: facade.publish_stats() for facade in self._pubsubs
+        }
+
     def add_pubsub(self, facade: PubSubFacade) -> None:
         """Add a PubSubFacade to the manager.
 
@@ -1,33 +1,53 @@
 import asyncio
 import logging
+import os
+import time
 from asyncio import AbstractEventLoop
 from contextlib import suppress
 from typing import Any, Awaitable, Callable, TypeVar
 
 import aio_pika
-from aio_pika.abc import AbstractRobustQueue
+from aio_pika.abc import AbstractQueue, AbstractRobustConnection
 
+from src.messaging.consumer import (
+    BatchOptions,
+    ConsumerOptions,
+    consume,
+    consume_batches,
+)
+from src.messaging.retry import RetryPolicy, RetryRouter
 from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.codecs import JSON, MESSAGE_CONTENT_TYPE
 
 MessageType = TypeVar("MessageType", bound=AbstractMessage)
 
 logger = logging.getLogger(__name__)
 
+# Messages in flight awaiting publisher confirms at once.
+PUBLISH_BATCH_SIZE = int(os.getenv("PUBLISH_BATCH_SIZE", "50"))
+
 
 class PubSubFacade:
     """Facade for publishing and subscribing to messages via a fanout exchange."""
 
-    def __init__(self, amqp_url: str, exchange_name: str) -> None:
+    def __init__(
+        self,
+        amqp_url: str,
+        exchange_name: str,
+        batch_size: int = PUBLISH_BATCH_SIZE,
+    ) -> None:
         """Initialize the PubSubFacade with connection parameters.
 
         Args:
             amqp_url (str): The AMQP broker URL.
             exchange_name (str): The name of the fanout exchange.
+            batch_size (int): Messages awaiting confirms at once.
 
         """
         self._amqp_url = amqp_url
         self._exchange_name = exchange_name
-        self._connection: aio_pika.RobustConnection | None = None
+        self._connection: AbstractRobustConnection | None = None
+        self._owns_connection = False
         self._channel: aio_pika.RobustChannel | None = None
         self._exchange: aio_pika.Exchange | None = None
         try:
@@ -35,28 +55,44 @@ class PubSubFacade:
         except RuntimeError:
             self._loop: AbstractEventLoop = asyncio.new_event_loop()
         self._consumer_task: asyncio.Task | None = None
+        self._batch_size = batch_size
+        self._published = 0
+        self._failed = 0
+        self._batches = 0
+        self._confirm_seconds = 0.0
+        self._confirm_seconds_max = 0.0
 
-    async def connect(self) -> None:
-        """Establish connection to the AMQP broker and declare a fanout exchange.
+    async def connect(self, connection: AbstractRobustConnection | None = None) -> None:
+        """Open a channel on the AMQP broker and declare a fanout exchange.
+
+        Args:
+            connection (AbstractRobustConnection | None): A connection shared
+                with other facades, which stays open when this facade closes.
+                Without one the facade opens and owns its own connection.
 
         Raises:
             aio_pika.exceptions.AMQPConnectionError: Connection to the broker failed.
 
         """
-        self._connection = await aio_pika.connect_robust(
+        self._owns_connection = connection is None
+        self._connection = connection or await aio_pika.connect_robust(
             self._amqp_url, loop=self._loop
         )
-        self._channel = await self._connection.channel()
+        self._channel = await self._connection.channel(publisher_confirms=True)
         self._exchange = await self._channel.declare_exchange(
             self._exchange_name, aio_pika.ExchangeType.FANOUT, durable=True
         )
 
     async def close(self) -> None:
-        """Close connections and cancel running consumer task."""
+        """Close connections and cancel tasks."""
         await self._cancel_consumer_task()
         if self._channel and not self._channel.is_closed:
             await self._channel.close()
-        if self._connection and not self._connection.is_closed:
+        if (
+            self._owns_connection
+            and self._connection
+            and not self._connection.is_closed
+        ):
             await self._connection.close()
 
     async def _cancel_consumer_task(self) -> None:
@@ -67,6 +103,79 @@ class PubSubFacade:
                 await self._consumer_task
             self._consumer_task = None
 
+    def _record_batch(self, results: list[Any], seconds: float) -> None:
+        """Update publish statistics and log messages the broker did not confirm.
+
+        Args:
+            results (list[Any]): The outcome of each publish, or its exception.
+            seconds (float): Time until the last confirm arrived.
+
+        """
+        self._batches += 1
+        self._confirm_seconds += seconds
+        self._confirm_seconds_max = max(self._confirm_seconds_max, seconds)
+        for result in results:
+            if isinstance(result, BaseException):
+                self._failed += 1
+                logger.error(
+                    "Broker did not confirm message on exchange '%s': %r",
+                    self._exchange_name,
+                    result,
+                )
+            else:
+                self._published += 1
+
+    @staticmethod
+    def _encode(message: AbstractMessage) -> aio_pika.Message:
+        """Encode a message in the configured wire format.
+
+        Args:
+            message (AbstractMessage): The message to encode.
+
+        Returns:
+            aio_pika.Message: The persistent AMQP message.
+
+        """
+        return PubSubFacade._to_amqp(
+            message.to_bytes(MESSAGE_CONTENT_TYPE), MESSAGE_CONTENT_TYPE
+        )
+
+    @staticmethod
+    def _to_amqp(body: bytes, content_type: str) -> aio_pika.Message:
+        """Wrap an encoded message for the broker.
+
+        Args:
+            body (bytes): The encoded message.
+            content_type (str): The format of body, e.g. ``application/json``.
+
+        Returns:
+            aio_pika.Message: The persistent AMQP message.
+
+        """
+        return aio_pika.Message(
+            body=body,
+            content_type=content_type,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
+
+    def publish_stats(self) -> dict[str, int | float]:
+        """Return counters for confirmed publishing.
+
+        Returns:
+            dict[str, int | float]: Published and failed message counts, and
+                the mean and max confirm latency of a batch.
+
+        """
+        return {
+            "published": self._published,
+            "failed": self._failed,
+            "batches": self._batches,
+            "confirm_seconds_avg": (
+                self._confirm_seconds / self._batches if self._batches else 0.0
+            ),
+            "confirm_seconds_max": self._confirm_seconds_max,
+        }
+
     async def publish(self, message: AbstractMessage) -> None:
         """Publish a message to all subscribers (pub-sub).
 
@@ -79,19 +188,62 @@ class PubSubFacade:
         """
         if not self._exchange:
             raise RuntimeError("Exchange not declared; call 'connect' first.")
-        message = aio_pika.Message(
-            body=message.to_bytes(), content_type="application/json"
-        )
         await self._exchange.publish(
-            message, routing_key=""
+            self._encode(message), routing_key=""
         )  # fanout ignores routing_key
-        logger.info("Published message: %s", message.body)
+        logger.debug("Published message: %s", message)
+
+    async def publish_bodies(
+        self, bodies: list[bytes], content_type: str = JSON
+    ) -> None:
+        """Publish already-encoded messages and wait for all their confirms.
+
+        This is the flush of the outbox relay, which buffers outgoing events
+        in the outbox table. At most ``batch_size`` messages await confirms
+        at once, so their confirms overlap without an unbounded number in
+        flight. Every outcome is counted in ``publish_stats``.
+
+        Args:
+            bodies (list[bytes]): The encoded messages, in publish order.
+            content_type (str): The format of the bodies.
+
+        Raises:
+            RuntimeError: If the messaging infrastructure is not properly initialized.
+            aio_pika.exceptions.DeliveryError: If the broker rejected a message;
+                the rest of the batch is still published.
+
+        """
+        if not self._exchange:
+            raise RuntimeError("Exchange not declared; call 'connect' first.")
+        failures: list[BaseException] = []
+        for start in range(0, len(bodies), self._batch_size):
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(
+                    self._exchange.publish(
+                        self._to_amqp(body, content_type), routing_key=""
+                    )
+                    for body in bodies[start : start + self._batch_size]
+                ),
+                return_exceptions=True,
+            )
+            self._record_batch(results, time.perf_counter() - started)
+            failures.extend(r for r in results if isinstance(r, BaseException))
+        if failures:
+            raise failures[0]
+        logger.info(
+            "Published %d messages to exchange '%s'",
+            len(bodies),
+            self._exchange_name,
+        )
 
     def subscribe(
         self,
         queue_name: str,
         on_message: Callable[[MessageType], Awaitable[Any]],
         message_class: type[MessageType],
+        exclusive: bool = False,
+        options: ConsumerOptions | None = None,
     ) -> None:
         """Subscribe to messages broadcasted on the fanout exchange.
 
@@ -99,6 +251,44 @@ class PubSubFacade:
             queue_name (str): The name of the queue to bind to the exchange.
             on_message (Callable[[MessageType], Awaitable[Any]]): Async callback to process received messages.
             message_class (Type[MessageType]): The class type of the message for deserialization.
+            exclusive (bool): Use a non-durable queue private to this connection and deleted with it, so every replica receives its own copy of each message.
+            options (ConsumerOptions | None): Prefetch, concurrency and ordering; defaults to ConsumerOptions().
+
+        Raises:
+            RuntimeError: If the messaging infrastructure is not properly initialized.
+
+        """  # noqa: E501
+        if not self._exchange or not self._channel:
+            raise RuntimeError(
+                "Exchange or channel not declared; call 'connect' first."
+            )
+        if self._consumer_task is not None and not self._consumer_task.done():
+            return  # Already consuming
+
+        self._consumer_task = self._loop.create_task(
+            self._consume(
+                queue_name,
+                on_message,
+                message_class,
+                exclusive,
+                options or ConsumerOptions(),
+            )
+        )
+
+    def subscribe_batch(
+        self,
+        queue_name: str,
+        on_batch: Callable[[list[MessageType]], Awaitable[Any]],
+        message_class: type[MessageType],
+        options: BatchOptions | None = None,
+    ) -> None:
+        """Subscribe to messages broadcasted on the fanout exchange, in batches.
+
+        Args:
+            queue_name (str): The name of the durable queue to bind to the exchange.
+            on_batch (Callable[[list[MessageType]], Awaitable[Any]]): Async callback receiving each batch of decoded messages.
+            message_class (Type[MessageType]): The class type of the message for deserialization.
+            options (BatchOptions | None): Batch size and time limit; defaults to BatchOptions().
 
         Raises:
             RuntimeError: If the messaging infrastructure is not properly initialized.
@@ -112,7 +302,9 @@ class PubSubFacade:
             return  # Already consuming
 
         self._consumer_task = self._loop.create_task(
-            self._consume(queue_name, on_message, message_class)
+            self._consume_batches(
+                queue_name, on_batch, message_class, options or BatchOptions()
+            )
         )
 
     async def _consume(
@@ -120,6 +312,8 @@ class PubSubFacade:
         queue_name: str,
         on_message: Callable[[MessageType], Awaitable[Any]],
         message_class: type[AbstractMessage],
+        exclusive: bool,
+        options: ConsumerOptions,
     ) -> None:
         """Consume messages from the specified queue.
 
@@ -127,35 +321,79 @@ class PubSubFacade:
             queue_name (str): The name of the queue to consume from.
             on_message (Callable[[MessageType], Awaitable[Any]]): Async callback to process received
             message_class (Type[AbstractMessage]): The class type of the message for deserialization.
+            exclusive (bool): Declare a non-durable, connection-exclusive queue.
+            options (ConsumerOptions): Prefetch, concurrency and ordering.
 
         """  # noqa: E501
-        queue = await self._channel.declare_queue(queue_name, durable=True)
-        await queue.bind(self._exchange)
-        await self._consume_messages(message_class, on_message, queue)
+        queue = await self._declare_queue(queue_name, exclusive, options.prefetch_count)
+        retries = await self._declare_retries(queue_name, exclusive, options.retry)
+        await consume(queue, message_class, on_message, options, retries)
 
-    @staticmethod
-    async def _consume_messages(
+    async def _consume_batches(
+        self,
+        queue_name: str,
+        on_batch: Callable[[list[MessageType]], Awaitable[Any]],
         message_class: type[AbstractMessage],
-        on_message: Callable[[MessageType], Awaitable[Any]],
-        queue: AbstractRobustQueue,
+        options: BatchOptions,
     ) -> None:
-        """Process messages from the queue.
+        """Consume messages from the specified queue in batches.
 
         Args:
+            queue_name (str): The name of the queue to consume from.
+            on_batch (Callable[[list[MessageType]], Awaitable[Any]]): Async callback per batch.
             message_class (Type[AbstractMessage]): The class type of the message for deserialization.
-            on_message (Callable[[MessageType], Awaitable[Any]]): Async callback to process received messages.
-            queue (AbstractRobustQueue): The queue to consume messages from.
+            options (BatchOptions): Batch size and time limit.
 
         """  # noqa: E501
-        async with queue.iterator() as queue_iter:
-            async for message in queue_iter:
-                async with message.process():
-                    try:
-                        logger.info("Received message: %s", message.body)
-                        event = message_class.from_bytes(message.body)
-                        await on_message(event)
-                    except Exception as e:
-                        logger.exception("Error processing message: %s", e)
+        queue = await self._declare_queue(queue_name, False, options.size)
+        retries = await self._declare_retries(queue_name, False, options.retry)
+        await consume_batches(queue, message_class, on_batch, options, retries)
+
+    async def _declare_queue(
+        self, queue_name: str, exclusive: bool, prefetch_count: int
+    ) -> AbstractQueue:
+        """Set the channel prefetch, then declare a queue bound to the exchange.
+
+        Args:
+            queue_name (str): The name of the queue.
+            exclusive (bool): Declare a non-durable, connection-exclusive queue.
+            prefetch_count (int): Unacknowledged deliveries allowed on the channel.
+
+        Returns:
+            AbstractQueue: The bound queue.
+
+        """
+        await self._channel.set_qos(prefetch_count=prefetch_count)
+        queue = await self._channel.declare_queue(
+            queue_name, durable=not exclusive, exclusive=exclusive
+        )
+        await queue.bind(self._exchange)
+        return queue
+
+    async def _declare_retries(
+        self, queue_name: str, exclusive: bool, policy: RetryPolicy
+    ) -> RetryRouter:
+        """Declare the retry and dead-letter queues of a consumed queue.
+
+        Args:
+            queue_name (str): The consumed queue.
+            exclusive (bool): Whether the consumed queue is connection-exclusive.
+            policy (RetryPolicy): Attempts and backoff.
+
+        Returns:
+            RetryRouter: The router for the queue's failed messages.
+
+        """
+        retries = RetryRouter(
+            self._channel, self._exchange_name, queue_name, policy, exclusive
+        )
+        await retries.declare()
+        return retries
+
+    @property
+    def amqp_url(self) -> str:
+        """Get the URL of the AMQP broker used by this facade."""
+        return self._amqp_url
 
     @property
     def exchange_name(self) -> str:
@@ -0,0 +1,232 @@
+"""Retries with exponential backoff and dead-lettering for failed messages."""
+
+import logging
+import os
+from dataclasses import dataclass
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractIncomingMessage
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_MAX_ATTEMPTS = int(os.getenv("CONSUMER_MAX_ATTEMPTS", "5"))
+CONSUMER_RETRY_BASE_DELAY_SECONDS = float(
+    os.getenv("CONSUMER_RETRY_BASE_DELAY_SECONDS", "1")
+)
+CONSUMER_RETRY_MAX_DELAY_SECONDS = float(
+    os.getenv("CONSUMER_RETRY_MAX_DELAY_SECONDS", "300")
+)
+
+# Failed handling attempts so far, carried on every retried message.
+ATTEMPTS_HEADER = "x-attempts"
+# Why a message was dead-lettered.
+ERROR_HEADER = "x-error"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how late a failed message is handled again.
+
+    Attributes:
+        max_attempts (int): Handling attempts before a message is
+            dead-lettered; 1 dead-letters on the first failure.
+        base_delay_seconds (float): Delay before the first retry; each
+            further retry waits twice as long.
+        max_delay_seconds (float): Upper bound of the delay.
+
+    """
+
+    max_attempts: int = CONSUMER_MAX_ATTEMPTS
+    base_delay_seconds: float = CONSUMER_RETRY_BASE_DELAY_SECONDS
+    max_delay_seconds: float = CONSUMER_RETRY_MAX_DELAY_SECONDS
+
+    def delay_seconds(self, failures: int) -> float:
+        """Return the backoff before handling a message again.
+
+        Args:
+            failures (int): Failed attempts so far, at least 1.
+
+        Returns:
+            float: The delay in seconds.
+
+        """
+        return min(
+            self.base_delay_seconds * 2 ** (failures - 1), self.max_delay_seconds
+        )
+
+
+class RetryRouter:
+    """Moves failed messages of one queue to its retry and dead-letter queues.
+
+    A message that failed for the n-th time is published to the retry queue
+    ``<queue>.retry.<n>``, whose TTL is the n-th backoff delay; on expiry
+    the broker dead-letters it through the default exchange back onto the
+    original queue. Each retry queue holds a single delay, so no message
+    waits behind a longer one. After ``max_attempts`` failures, or when it
+    cannot be decoded at all, a message goes to the dead-letter exchange
+    ``<exchange>.dlx``, which routes it to ``<queue>.dead`` for inspection.
+
+    The consumer never waits for a backoff, so retries do not stall the
+    messages behind them; they may, however, overtake a failed message.
+    """
+
+    def __init__(
+        self,
+        channel: AbstractChannel,
+        exchange_name: str,
+        queue_name: str,
+        policy: RetryPolicy,
+        exclusive: bool = False,
+    ) -> None:
+        """Initialize a router for a queue; call ``declare`` before use.
+
+        Args:
+            channel (AbstractChannel): The channel the queue is consumed on.
+            exchange_name (str): The exchange the queue is bound to.
+            queue_name (str): The consumed queue.
+            policy (RetryPolicy): Attempts and backoff.
+            exclusive (bool): Declare the retry and dead-letter queues
+                connection-exclusive like the consumed queue.
+
+        """
+        self._channel = channel
+        self._exchange_name = exchange_name
+        self._queue_name = queue_name
+        self._policy = policy
+        self._exclusive = exclusive
+        self._dead_letter_exchange: AbstractExchange | None = None
+
+    async def declare(self) -> None:
+        """Declare the retry queues, the dead-letter exchange and its queue."""
+        for failures in range(1, self._policy.max_attempts):
+            await self._channel.declare_queue(
+                self.retry_queue_name(failures),
+                durable=not self._exclusive,
+                exclusive=self._exclusive,
+                arguments={
+                    "x-message-ttl": int(self._policy.delay_seconds(failures) * 1000),
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": self._queue_name,
+                },
+            )
+        self._dead_letter_exchange = await self._channel.declare_exchange(
+            f"{self._exchange_name}.dlx", aio_pika.ExchangeType.DIRECT, durable=True
+        )
+        dead_letters = await self._channel.declare_queue(
+            f"{self._queue_name}.dead",
+            durable=not self._exclusive,
+            exclusive=self._exclusive,
+        )
+        await dead_letters.bind(
+            self._dead_letter_exchange, routing_key=self._queue_name
+        )
+
+    def retry_queue_name(self, failures: int) -> str:
+        """Return the retry queue for a message that failed a number of times.
+
+        Args:
+            failures (int): Failed attempts so far.
+
+        Returns:
+            str: The name of the retry queue.
+
+        """
+        return f"{self._queue_name}.retry.{failures}"
+
+    async def retry(
+        self, message: AbstractIncomingMessage, error: BaseException
+    ) -> None:
+        """Schedule a failed message for another attempt, or dead-letter it.
+
+        The caller acknowledges the original delivery once this returns.
+
+        Args:
+            message (AbstractIncomingMessage): The delivery whose handler failed.
+            error (BaseException): The handler's error.
+
+        """
+        failures = attempts(message) + 1
+        if failures >= self._policy.max_attempts:
+            await self.dead_letter(message, error, failures)
+            return
+        await self._channel.default_exchange.publish(
+            _copy(message, {ATTEMPTS_HEADER: failures}),
+            routing_key=self.retry_queue_name(failures),
+        )
+        logger.warning(
+            "Retrying message from queue '%s' in %.1fs (attempt %d of %d): %r",
+            self._queue_name,
+            self._policy.delay_seconds(failures),
+            failures + 1,
+            self._policy.max_attempts,
+            error,
+        )
+
+    async def dead_letter(
+        self,
+        message: AbstractIncomingMessage,
+        error: BaseException,
+        failures: int | None = None,
+    ) -> None:
+        """Publish a message to the dead-letter queue.
+
+        Args:
+            message (AbstractIncomingMessage): The delivery to give up on.
+            error (BaseException): Why the message could not be handled.
+            failures (int | None): Failed attempts; defaults to the header.
+
+        Raises:
+            RuntimeError: If ``declare`` was not called.
+
+        """
+        if self._dead_letter_exchange is None:
+            raise RuntimeError("Dead-letter exchange not declared; call 'declare'.")
+        if failures is None:
+            failures = attempts(message)
+        await self._dead_letter_exchange.publish(
+            _copy(message, {ATTEMPTS_HEADER: failures, ERROR_HEADER: repr(error)}),
+            routing_key=self._queue_name,
+        )
+        logger.error(
+            "Dead-lettered message from queue '%s': %r", self._queue_name, error
+        )
+
+
+def attempts(message: AbstractIncomingMessage) -> int:
+    """Return how often a message has failed before.
+
+    Args:
+        message (AbstractIncomingMessage): The delivery.
+
+    Returns:
+        int: The attempts header, 0 for a first delivery.
+
+    """
+    return int((message.headers or {}).get(ATTEMPTS_HEADER, 0))
+
+
+def _copy(
+    message: AbstractIncomingMessage, headers: dict[str, int | str]
+) -> aio_pika.Message:
+    """Copy a delivery for republishing, with updated headers.
+
+    The broker's own ``x-death`` history is dropped, since every retry
+    would otherwise add to it.
+
+    Args:
+        message (AbstractIncomingMessage): The delivery to copy.
+        headers (dict[str, int | str]): Headers to set on the copy.
+
+    Returns:
+        aio_pika.Message: The persistent copy.
+
+    """
+    kept = {
+        key: value for key, value in (message.headers or {}).items() if key != "x-death"
+    }
+    return aio_pika.Message(
+        body=message.body,
+        content_type=message.content_type,
+        headers={**kept, **headers},
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+    )
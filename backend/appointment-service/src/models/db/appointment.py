@@ -3,8 +3,13 @@
 from datetime import date, time
 from enum import Enum
 
+from sqlalchemy import Index, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlmodel import Field, SQLModel
 
+SLOT_CONSTRAINT = "ex_appointment_doctor_slot"
+ACTIVE = text("status <> 'CANCELLED'")
+
 
 class TimePreference(str, Enum):
     """Time preference for appointment."""
@@ -23,7 +28,42 @@ class AppointmentStatus(str, Enum):
 
 
 class Appointment(SQLModel, table=True):
-    """Represents a patient appointment."""
+    """Represents a patient appointment.
+
+    An active (non-cancelled) appointment owns its doctor/date/time slot. The
+    exclusion constraint behaves like a partial unique index, but is deferrable,
+    so it is checked once a statement has finished rather than row by row and
+    a single UPDATE can swap slots between appointments. Its index also serves
+    the per-doctor daily queue; the remaining indexes cover the preference and
+    patient lookups.
+    """
+
+    __table_args__ = (
+        ExcludeConstraint(
+            ("doctor_id", "="),
+            ("appointment_date", "="),
+            ("assigned_time", "="),
+            name=SLOT_CONSTRAINT,
+            using="btree",
+            where=ACTIVE,
+            deferrable=True,
+            initially="IMMEDIATE",
+        ),
+        Index(
+            "ix_appointment_doctor_date_preference",
+            "doctor_id",
+            "appointment_date",
+            "time_preference",
+            "assigned_time",
+            postgresql_where=ACTIVE,
+        ),
+        Index(
+            "ix_appointment_patient_date",
+            "patient_id",
+            "appointment_date",
+            "id",
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     patient_id: int
@@ -0,0 +1,28 @@
+"""Outbox event database model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, func
+from sqlmodel import Field, SQLModel
+
+
+class OutboxEvent(SQLModel, table=True):
+    """An event waiting to be published to the message broker.
+
+    Rows are written in the same transaction as the appointment change they
+    describe, so an event exists exactly when its change was committed. The
+    outbox relay publishes them in id order and deletes them once the broker
+    has confirmed them.
+    """
+
+    __tablename__ = "outbox_event"
+
+    id: int | None = Field(default=None, primary_key=True)
+    exchange: str
+    payload: str
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True), nullable=False, server_default=func.now()
+        ),
+    )
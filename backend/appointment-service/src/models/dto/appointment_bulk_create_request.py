@@ -0,0 +1,20 @@
+"""DTO for booking several appointments at once."""
+
+from pydantic import BaseModel, Field
+
+from src.models.dto.appointment_create_request import AppointmentCreateRequest
+
+# Keeps the multi-row INSERT well under Postgres' bind-parameter limit.
+MAX_BULK_APPOINTMENTS = 500
+
+
+class AppointmentBulkCreateRequest(BaseModel):
+    """Request DTO for booking a batch of appointments.
+
+    Rows are assigned slots in the order given, so earlier rows win when a
+    doctor's session fills up.
+    """
+
+    appointments: list[AppointmentCreateRequest] = Field(
+        min_length=1, max_length=MAX_BULK_APPOINTMENTS
+    )
@@ -0,0 +1,26 @@
+"""DTO for the per-row outcome of a bulk booking."""
+
+from enum import Enum
+
+from pydantic import BaseModel
+
+from src.models.dto.appointment_response import AppointmentResponse
+
+
+class BulkRowStatus(str, Enum):
+    """Outcome of a single row in a bulk booking."""
+
+    CREATED = "created"
+    CONFLICT = "conflict"
+
+
+class AppointmentBulkResult(BaseModel):
+    """Response DTO for one row of a bulk booking.
+
+    index refers to the row's position in the request.
+    """
+
+    index: int
+    status: BulkRowStatus
+    appointment: AppointmentResponse | None = None
+    message: str | None = None
@@ -0,0 +1,56 @@
+"""DTO for a keyset-paginated page of appointments."""
+
+import base64
+import binascii
+from datetime import date
+
+from pydantic import BaseModel
+
+from src.models.db.appointment import Appointment
+from src.models.dto.appointment_response import AppointmentResponse
+
+
+class AppointmentPage(BaseModel):
+    """Response DTO for one page of appointments.
+
+    next_cursor is an opaque token for the following page, or None on the
+    last page.
+    """
+
+    items: list[AppointmentResponse]
+    next_cursor: str | None
+
+    @staticmethod
+    def encode_cursor(appointment: Appointment) -> str:
+        """Encode the position just past an appointment as a cursor.
+
+        Args:
+            appointment (Appointment): The last appointment of a page.
+
+        Returns:
+            str: A URL-safe cursor token.
+
+        """
+        position = f"{appointment.appointment_date.isoformat()}_{appointment.id}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[date, int]:
+        """Decode a cursor into the (appointment_date, id) it points past.
+
+        Args:
+            cursor (str): A token produced by encode_cursor.
+
+        Returns:
+            tuple[date, int]: The appointment date and ID of the position.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        """
+        try:
+            position = base64.urlsafe_b64decode(cursor.encode()).decode()
+            day, appointment_id = position.split("_")
+            return date.fromisoformat(day), int(appointment_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor '{cursor}'.") from e
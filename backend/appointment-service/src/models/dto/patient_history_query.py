@@ -0,0 +1,25 @@
+"""DTO for querying a patient's appointment history."""
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+from src.models.db.appointment import AppointmentStatus
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PatientHistoryQuery(BaseModel):
+    """Query parameters for a patient's appointment history.
+
+    Both date bounds are inclusive and omitted filters match everything.
+    cursor is the next_cursor of the previous page; cursor and limit are
+    ignored when streaming.
+    """
+
+    date_from: date | None = None
+    date_to: date | None = None
+    status: AppointmentStatus | None = None
+    cursor: str | None = None
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
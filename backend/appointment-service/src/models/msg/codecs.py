@@ -0,0 +1,137 @@
+"""Wire formats for messages, selected per message by AMQP content type."""
+
+import os
+from abc import ABC, abstractmethod
+from typing import TypeVar
+
+import msgpack
+from pydantic import BaseModel
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# Format of outgoing messages. Consumers decode by each message's content
+# type, so publishers can switch formats without a coordinated deploy.
+MESSAGE_CONTENT_TYPE = os.getenv("MESSAGE_CONTENT_TYPE", JSON)
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+
+class MessageCodec(ABC):
+    """Encodes messages to bytes and back for one content type."""
+
+    content_type: str
+
+    @abstractmethod
+    def encode(self, message: BaseModel) -> bytes:
+        """Serialize a message.
+
+        Args:
+            message (BaseModel): The message to serialize.
+
+        Returns:
+            bytes: The encoded message.
+
+        """
+
+    @abstractmethod
+    def decode(self, model: type[ModelType], body: bytes) -> ModelType:
+        """Deserialize and validate a message.
+
+        Args:
+            model (type[ModelType]): The message class.
+            body (bytes): The encoded message.
+
+        Returns:
+            ModelType: The validated message.
+
+        """
+
+
+class JsonCodec(MessageCodec):
+    """JSON, serialized and validated by pydantic directly to and from bytes."""
+
+    content_type = JSON
+
+    def encode(self, message: BaseModel) -> bytes:
+        """Serialize a message to JSON.
+
+        Args:
+            message (BaseModel): The message to serialize.
+
+        Returns:
+            bytes: The UTF-8 JSON document.
+
+        """
+        return message.model_dump_json().encode()
+
+    def decode(self, model: type[ModelType], body: bytes) -> ModelType:
+        """Parse and validate a JSON message.
+
+        Args:
+            model (type[ModelType]): The message class.
+            body (bytes): The JSON document.
+
+        Returns:
+            ModelType: The validated message.
+
+        """
+        return model.model_validate_json(body)
+
+
+class MsgpackCodec(MessageCodec):
+    """MessagePack, a compact binary encoding of the same fields as JSON."""
+
+    content_type = MSGPACK
+
+    def encode(self, message: BaseModel) -> bytes:
+        """Serialize a message to MessagePack.
+
+        Args:
+            message (BaseModel): The message to serialize.
+
+        Returns:
+            bytes: The packed message.
+
+        """
+        return msgpack.packb(message.model_dump(mode="json"))
+
+    def decode(self, model: type[ModelType], body: bytes) -> ModelType:
+        """Unpack and validate a MessagePack message.
+
+        Args:
+            model (type[ModelType]): The message class.
+            body (bytes): The packed message.
+
+        Returns:
+            ModelType: The validated message.
+
+        """
+        return model.model_validate(msgpack.unpackb(body))
+
+
+CODECS: dict[str, MessageCodec] = {
+    codec.content_type: codec for codec in (JsonCodec(), MsgpackCodec())
+}
+
+
+def get_codec(content_type: str | None) -> MessageCodec:
+    """Return the codec for a content type.
+
+    Messages without a content type are read as JSON, the only format
+    published before codecs were introduced.
+
+    Args:
+        content_type (str | None): The AMQP content type of a message.
+
+    Returns:
+        MessageCodec: The matching codec.
+
+    Raises:
+        ValueError: If no codec handles the content type.
+
+    """
+    codec = CODECS.get(content_type or JSON)
+    if codec is None:
+        raise ValueError(f"Unsupported message content type '{content_type}'.")
+    return codec
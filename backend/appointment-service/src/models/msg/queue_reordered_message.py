@@ -0,0 +1,23 @@
+"""Queue reordered event message."""
+
+from datetime import date, time
+
+from src.models.msg.abstract_message import AbstractMessage
+
+
+class QueueReorderedMessage(AbstractMessage):
+    """Message published when a doctor's daily queue is reordered.
+
+    Attributes:
+        doctor_id (int): Identifier of the doctor.
+        appointment_date (date): Date of the reordered session.
+        appointment_ids (list[int]): Appointment IDs in their new order.
+        assigned_times (list[time]): The new slot of each appointment, aligned
+            with appointment_ids.
+
+    """
+
+    doctor_id: int
+    appointment_date: date
+    appointment_ids: list[int]
+    assigned_times: list[time]
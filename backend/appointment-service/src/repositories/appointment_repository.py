@@ -1,38 +1,209 @@
 """Repository for appointment data access."""
 
-from datetime import date
+import logging
+from collections.abc import AsyncIterator
+from datetime import date, time
+
+from sqlalchemy import (
+    Integer,
+    Time,
+    bindparam,
+    column,
+    exists,
+    func,
+    insert,
+    literal,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.dml import Insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from src.messaging.pubsub_exchanges import (
+    APPOINTMENT_CREATED,
+    APPOINTMENT_QUEUE_REORDERED,
+    APPOINTMENT_STATUS_CHANGED,
+)
+from src.models.db.appointment import (
+    Appointment,
+    AppointmentStatus,
+    TimePreference,
+)
+from src.models.db.outbox_event import OutboxEvent
+from src.models.dto.patient_history_query import PatientHistoryQuery
+from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.appointment_message import AppointmentMessage
+from src.models.msg.queue_reordered_message import QueueReorderedMessage
+
+logger = logging.getLogger(__name__)
+
+Day = tuple[int, date]
+
+STREAM_BATCH_SIZE = 500
+
+_INSERT_COLUMNS = (
+    "patient_id",
+    "doctor_id",
+    "appointment_date",
+    "time_preference",
+    "assigned_time",
+    "status",
+    "notes",
+)
 
-from sqlmodel import Session, select
 
-from src.models.db.appointment import Appointment, AppointmentStatus, TimePreference
+class AppointmentRepository:
+    """Repository for managing Appointment entities in the database.
 
+    Reads go to the read-replica session when one is given. Once the
+    repository has written, its reads are served by the primary instead, so
+    a request always sees its own writes despite replication lag.
 
-class AppointmentRepository:
-    """Repository for managing Appointment entities in the database."""
+    Every write also adds its event to the outbox in the same transaction;
+    the outbox relay publishes it after the commit.
+    """
 
-    def __init__(self, session: Session) -> None:
-        """Initialize the repository with a database session.
+    def __init__(
+        self, session: AsyncSession, read_session: AsyncSession | None = None
+    ) -> None:
+        """Initialize the repository with database sessions.
 
         Args:
-            session (Session): The database session.
+            session (AsyncSession): The async session on the primary database.
+            read_session (AsyncSession | None): An async session on a read
+                replica, or None to read from the primary.
 
         """
         self._session = session
-
-    def create(self, appointment: Appointment) -> Appointment:
-        """Create a new appointment in the database.
+        self._read_session = read_session or session
+        self._has_written = False
+
+    @property
+    def _reader(self) -> AsyncSession:
+        """The session reads should use, honouring read-your-writes."""
+        return self._session if self._has_written else self._read_session
+
+    async def create_in_first_free_slot(
+        self, appointment: Appointment, slots: list[time]
+    ) -> Appointment | None:
+        """Insert an appointment into the first free slot in a single statement.
+
+        The free slot is picked and the row inserted by one
+        ``INSERT ... SELECT ... RETURNING`` round-trip. If a concurrent booking
+        claims the same slot first, the slot exclusion constraint rejects the
+        insert and the statement is retried against the new occupancy. Every
+        lost race means another booking filled a slot, so at most
+        ``len(slots) + 1`` attempts are needed.
 
         Args:
-            appointment (Appointment): The appointment entity to create.
+            appointment (Appointment): The appointment to insert; its
+                assigned_time is ignored.
+            slots (list[time]): Candidate slots in order of preference.
 
         Returns:
-            Appointment: The created appointment with updated fields.
+            Appointment | None: The created appointment, or None if every
+                candidate slot is taken.
+
+        Raises:
+            IntegrityError: If the slot constraint is still violated after the
+                final attempt.
 
         """
-        self._save_and_refresh(appointment)
-        return appointment
+        statement = self._build_first_free_slot_insert(appointment, slots)
+        max_attempts = len(slots) + 1
+        for attempt in range(1, max_attempts + 1):
+            try:
+                created = (await self._exec_returning(statement)).scalar_one_or_none()
+                if created:
+                    self._record_events(
+                        APPOINTMENT_CREATED, [AppointmentMessage.from_entity(created)]
+                    )
+                await self._commit()
+            except IntegrityError:
+                await self._session.rollback()
+                if attempt == max_attempts:
+                    raise
+                logger.info(
+                    "Slot conflict for doctor %s on %s, retrying (%d/%d)",
+                    appointment.doctor_id,
+                    appointment.appointment_date,
+                    attempt,
+                    max_attempts,
+                )
+            else:
+                return created
+        return None
+
+    async def create_many_in_free_slots(
+        self,
+        appointments: list[Appointment],
+        slots: dict[TimePreference, list[time]],
+    ) -> list[Appointment | None]:
+        """Insert a batch of appointments in one multi-row statement.
+
+        The occupancy of every doctor/date in the batch is read in one query
+        and slots are assigned in memory, in batch order, before a single
+        ``INSERT ... VALUES ... RETURNING`` and commit. If a concurrent
+        booking claims one of the assigned slots first, the whole batch is
+        rolled back and reassigned against the new occupancy.
+
+        Args:
+            appointments (list[Appointment]): The appointments to insert; their
+                assigned_time is overwritten.
+            slots (dict[TimePreference, list[time]]): Candidate slots per
+                preference, in order of preference.
+
+        Returns:
+            list[Appointment | None]: The created appointments in input order,
+                with None for rows whose preference had no free slot.
+
+        Raises:
+            IntegrityError: If the slot constraint is still violated after the
+                final attempt.
 
-    def get_by_id(self, appointment_id: int) -> Appointment | None:
+        """
+        days = {(a.doctor_id, a.appointment_date) for a in appointments}
+        max_attempts = len(days) * sum(len(s) for s in slots.values()) + 1
+        for attempt in range(1, max_attempts + 1):
+            try:
+                taken = await self._get_taken_slots(days)
+                assigned = self._assign_slots(appointments, slots, taken)
+                created = await self._insert_many([a for a in assigned if a])
+                self._record_events(
+                    APPOINTMENT_CREATED,
+                    [AppointmentMessage.from_entity(a) for a in created],
+                )
+                await self._commit()
+            except IntegrityError:
+                await self._session.rollback()
+                if attempt == max_attempts:
+                    raise
+                logger.info(
+                    "Slot conflict in bulk booking, retrying (%d/%d)",
+                    attempt,
+                    max_attempts,
+                )
+            else:
+                by_slot = {
+                    (a.doctor_id, a.appointment_date, a.assigned_time): a
+                    for a in created
+                }
+                return [
+                    by_slot[(a.doctor_id, a.appointment_date, a.assigned_time)]
+                    if a
+                    else None
+                    for a in assigned
+                ]
+        return []
+
+    async def get_by_id(self, appointment_id: int) -> Appointment | None:
         """Retrieve an appointment by its ID.
 
         Args:
@@ -42,34 +213,36 @@ class AppointmentRepository:
             Appointment | None: The appointment if found, else None.
 
         """
-        return self._session.get(Appointment, appointment_id)
+        return await self._reader.get(Appointment, appointment_id)
 
-    def get_by_doctor_and_date(
-        self, doctor_id: int, appointment_date: date
+    async def get_by_doctor_and_date(
+        self, doctor_id: int, appointment_date: date, primary: bool = False
     ) -> list[Appointment]:
         """Retrieve all appointments for a doctor on a specific date.
 
         Args:
             doctor_id (int): The ID of the doctor.
             appointment_date (date): The date to query.
+            primary (bool): Read from the primary, e.g. ahead of a write that
+                must see the current rows.
 
         Returns:
             list[Appointment]: List of appointments ordered by assigned_time.
 
         """
-        return list(
-            self._session.exec(
-                select(Appointment)
-                .where(
-                    Appointment.doctor_id == doctor_id,
-                    Appointment.appointment_date == appointment_date,
-                    Appointment.status != AppointmentStatus.CANCELLED,
-                )
-                .order_by(Appointment.assigned_time)
+        session = self._session if primary else self._reader
+        result = await session.exec(
+            select(Appointment)
+            .where(
+                Appointment.doctor_id == doctor_id,
+                Appointment.appointment_date == appointment_date,
+                Appointment.status != AppointmentStatus.CANCELLED,
             )
+            .order_by(Appointment.assigned_time)
         )
+        return list(result)
 
-    def get_by_doctor_date_and_preference(
+    async def get_by_doctor_date_and_preference(
         self,
         doctor_id: int,
         appointment_date: date,
@@ -86,76 +259,363 @@ class AppointmentRepository:
             list[Appointment]: List of matching appointments ordered by assigned_time.
 
         """
-        return list(
-            self._session.exec(
-                select(Appointment)
-                .where(
-                    Appointment.doctor_id == doctor_id,
-                    Appointment.appointment_date == appointment_date,
-                    Appointment.time_preference == time_preference,
-                    Appointment.status != AppointmentStatus.CANCELLED,
-                )
-                .order_by(Appointment.assigned_time)
+        result = await self._reader.exec(
+            select(Appointment)
+            .where(
+                Appointment.doctor_id == doctor_id,
+                Appointment.appointment_date == appointment_date,
+                Appointment.time_preference == time_preference,
+                Appointment.status != AppointmentStatus.CANCELLED,
             )
+            .order_by(Appointment.assigned_time)
         )
+        return list(result)
 
-    def get_by_patient_id(self, patient_id: int) -> list[Appointment]:
-        """Retrieve all appointments for a specific patient.
+    async def get_page_by_patient_id(
+        self,
+        patient_id: int,
+        query: PatientHistoryQuery,
+        limit: int,
+        after: tuple[date, int] | None = None,
+    ) -> list[Appointment]:
+        """Retrieve one page of a patient's history, newest first.
+
+        Pages are keyed on (appointment_date, id) rather than an offset, so
+        every page is a range scan of the patient index however deep it is.
 
         Args:
             patient_id (int): The ID of the patient.
+            query (PatientHistoryQuery): Date range and status filters.
+            limit (int): Maximum number of appointments to return.
+            after (tuple[date, int] | None): The (appointment_date, id) the
+                previous page ended on, or None for the first page.
 
         Returns:
-            list[Appointment]: List of the patient's appointments.
+            list[Appointment]: Up to limit appointments.
 
         """
-        return list(
-            self._session.exec(
-                select(Appointment).where(Appointment.patient_id == patient_id)
+        statement = self._patient_history(patient_id, query).limit(limit)
+        if after is not None:
+            statement = statement.where(
+                tuple_(Appointment.appointment_date, Appointment.id)
+                < tuple_(literal(after[0]), literal(after[1]))
             )
+        result = await self._reader.exec(statement)
+        return list(result)
+
+    async def stream_by_patient_id(
+        self, patient_id: int, query: PatientHistoryQuery
+    ) -> AsyncIterator[Appointment]:
+        """Stream a patient's whole history, newest first, from a server-side cursor.
+
+        Rows are fetched in batches of STREAM_BATCH_SIZE, so memory does not
+        grow with the length of the history.
+
+        Args:
+            patient_id (int): The ID of the patient.
+            query (PatientHistoryQuery): Date range and status filters.
+
+        Yields:
+            Appointment: The patient's appointments.
+
+        """
+        result = await self._reader.stream_scalars(
+            self._patient_history(patient_id, query),
+            execution_options={"yield_per": STREAM_BATCH_SIZE},
         )
+        async for appointment in result:
+            yield appointment
 
-    def update_status(
-        self, appointment: Appointment, status: AppointmentStatus
-    ) -> Appointment:
-        """Update the status of an appointment.
+    async def update_status(
+        self, appointment_id: int, status: AppointmentStatus
+    ) -> Appointment | None:
+        """Update the status of an appointment with one UPDATE ... RETURNING.
 
         Args:
-            appointment (Appointment): The appointment entity to update.
+            appointment_id (int): The ID of the appointment to update.
             status (AppointmentStatus): The new status.
 
         Returns:
-            Appointment: The updated appointment.
+            Appointment | None: The updated appointment, or None if not found.
+
+        Raises:
+            ValueError: If reactivating the appointment would double-book its slot.
 
         """
-        appointment.status = status
-        self._save_and_refresh(appointment)
-        return appointment
+        statement = (
+            update(Appointment)
+            .where(Appointment.id == appointment_id)
+            .values(status=status)
+            .returning(*Appointment.__table__.c)
+        )
+        try:
+            updated = (await self._exec_returning(statement)).scalar_one_or_none()
+            if updated:
+                self._record_events(
+                    APPOINTMENT_STATUS_CHANGED,
+                    [AppointmentMessage.from_entity(updated)],
+                )
+            await self._commit()
+        except IntegrityError as e:
+            await self._session.rollback()
+            raise ValueError(
+                f"Appointment {appointment_id} cannot be reactivated: its slot is "
+                "already taken by another active appointment."
+            ) from e
+        return updated
+
+    async def reorder(self, new_slots: dict[int, time]) -> list[Appointment]:
+        """Move appointments to new slots with a single UPDATE ... FROM VALUES.
 
-    def reorder(self, appointments: list[Appointment]) -> list[Appointment]:
-        """Persist a reordered list of appointments with updated assigned times.
+        All rows change in one statement, so swapped slots never collide in
+        the slot constraint, and RETURNING replaces the per-row refresh.
 
         Args:
-            appointments (list[Appointment]): Appointments with updated assigned_time.
+            new_slots (dict[int, time]): New assigned_time per appointment ID,
+                in queue order.
 
         Returns:
-            list[Appointment]: The updated appointments.
+            list[Appointment]: The updated appointments in queue order.
+
+        Raises:
+            ValueError: If an appointment was deleted or cancelled since the
+                queue was read.
 
         """
-        for appointment in appointments:
-            self._session.add(appointment)
-        self._session.commit()
-        for appointment in appointments:
-            self._session.refresh(appointment)
-        return appointments
+        if not new_slots:
+            return []
+        slot_values = values(
+            column("id", Integer),
+            column("assigned_time", Time),
+            name="new_slot",
+        ).data(list(new_slots.items()))
+        statement = (
+            update(Appointment)
+            .where(
+                Appointment.id == slot_values.c.id,
+                Appointment.status != AppointmentStatus.CANCELLED,
+            )
+            .values(assigned_time=slot_values.c.assigned_time)
+            .returning(*Appointment.__table__.c)
+        )
+        updated = {a.id: a for a in (await self._exec_returning(statement)).scalars()}
+        missing = [i for i in new_slots if i not in updated]
+        if missing:
+            await self._session.rollback()
+            raise ValueError(
+                f"Appointments {missing} were cancelled or deleted while the "
+                "queue was being reordered."
+            )
+        reordered = [updated[appointment_id] for appointment_id in new_slots]
+        self._record_events(
+            APPOINTMENT_QUEUE_REORDERED,
+            [
+                QueueReorderedMessage(
+                    doctor_id=reordered[0].doctor_id,
+                    appointment_date=reordered[0].appointment_date,
+                    appointment_ids=list(new_slots),
+                    assigned_times=[a.assigned_time for a in reordered],
+                )
+            ],
+        )
+        await self._commit()
+        return reordered
+
+    async def close(self) -> None:
+        """Return the sessions' connections to the pool.
 
-    def _save_and_refresh(self, instance: Appointment) -> None:
-        """Save and refresh an instance in the database.
+        The repository stays usable; a later query checks a connection out
+        again. Long-lived responses call this once their reads are done.
+        """
+        await self._session.close()
+        if self._read_session is not self._session:
+            await self._read_session.close()
+
+    def _record_events(self, exchange: str, messages: list[AbstractMessage]) -> None:
+        """Add events to the outbox as part of the current transaction.
 
         Args:
-            instance (Appointment): The appointment instance to save and refresh.
+            exchange (str): The exchange the events are published on.
+            messages (list[AbstractMessage]): The events.
 
         """
-        self._session.add(instance)
-        self._session.commit()
-        self._session.refresh(instance)
+        self._session.add_all(
+            [
+                OutboxEvent(exchange=exchange, payload=message.model_dump_json())
+                for message in messages
+            ]
+        )
+
+    async def _commit(self) -> None:
+        """Commit on the primary and pin later reads to it."""
+        await self._session.commit()
+        self._has_written = True
+
+    @staticmethod
+    def _patient_history(
+        patient_id: int, query: PatientHistoryQuery
+    ) -> SelectOfScalar[Appointment]:
+        """Build the filtered, newest-first query over a patient's history.
+
+        Args:
+            patient_id (int): The ID of the patient.
+            query (PatientHistoryQuery): Date range and status filters.
+
+        Returns:
+            SelectOfScalar[Appointment]: The history query.
+
+        """
+        statement = select(Appointment).where(Appointment.patient_id == patient_id)
+        if query.date_from is not None:
+            statement = statement.where(Appointment.appointment_date >= query.date_from)
+        if query.date_to is not None:
+            statement = statement.where(Appointment.appointment_date <= query.date_to)
+        if query.status is not None:
+            statement = statement.where(Appointment.status == query.status)
+        return statement.order_by(
+            Appointment.appointment_date.desc(), Appointment.id.desc()
+        )
+
+    async def _get_taken_slots(self, days: set[Day]) -> dict[Day, set[time]]:
+        """Read the slots held by active appointments on the given days.
+
+        Args:
+            days (set[Day]): The (doctor_id, appointment_date) pairs to read.
+
+        Returns:
+            dict[Day, set[time]]: Taken slots per doctor and date.
+
+        """
+        result = await self._session.exec(
+            select(
+                Appointment.doctor_id,
+                Appointment.appointment_date,
+                Appointment.assigned_time,
+            ).where(
+                tuple_(Appointment.doctor_id, Appointment.appointment_date).in_(days),
+                Appointment.status != AppointmentStatus.CANCELLED,
+            )
+        )
+        taken: dict[Day, set[time]] = {day: set() for day in days}
+        for doctor_id, appointment_date, assigned_time in result:
+            taken[(doctor_id, appointment_date)].add(assigned_time)
+        return taken
+
+    async def _exec_returning(self, statement: Executable) -> Result:
+        """Execute a write with RETURNING and map the rows onto Appointment.
+
+        Appointments already loaded in this session are overwritten with the
+        returned values instead of being refreshed with another SELECT.
+
+        Args:
+            statement (Executable): An INSERT or UPDATE returning every column.
+
+        Returns:
+            Result: The ORM result of Appointment entities.
+
+        """
+        return await self._session.exec(
+            select(Appointment)
+            .from_statement(statement)
+            .execution_options(populate_existing=True)
+        )
+
+    async def _insert_many(self, appointments: list[Appointment]) -> list[Appointment]:
+        """Insert appointments with one multi-row INSERT ... RETURNING.
+
+        Args:
+            appointments (list[Appointment]): Appointments with assigned slots.
+
+        Returns:
+            list[Appointment]: The created rows.
+
+        """
+        if not appointments:
+            return []
+        statement = (
+            insert(Appointment)
+            .values(
+                [
+                    {name: getattr(a, name) for name in _INSERT_COLUMNS}
+                    for a in appointments
+                ]
+            )
+            .returning(*Appointment.__table__.c)
+        )
+        return list((await self._exec_returning(statement)).scalars())
+
+    @staticmethod
+    def _assign_slots(
+        appointments: list[Appointment],
+        slots: dict[TimePreference, list[time]],
+        taken: dict[Day, set[time]],
+    ) -> list[Appointment | None]:
+        """Give each appointment the first slot not taken in the database or batch.
+
+        Args:
+            appointments (list[Appointment]): The appointments to place.
+            slots (dict[TimePreference, list[time]]): Candidate slots per
+                preference.
+            taken (dict[Day, set[time]]): Slots already taken per day; updated
+                in place as slots are handed out.
+
+        Returns:
+            list[Appointment | None]: The appointments with assigned_time set,
+                or None where no slot was free.
+
+        """
+        assigned: list[Appointment | None] = []
+        for appointment in appointments:
+            day_taken = taken[(appointment.doctor_id, appointment.appointment_date)]
+            slot = next(
+                (s for s in slots[appointment.time_preference] if s not in day_taken),
+                None,
+            )
+            if slot is None:
+                assigned.append(None)
+                continue
+            day_taken.add(slot)
+            appointment.assigned_time = slot
+            assigned.append(appointment)
+        return assigned
+
+    @staticmethod
+    def _build_first_free_slot_insert(
+        appointment: Appointment, slots: list[time]
+    ) -> Insert:
+        """Build the INSERT ... SELECT that claims the first free slot.
+
+        Args:
+            appointment (Appointment): The appointment to insert.
+            slots (list[time]): Candidate slots in order of preference.
+
+        Returns:
+            Insert: The insert statement returning the created row.
+
+        """
+        columns = Appointment.__table__.c
+        candidate = (
+            func.unnest(bindparam("slots", slots, type_=ARRAY(Time)))
+            .table_valued("slot", with_ordinality="position")
+            .render_derived(name="candidate")
+        )
+        slot_taken = exists().where(
+            Appointment.doctor_id == appointment.doctor_id,
+            Appointment.appointment_date == appointment.appointment_date,
+            Appointment.assigned_time == candidate.c.slot,
+            Appointment.status != AppointmentStatus.CANCELLED,
+        )
+        row = {
+            name: literal(getattr(appointment, name), columns[name].type)
+            for name in _INSERT_COLUMNS
+        }
+        row["assigned_time"] = candidate.c.slot
+        first_free = (
+            select(*row.values())
+            .where(~slot_taken)
+            .order_by(candidate.c.position)
+            .limit(1)
+        )
+        return (
+            insert(Appointment).from_select(list(row), first_free).returning(*columns)
+        )
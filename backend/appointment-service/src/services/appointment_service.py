@@ -1,24 +1,30 @@
 """Appointment service — business logic and slot assignment."""
 
-import asyncio
 import logging
 import os
+from collections.abc import AsyncIterator
 from datetime import date, time
 
-from src.messaging.messaging_manager import MessagingManager
-from src.messaging.pubsub_exchanges import (
-    APPOINTMENT_CREATED,
-    APPOINTMENT_STATUS_CHANGED,
+from src.models.db.appointment import Appointment, AppointmentStatus, TimePreference
+from src.models.dto.appointment_bulk_create_request import (
+    AppointmentBulkCreateRequest,
+)
+from src.models.dto.appointment_bulk_result import (
+    AppointmentBulkResult,
+    BulkRowStatus,
 )
-from src.models.db.appointment import Appointment, TimePreference
 from src.models.dto.appointment_create_request import AppointmentCreateRequest
+from src.models.dto.appointment_page import AppointmentPage
 from src.models.dto.appointment_response import AppointmentResponse
 from src.models.dto.appointment_status_update_request import (
     AppointmentStatusUpdateRequest,
 )
+from src.models.dto.patient_history_query import PatientHistoryQuery
 from src.models.dto.queue_reorder_request import QueueReorderRequest
-from src.models.msg.appointment_message import AppointmentMessage
 from src.repositories.appointment_repository import AppointmentRepository
+from src.services.outbox_relay import OutboxRelay
+from src.services.queue_snapshot_cache import QueueSnapshot, QueueSnapshotCache
+from src.services.slot_occupancy_cache import SlotOccupancyCache, slot_bit
 
 logger = logging.getLogger(__name__)
 
@@ -50,23 +56,33 @@ class AppointmentService:
     def __init__(
         self,
         repo: AppointmentRepository,
-        messaging: MessagingManager,
+        outbox: OutboxRelay,
+        slot_cache: SlotOccupancyCache,
+        queue_snapshots: QueueSnapshotCache,
     ) -> None:
         """Initialize the AppointmentService.
 
         Args:
             repo (AppointmentRepository): The appointment repository.
-            messaging (MessagingManager): The messaging manager.
+            outbox (OutboxRelay): The relay publishing committed events.
+            slot_cache (SlotOccupancyCache): Cache of known-taken slots.
+            queue_snapshots (QueueSnapshotCache): Cache of serialised queues.
 
         """
         self._repo = repo
-        self._messaging = messaging
+        self._outbox = outbox
+        self._slot_cache = slot_cache
+        self._queue_snapshots = queue_snapshots
 
-    def create_appointment(
+    async def create_appointment(
         self, request: AppointmentCreateRequest
     ) -> AppointmentResponse:
         """Book a new appointment and assign the next available time slot.
 
+        Slots the occupancy cache already knows to be taken are not offered to
+        the database, and a day the cache knows to be full is rejected without
+        a query.
+
         Args:
             request (AppointmentCreateRequest): The booking request.
 
@@ -77,22 +93,86 @@ class AppointmentService:
             ValueError: If no slots are available for the requested preference.
 
         """
-        assigned_time = self._assign_next_slot(
-            request.doctor_id, request.appointment_date, request.time_preference
+        appointment = self._to_entity(request)
+        available_slots = SLOTS[request.time_preference]
+        taken = self._slot_cache.taken(request.doctor_id, request.appointment_date)
+        candidates = [s for s in available_slots if not taken & slot_bit(s)]
+        created = (
+            await self._repo.create_in_first_free_slot(appointment, candidates)
+            if candidates
+            else None
         )
-        appointment = Appointment(
-            patient_id=request.patient_id,
-            doctor_id=request.doctor_id,
-            appointment_date=request.appointment_date,
-            time_preference=request.time_preference,
-            assigned_time=assigned_time,
-            notes=request.notes,
+        if created is None:
+            self._slot_cache.mark_taken(
+                request.doctor_id, request.appointment_date, candidates
+            )
+            raise ValueError(
+                f"No available {request.time_preference} slots for doctor "
+                f"{request.doctor_id} on {request.appointment_date}. "
+                f"All {len(available_slots)} slots are taken."
+            )
+        self._slot_cache.mark_taken(
+            created.doctor_id, created.appointment_date, [created.assigned_time]
         )
-        created = self._repo.create(appointment)
-        self._publish(created, APPOINTMENT_CREATED)
+        self._queue_snapshots.bump(created.doctor_id, created.appointment_date)
+        self._outbox.notify()
         return AppointmentResponse.from_entity(created)
 
-    def get_appointment(self, appointment_id: int) -> AppointmentResponse | None:
+    async def create_appointments(
+        self, request: AppointmentBulkCreateRequest
+    ) -> list[AppointmentBulkResult]:
+        """Book a batch of appointments in one transaction.
+
+        Slots are assigned per doctor and date in request order. Rows whose
+        preference is already full are reported as conflicts; the rest are
+        inserted together, with their events, in one transaction.
+
+        Args:
+            request (AppointmentBulkCreateRequest): The batch to book.
+
+        Returns:
+            list[AppointmentBulkResult]: One result per requested row, in order.
+
+        """
+        rows = request.appointments
+        created = await self._repo.create_many_in_free_slots(
+            [self._to_entity(row) for row in rows], SLOTS
+        )
+        results: list[AppointmentBulkResult] = []
+        for index, (row, appointment) in enumerate(zip(rows, created, strict=True)):
+            if appointment is None:
+                self._slot_cache.mark_taken(
+                    row.doctor_id, row.appointment_date, SLOTS[row.time_preference]
+                )
+                results.append(
+                    AppointmentBulkResult(
+                        index=index,
+                        status=BulkRowStatus.CONFLICT,
+                        message=(
+                            f"No available {row.time_preference} slots for doctor "
+                            f"{row.doctor_id} on {row.appointment_date}."
+                        ),
+                    )
+                )
+                continue
+            self._slot_cache.mark_taken(
+                appointment.doctor_id,
+                appointment.appointment_date,
+                [appointment.assigned_time],
+            )
+            results.append(
+                AppointmentBulkResult(
+                    index=index,
+                    status=BulkRowStatus.CREATED,
+                    appointment=AppointmentResponse.from_entity(appointment),
+                )
+            )
+        for day in {(a.doctor_id, a.appointment_date) for a in created if a}:
+            self._queue_snapshots.bump(*day)
+        self._outbox.notify()
+        return results
+
+    async def get_appointment(self, appointment_id: int) -> AppointmentResponse | None:
         """Get an appointment by ID.
 
         Args:
@@ -102,39 +182,93 @@ class AppointmentService:
             AppointmentResponse | None: The appointment if found, else None.
 
         """
-        appointment = self._repo.get_by_id(appointment_id)
+        appointment = await self._repo.get_by_id(appointment_id)
         return AppointmentResponse.from_entity(appointment) if appointment else None
 
-    def get_queue(
+    async def get_queue_snapshot(
         self, doctor_id: int, appointment_date: date
-    ) -> list[AppointmentResponse]:
-        """Get the ordered queue for a doctor on a specific date.
+    ) -> QueueSnapshot:
+        """Get the serialised queue for a doctor on a specific date.
+
+        The snapshot is rebuilt only after the queue changed, so polling an
+        idle queue does not touch the database.
 
         Args:
             doctor_id (int): The doctor's ID.
             appointment_date (date): The date of the session.
 
         Returns:
-            list[AppointmentResponse]: Appointments ordered by assigned_time.
+            QueueSnapshot: Appointments ordered by assigned_time, as JSON.
 
         """
-        appointments = self._repo.get_by_doctor_and_date(doctor_id, appointment_date)
-        return [AppointmentResponse.from_entity(a) for a in appointments]
+        version, snapshot = self._queue_snapshots.get(doctor_id, appointment_date)
+        if snapshot is not None:
+            return snapshot
+        # Read from the primary: a lagging replica would otherwise pin a stale
+        # queue in the snapshot until the next change.
+        appointments = await self._repo.get_by_doctor_and_date(
+            doctor_id, appointment_date, primary=True
+        )
+        return self._queue_snapshots.store(
+            doctor_id,
+            appointment_date,
+            version,
+            [AppointmentResponse.from_entity(a) for a in appointments],
+        )
+
+    async def release_connections(self) -> None:
+        """Return database connections held by this request to the pool."""
+        await self._repo.close()
 
-    def get_patient_appointments(self, patient_id: int) -> list[AppointmentResponse]:
-        """Get all appointments for a patient.
+    async def get_patient_appointments(
+        self, patient_id: int, query: PatientHistoryQuery
+    ) -> AppointmentPage:
+        """Get one page of a patient's appointments, newest first.
 
         Args:
             patient_id (int): The patient's ID.
+            query (PatientHistoryQuery): Filters, page size and cursor.
 
         Returns:
-            list[AppointmentResponse]: The patient's appointments.
+            AppointmentPage: The appointments and the cursor of the next page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
 
         """
-        appointments = self._repo.get_by_patient_id(patient_id)
-        return [AppointmentResponse.from_entity(a) for a in appointments]
+        after = AppointmentPage.decode_cursor(query.cursor) if query.cursor else None
+        # One extra row tells whether another page follows.
+        appointments = await self._repo.get_page_by_patient_id(
+            patient_id, query, query.limit + 1, after
+        )
+        page = appointments[: query.limit]
+        return AppointmentPage(
+            items=[AppointmentResponse.from_entity(a) for a in page],
+            next_cursor=(
+                AppointmentPage.encode_cursor(page[-1])
+                if len(appointments) > query.limit
+                else None
+            ),
+        )
 
-    def update_status(
+    async def stream_patient_appointments(
+        self, patient_id: int, query: PatientHistoryQuery
+    ) -> AsyncIterator[bytes]:
+        """Stream a patient's whole history as newline-delimited JSON.
+
+        Args:
+            patient_id (int): The patient's ID.
+            query (PatientHistoryQuery): Date range and status filters.
+
+        Yields:
+            bytes: One JSON-encoded AppointmentResponse per line.
+
+        """
+        async for appointment in self._repo.stream_by_patient_id(patient_id, query):
+            response = AppointmentResponse.from_entity(appointment)
+            yield response.model_dump_json().encode() + b"\n"
+
+    async def update_status(
         self, appointment_id: int, request: AppointmentStatusUpdateRequest
     ) -> AppointmentResponse | None:
         """Update the status of an appointment.
@@ -146,15 +280,26 @@ class AppointmentService:
         Returns:
             AppointmentResponse | None: The updated appointment, or None if not found.
 
+        Raises:
+            ValueError: If reactivating the appointment would double-book its slot.
+
         """
-        appointment = self._repo.get_by_id(appointment_id)
-        if appointment is None:
+        updated = await self._repo.update_status(appointment_id, request.status)
+        if updated is None:
             return None
-        updated = self._repo.update_status(appointment, request.status)
-        self._publish(updated, APPOINTMENT_STATUS_CHANGED)
+        if updated.status == AppointmentStatus.CANCELLED:
+            self._slot_cache.mark_free(
+                updated.doctor_id, updated.appointment_date, updated.assigned_time
+            )
+        else:
+            self._slot_cache.mark_taken(
+                updated.doctor_id, updated.appointment_date, [updated.assigned_time]
+            )
+        self._queue_snapshots.bump(updated.doctor_id, updated.appointment_date)
+        self._outbox.notify()
         return AppointmentResponse.from_entity(updated)
 
-    def reorder_queue(
+    async def reorder_queue(
         self, doctor_id: int, appointment_date: date, request: QueueReorderRequest
     ) -> list[AppointmentResponse]:
         """Reorder the queue for a doctor session by reassigning time slots.
@@ -175,7 +320,9 @@ class AppointmentService:
                         to the given doctor and date.
 
         """
-        appointments = self._repo.get_by_doctor_and_date(doctor_id, appointment_date)
+        appointments = await self._repo.get_by_doctor_and_date(
+            doctor_id, appointment_date, primary=True
+        )
         appointments_by_id = {a.id: a for a in appointments}
 
         if set(request.appointment_ids) != set(appointments_by_id.keys()):
@@ -196,75 +343,38 @@ class AppointmentService:
             if appointments_by_id[i].time_preference == TimePreference.PM
         ]
 
-        updated: list[Appointment] = []
+        new_slots: dict[int, time] = {}
         for ids, preference in (
             (am_ids, TimePreference.AM),
             (pm_ids, TimePreference.PM),
         ):
             slots = SLOTS[preference]
             for position, appointment_id in enumerate(ids):
-                appointment = appointments_by_id[appointment_id]
-                appointment.assigned_time = slots[position]
-                updated.append(appointment)
+                new_slots[appointment_id] = slots[position]
 
-        saved = self._repo.reorder(updated)
+        saved = await self._repo.reorder(new_slots)
+        self._slot_cache.replace(
+            doctor_id, appointment_date, [a.assigned_time for a in saved]
+        )
+        self._queue_snapshots.bump(doctor_id, appointment_date)
+        self._outbox.notify()
         return [AppointmentResponse.from_entity(a) for a in saved]
 
-    def _assign_next_slot(
-        self,
-        doctor_id: int,
-        appointment_date: date,
-        time_preference: TimePreference,
-    ) -> time:
-        """Find and return the next available time slot.
+    @staticmethod
+    def _to_entity(request: AppointmentCreateRequest) -> Appointment:
+        """Build an unsaved appointment from a booking request.
 
         Args:
-            doctor_id (int): The doctor's ID.
-            appointment_date (date): The requested date.
-            time_preference (TimePreference): AM or PM.
+            request (AppointmentCreateRequest): The booking request.
 
         Returns:
-            time: The assigned time slot.
-
-        Raises:
-            ValueError: If all slots for this preference are taken.
+            Appointment: The appointment, without an assigned slot.
 
         """
-        existing = self._repo.get_by_doctor_date_and_preference(
-            doctor_id, appointment_date, time_preference
-        )
-        taken_times = {a.assigned_time for a in existing}
-        available_slots = SLOTS[time_preference]
-
-        for slot in available_slots:
-            if slot not in taken_times:
-                return slot
-
-        raise ValueError(
-            f"No available {time_preference} slots for doctor {doctor_id} "
-            f"on {appointment_date}. All {len(available_slots)} slots are taken."
+        return Appointment(
+            patient_id=request.patient_id,
+            doctor_id=request.doctor_id,
+            appointment_date=request.appointment_date,
+            time_preference=request.time_preference,
+            notes=request.notes,
         )
-
-    def _publish(self, appointment: Appointment, exchange: str) -> None:
-        try:
-            task = asyncio.create_task(
-                self._messaging.get_pubsub(exchange).publish(
-                    AppointmentMessage.from_entity(appointment)
-                )
-            )
-            task.add_done_callback(AppointmentService._log_task_exception)
-        except RuntimeError:
-            logger.exception("Failed to publish event to exchange '%s'", exchange)
-
-    @staticmethod
-    def _log_task_exception(task: asyncio.Task) -> None:
-        """Log exceptions from background publish tasks.
-
-        Args:
-            task (asyncio.Task): The completed task.
-
-        """
-        try:
-            task.result()
-        except Exception as e:
-            logger.exception("Background publish failed: %s", e)
@@ -0,0 +1,87 @@
+"""Routes appointment events to this replica's caches and live queue clients."""
+
+from collections.abc import Awaitable, Callable
+
+from src.messaging.messaging_manager import MessagingManager
+from src.messaging.pubsub_exchanges import (
+    APPOINTMENT_CREATED,
+    APPOINTMENT_QUEUE_REORDERED,
+    APPOINTMENT_STATUS_CHANGED,
+)
+from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.appointment_message import AppointmentMessage
+from src.models.msg.queue_reordered_message import QueueReorderedMessage
+from src.services.queue_broadcaster import queue_broadcaster
+from src.services.queue_snapshot_cache import queue_snapshot_cache
+from src.services.slot_occupancy_cache import slot_occupancy_cache
+
+Handler = Callable[[AbstractMessage], Awaitable[None]]
+
+# A facade runs a single consumer per exchange, so every cache and the live
+# queue broadcaster are served by the same subscription. Caches come first so
+# that a client reloading on an event sees the change.
+EVENT_HANDLERS: dict[str, tuple[type[AbstractMessage], list[Handler]]] = {
+    APPOINTMENT_CREATED: (
+        AppointmentMessage,
+        [
+            slot_occupancy_cache.on_appointment_created,
+            queue_snapshot_cache.on_queue_changed,
+            queue_broadcaster.on_appointment_event,
+        ],
+    ),
+    APPOINTMENT_STATUS_CHANGED: (
+        AppointmentMessage,
+        [
+            slot_occupancy_cache.on_appointment_status_changed,
+            queue_snapshot_cache.on_queue_changed,
+            queue_broadcaster.on_appointment_event,
+        ],
+    ),
+    APPOINTMENT_QUEUE_REORDERED: (
+        QueueReorderedMessage,
+        [
+            slot_occupancy_cache.on_queue_reordered,
+            queue_snapshot_cache.on_queue_changed,
+            queue_broadcaster.on_queue_reordered,
+        ],
+    ),
+}
+
+
+def _fan_out(handlers: list[Handler]) -> Handler:
+    """Combine several event handlers into one callback.
+
+    Args:
+        handlers (list[Handler]): The handlers to call in order.
+
+    Returns:
+        Handler: A callback invoking every handler with the message.
+
+    """
+
+    async def handle(message: AbstractMessage) -> None:
+        for handler in handlers:
+            await handler(message)
+
+    return handle
+
+
+def subscribe_event_handlers(messaging: MessagingManager, replica_id: str) -> None:
+    """Subscribe this replica's caches and broadcaster to the appointment exchanges.
+
+    Each replica keeps its own caches and client connections, so it consumes
+    from exclusive queues of its own rather than competing with other
+    replicas for the events.
+
+    Args:
+        messaging (MessagingManager): The started messaging manager.
+        replica_id (str): A name unique to this process.
+
+    """
+    for exchange, (message_class, handlers) in EVENT_HANDLERS.items():
+        messaging.get_pubsub(exchange).subscribe(
+            f"{exchange}.replica.{replica_id}",
+            _fan_out(handlers),
+            message_class,
+            exclusive=True,
+        )
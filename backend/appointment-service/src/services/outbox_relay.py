@@ -0,0 +1,154 @@
+"""Background relay from the outbox table to the message broker."""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from contextlib import suppress
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.messaging.messaging_manager import MessagingManager
+from src.models.db.outbox_event import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1"))
+# How long stopping the relay keeps publishing pending events.
+OUTBOX_FLUSH_TIMEOUT = float(os.getenv("OUTBOX_FLUSH_TIMEOUT", "5"))
+
+
+class OutboxRelay:
+    """Publishes committed outbox events and deletes them once confirmed.
+
+    Requests only insert outbox rows and notify the relay, so the broker is
+    off the request path. Events are claimed with ``FOR UPDATE SKIP LOCKED``,
+    so the relays of several replicas share the work, and deleted in the same
+    transaction after the broker confirmed them. A crash between the confirm
+    and the commit publishes an event again, so delivery is at least once and
+    consumers must tolerate duplicates.
+
+    The outbox is the buffer of outgoing events. Unlike an in-memory queue
+    it survives restarts and never makes a request wait for the broker; the
+    relay holds at most ``batch_size`` events at a time, of which the facade
+    keeps ``PUBLISH_BATCH_SIZE`` awaiting confirms at once, and ``flush``
+    waits until every pending event is confirmed.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        messaging: MessagingManager,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_seconds: float = OUTBOX_POLL_SECONDS,
+        flush_timeout: float = OUTBOX_FLUSH_TIMEOUT,
+    ) -> None:
+        """Initialize a stopped relay.
+
+        Args:
+            session_factory (async_sessionmaker[AsyncSession]): Sessions on the
+                primary database.
+            messaging (MessagingManager): The messaging manager to publish with.
+            batch_size (int): Maximum events claimed per transaction.
+            poll_seconds (float): Idle time between outbox checks when not
+                notified, which picks up events written by other replicas.
+            flush_timeout (float): How long ``stop`` keeps publishing pending
+                events before leaving them to the next start.
+
+        """
+        self._session_factory = session_factory
+        self._messaging = messaging
+        self._batch_size = batch_size
+        self._poll_seconds = poll_seconds
+        self._flush_timeout = flush_timeout
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start relaying in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop relaying after a bounded flush; the rest stays in the outbox."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), self._flush_timeout)
+        except Exception as e:
+            logger.warning("Outbox not flushed before stopping: %r", e)
+
+    def notify(self) -> None:
+        """Signal that new events were committed."""
+        self._wake.set()
+
+    async def relay_once(self) -> int:
+        """Publish and delete one batch of outbox events.
+
+        Returns:
+            int: The number of events relayed.
+
+        Raises:
+            Exception: If publishing failed; the batch stays in the outbox.
+
+        """
+        async with self._session_factory() as session:
+            events = (
+                await session.exec(
+                    select(OutboxEvent)
+                    .order_by(OutboxEvent.id)
+                    .limit(self._batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+            ).all()
+            if not events:
+                return 0
+            bodies: dict[str, list[bytes]] = defaultdict(list)
+            for event in events:
+                bodies[event.exchange].append(event.payload.encode())
+            for exchange, exchange_bodies in bodies.items():
+                await self._messaging.get_pubsub(exchange).publish_bodies(
+                    exchange_bodies
+                )
+            await session.exec(
+                delete(OutboxEvent).where(
+                    col(OutboxEvent.id).in_([event.id for event in events])
+                )
+            )
+            await session.commit()
+        return len(events)
+
+    async def flush(self) -> int:
+        """Relay batches until no unclaimed events are left in the outbox.
+
+        Returns:
+            int: The number of events relayed.
+
+        Raises:
+            Exception: If publishing failed; unrelayed events stay in the outbox.
+
+        """
+        total = 0
+        while relayed := await self.relay_once():
+            total += relayed
+        return total
+
+    async def _run(self) -> None:
+        """Relay until cancelled, sleeping while the outbox is drained."""
+        while True:
+            try:
+                relayed = await self.relay_once()
+            except Exception as e:
+                logger.exception("Outbox relay failed: %s", e)
+                relayed = 0
+            if relayed < self._batch_size:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self._poll_seconds)
+                self._wake.clear()
@@ -0,0 +1,199 @@
+"""Fan-out of live queue changes to Server-Sent Events clients."""
+
+import asyncio
+import json
+import os
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+
+from src.models.db.appointment import AppointmentStatus
+from src.models.msg.appointment_message import AppointmentMessage
+from src.models.msg.queue_reordered_message import QueueReorderedMessage
+
+QUEUE_EVENTS_MAX_PENDING = int(os.getenv("QUEUE_EVENTS_MAX_PENDING", "100"))
+QUEUE_EVENTS_KEEPALIVE_SECONDS = float(
+    os.getenv("QUEUE_EVENTS_KEEPALIVE_SECONDS", "15")
+)
+
+Key = tuple[int, date]
+
+
+@dataclass(frozen=True)
+class QueueEvent:
+    """A single change to a queue, as sent to clients.
+
+    Attributes:
+        event (str): snapshot, upsert, remove, reordered or resync.
+        data (str): The JSON payload.
+
+    """
+
+    event: str
+    data: str
+
+    def encode(self) -> str:
+        """Render the event in Server-Sent Events framing.
+
+        Returns:
+            str: The event block, terminated by a blank line.
+
+        """
+        return f"event: {self.event}\ndata: {self.data}\n\n"
+
+
+RESYNC = QueueEvent("resync", "{}")
+
+
+class QueueBroadcaster:
+    """Pushes queue diffs from the broker to every client watching a queue.
+
+    The process consumes each appointment exchange once and this class fans
+    the events out in memory, so open screens add no broker consumers and no
+    database polling. A client that falls more than max_pending events
+    behind gets a resync event and should reload the queue.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = QUEUE_EVENTS_MAX_PENDING,
+        keepalive_seconds: float = QUEUE_EVENTS_KEEPALIVE_SECONDS,
+    ) -> None:
+        """Initialize a broadcaster with no subscribers.
+
+        Args:
+            max_pending (int): Events buffered per client before it must resync.
+            keepalive_seconds (float): Idle time after which a comment is sent
+                to keep proxies from closing the connection.
+
+        """
+        self._max_pending = max_pending
+        self._keepalive_seconds = keepalive_seconds
+        self._subscribers: dict[Key, set[asyncio.Queue[QueueEvent]]] = defaultdict(set)
+
+    @contextmanager
+    def subscribe(
+        self, doctor_id: int, appointment_date: date
+    ) -> Iterator[asyncio.Queue[QueueEvent]]:
+        """Register a client for one queue for the duration of the block.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+
+        Yields:
+            asyncio.Queue[QueueEvent]: The client's pending events.
+
+        """
+        key = (doctor_id, appointment_date)
+        events: asyncio.Queue[QueueEvent] = asyncio.Queue(self._max_pending)
+        self._subscribers[key].add(events)
+        try:
+            yield events
+        finally:
+            self._subscribers[key].discard(events)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+    async def stream(
+        self,
+        doctor_id: int,
+        appointment_date: date,
+        load_snapshot: Callable[[], Awaitable[bytes]],
+        is_disconnected: Callable[[], Awaitable[bool]],
+    ) -> AsyncIterator[str]:
+        """Stream a queue as a snapshot followed by its changes.
+
+        The client is subscribed before the snapshot is loaded, so no change
+        falls between the two; a change already in the snapshot may be sent
+        again, which upserts tolerate.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+            load_snapshot (Callable[[], Awaitable[bytes]]): Returns the current
+                queue as a JSON array.
+            is_disconnected (Callable[[], Awaitable[bool]]): Reports whether the
+                client went away.
+
+        Yields:
+            str: Server-Sent Events blocks.
+
+        """
+        with self.subscribe(doctor_id, appointment_date) as events:
+            snapshot = await load_snapshot()
+            yield QueueEvent("snapshot", snapshot.decode()).encode()
+            while not await is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        events.get(), self._keepalive_seconds
+                    )
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield event.encode()
+
+    def publish(
+        self, doctor_id: int, appointment_date: date, event: QueueEvent
+    ) -> None:
+        """Queue an event for every client watching a queue.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+            event (QueueEvent): The change to send.
+
+        """
+        for events in self._subscribers.get((doctor_id, appointment_date), ()):
+            if events.full():
+                while not events.empty():
+                    events.get_nowait()
+                event_to_send = RESYNC
+            else:
+                event_to_send = event
+            events.put_nowait(event_to_send)
+
+    async def on_appointment_event(self, message: AppointmentMessage) -> None:
+        """Send a created or status-changed appointment to its queue's clients.
+
+        Cancelled appointments leave the queue, so they are sent as remove.
+
+        Args:
+            message (AppointmentMessage): The appointment event.
+
+        """
+        removed = message.status == AppointmentStatus.CANCELLED
+        self.publish(
+            message.doctor_id,
+            message.appointment_date,
+            QueueEvent("remove" if removed else "upsert", message.model_dump_json()),
+        )
+
+    async def on_queue_reordered(self, message: QueueReorderedMessage) -> None:
+        """Send a reorder to its queue's clients.
+
+        Args:
+            message (QueueReorderedMessage): The reorder event.
+
+        """
+        slots = {
+            str(appointment_id): assigned_time.isoformat()
+            for appointment_id, assigned_time in zip(
+                message.appointment_ids, message.assigned_times, strict=True
+            )
+        }
+        self.publish(
+            message.doctor_id,
+            message.appointment_date,
+            QueueEvent("reordered", json.dumps({"assigned_times": slots})),
+        )
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected clients across all queues."""
+        return sum(len(events) for events in self._subscribers.values())
+
+
+queue_broadcaster = QueueBroadcaster()
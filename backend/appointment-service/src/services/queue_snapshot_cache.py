@@ -0,0 +1,151 @@
+"""Pre-serialised daily queue snapshots with versioned invalidation."""
+
+import hashlib
+import itertools
+import os
+import time as clock
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+
+from pydantic import TypeAdapter
+
+from src.models.dto.appointment_response import AppointmentResponse
+from src.models.msg.abstract_message import AbstractMessage
+
+QUEUE_SNAPSHOT_MAX_ENTRIES = int(os.getenv("QUEUE_SNAPSHOT_MAX_ENTRIES", "10000"))
+QUEUE_SNAPSHOT_TTL_SECONDS = float(os.getenv("QUEUE_SNAPSHOT_TTL_SECONDS", "300"))
+
+Key = tuple[int, date]
+
+_QUEUE_ADAPTER = TypeAdapter(list[AppointmentResponse])
+
+
+@dataclass(frozen=True)
+class QueueSnapshot:
+    """A serialised queue and the strong ETag of its body."""
+
+    version: int
+    etag: str
+    body: bytes
+
+
+class QueueSnapshotCache:
+    """LRU cache of serialised (doctor_id, date) queues.
+
+    Every change to a queue bumps its version, which discards the snapshot
+    so the next read rebuilds it. Versions come from one counter, so a
+    snapshot built while a change was in flight is never stored under the
+    newer version. The ETag is a hash of the body, so every replica hands
+    out the same tag for the same queue.
+
+    Other replicas' changes arrive through the pub/sub events. Snapshots
+    expire after a TTL, which bounds staleness if an event is missed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = QUEUE_SNAPSHOT_MAX_ENTRIES,
+        ttl_seconds: float = QUEUE_SNAPSHOT_TTL_SECONDS,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of (doctor_id, date) entries kept.
+            ttl_seconds (float): Seconds after which a snapshot is rebuilt.
+
+        """
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._versions = itertools.count(1)
+        self._entries: OrderedDict[Key, tuple[int, QueueSnapshot | None, float]] = (
+            OrderedDict()
+        )
+
+    def get(
+        self, doctor_id: int, appointment_date: date
+    ) -> tuple[int, QueueSnapshot | None]:
+        """Return the current version of a queue and its snapshot, if fresh.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+
+        Returns:
+            tuple[int, QueueSnapshot | None]: The version to pass to store,
+                and the snapshot, or None if it must be rebuilt.
+
+        """
+        key = (doctor_id, appointment_date)
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0, None
+        version, snapshot, expires_at = entry
+        self._entries.move_to_end(key)
+        if snapshot is not None and clock.monotonic() >= expires_at:
+            return version, None
+        return version, snapshot
+
+    def store(
+        self,
+        doctor_id: int,
+        appointment_date: date,
+        version: int,
+        appointments: list[AppointmentResponse],
+    ) -> QueueSnapshot:
+        """Serialise a queue and cache it if no change happened meanwhile.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+            version (int): The version returned by get before the queue was read.
+            appointments (list[AppointmentResponse]): The queue, in order.
+
+        Returns:
+            QueueSnapshot: The snapshot, cached or not.
+
+        """
+        body = _QUEUE_ADAPTER.dump_json(appointments)
+        snapshot = QueueSnapshot(
+            version=version,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            body=body,
+        )
+        key = (doctor_id, appointment_date)
+        current = self._entries[key][0] if key in self._entries else 0
+        if current == version:
+            self._put(key, version, snapshot)
+        return snapshot
+
+    def bump(self, doctor_id: int, appointment_date: date) -> None:
+        """Mark a queue as changed, discarding its snapshot.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+
+        """
+        self._put((doctor_id, appointment_date), next(self._versions), None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    async def on_queue_changed(self, message: AbstractMessage) -> None:
+        """Bump the queue an appointment event refers to.
+
+        Args:
+            message (AbstractMessage): An event carrying doctor_id and
+                appointment_date.
+
+        """
+        self.bump(message.doctor_id, message.appointment_date)
+
+    def _put(self, key: Key, version: int, snapshot: QueueSnapshot | None) -> None:
+        self._entries[key] = (version, snapshot, clock.monotonic() + self._ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+queue_snapshot_cache = QueueSnapshotCache()
@@ -0,0 +1,192 @@
+"""In-process cache of which slots are taken per doctor and day."""
+
+import os
+import time as clock
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import date, time
+
+from src.models.msg.appointment_message import AppointmentMessage
+from src.models.msg.queue_reordered_message import QueueReorderedMessage
+
+SLOT_CACHE_MAX_ENTRIES = int(os.getenv("SLOT_CACHE_MAX_ENTRIES", "10000"))
+SLOT_CACHE_TTL_SECONDS = float(os.getenv("SLOT_CACHE_TTL_SECONDS", "300"))
+
+Key = tuple[int, date]
+
+
+def slot_bit(slot: time) -> int:
+    """Return the bitmask bit for an hourly slot.
+
+    Args:
+        slot (time): The slot start time.
+
+    Returns:
+        int: A mask with only the slot's hour set.
+
+    """
+    return 1 << slot.hour
+
+
+class SlotOccupancyCache:
+    """LRU cache of known-taken slots, one bitmask per (doctor_id, date).
+
+    Slots are whole hours, so the AM and PM windows of a day fit in one
+    24-bit mask and a preference's occupancy is that mask restricted to its
+    slots. A set bit means the slot was seen taken, so it is skipped without
+    asking Postgres. A clear bit only means "not known to be taken"; the
+    booking insert still decides.
+
+    Other replicas' bookings arrive through the pub/sub events. Entries
+    expire after a TTL, which bounds staleness if an event is missed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SLOT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = SLOT_CACHE_TTL_SECONDS,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of (doctor_id, date) entries kept.
+            ttl_seconds (float): Seconds after which an entry is discarded.
+
+        """
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Key, tuple[int, float]] = OrderedDict()
+
+    def taken(self, doctor_id: int, appointment_date: date) -> int:
+        """Return the mask of slots known to be taken.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+
+        Returns:
+            int: The occupancy bitmask, 0 when nothing is cached.
+
+        """
+        key = (doctor_id, appointment_date)
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0
+        mask, expires_at = entry
+        if clock.monotonic() >= expires_at:
+            del self._entries[key]
+            return 0
+        self._entries.move_to_end(key)
+        return mask
+
+    def mark_taken(
+        self, doctor_id: int, appointment_date: date, slots: Iterable[time | None]
+    ) -> None:
+        """Record slots as taken.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+            slots (Iterable[time | None]): The taken slots; None is ignored.
+
+        """
+        mask = self.taken(doctor_id, appointment_date)
+        for slot in slots:
+            if slot is not None:
+                mask |= slot_bit(slot)
+        self._store(doctor_id, appointment_date, mask)
+
+    def mark_free(
+        self, doctor_id: int, appointment_date: date, slot: time | None
+    ) -> None:
+        """Record a slot as released.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+            slot (time | None): The released slot; None is ignored.
+
+        """
+        key = (doctor_id, appointment_date)
+        if slot is None or key not in self._entries:
+            return
+        self._store(
+            doctor_id,
+            appointment_date,
+            self.taken(doctor_id, appointment_date) & ~slot_bit(slot),
+        )
+
+    def replace(
+        self, doctor_id: int, appointment_date: date, slots: Iterable[time | None]
+    ) -> None:
+        """Overwrite an entry with the complete set of taken slots.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+            slots (Iterable[time | None]): Every taken slot of the day.
+
+        """
+        self.invalidate(doctor_id, appointment_date)
+        self.mark_taken(doctor_id, appointment_date, slots)
+
+    def invalidate(self, doctor_id: int, appointment_date: date) -> None:
+        """Drop the entry for a doctor and day.
+
+        Args:
+            doctor_id (int): The doctor's ID.
+            appointment_date (date): The day of the session.
+
+        """
+        self._entries.pop((doctor_id, appointment_date), None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    async def on_appointment_created(self, message: AppointmentMessage) -> None:
+        """Mark the slot of an appointment booked anywhere as taken.
+
+        Only days already cached are updated, so that events for days this
+        replica never serves do not fill the cache.
+
+        Args:
+            message (AppointmentMessage): The appointment.created event.
+
+        """
+        if (message.doctor_id, message.appointment_date) in self._entries:
+            self.mark_taken(
+                message.doctor_id, message.appointment_date, [message.assigned_time]
+            )
+
+    async def on_appointment_status_changed(self, message: AppointmentMessage) -> None:
+        """Invalidate the day of an appointment whose status changed anywhere.
+
+        A cancellation frees a slot and a reactivation takes one, and events
+        from different exchanges may arrive out of order, so the day is
+        re-learned rather than patched.
+
+        Args:
+            message (AppointmentMessage): The appointment.status_changed event.
+
+        """
+        self.invalidate(message.doctor_id, message.appointment_date)
+
+    async def on_queue_reordered(self, message: QueueReorderedMessage) -> None:
+        """Invalidate a day whose queue was reordered anywhere.
+
+        Args:
+            message (QueueReorderedMessage): The appointment.queue_reordered event.
+
+        """
+        self.invalidate(message.doctor_id, message.appointment_date)
+
+    def _store(self, doctor_id: int, appointment_date: date, mask: int) -> None:
+        key = (doctor_id, appointment_date)
+        self._entries[key] = (mask, clock.monotonic() + self._ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+slot_occupancy_cache = SlotOccupancyCache()
@@ -1,23 +1,31 @@
 """Integration tests for appointment API flow."""
 
-from typing import Generator
+import json
+from typing import AsyncGenerator, Generator
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from testcontainers.postgres import PostgresContainer
 
 from main import app
-from src.api.dependencies import get_appointment_repository
+from src.api.dependencies import get_db_session, to_async_url
 from src.messaging.messaging_manager import MessagingManager
-from src.repositories.appointment_repository import AppointmentRepository
+from src.services.queue_snapshot_cache import queue_snapshot_cache
+from src.services.slot_occupancy_cache import slot_occupancy_cache
 
 HTTP_200 = 200
 HTTP_201 = 201
+HTTP_304 = 304
+HTTP_400 = 400
 HTTP_404 = 404
 HTTP_409 = 409
 MIN_EXPECTED_APPOINTMENTS = 2
+STREAMED_PATIENT_ID = 43
 
 
 class DummyMessaging:
@@ -48,34 +56,44 @@ def postgres_container() -> Generator[PostgresContainer, None, None]:
 
 
 @pytest.fixture
-def db_session(postgres_container: PostgresContainer) -> Generator[Session, None, None]:
-    """Create tables and yield a session."""
+def db_engine(
+    postgres_container: PostgresContainer,
+) -> Generator[AsyncEngine, None, None]:
+    """Create tables and yield an async engine bound to the test database."""
     db_url = postgres_container.get_connection_url()
-    engine = create_engine(db_url, echo=False)
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as session:
-        yield session
-    SQLModel.metadata.drop_all(engine)
-    engine.dispose()
+    sync_engine = create_engine(db_url, echo=False)
+    SQLModel.metadata.create_all(sync_engine)
+    # NullPool keeps asyncpg connections from outliving the TestClient loop.
+    yield create_async_engine(to_async_url(db_url), poolclass=NullPool)
+    SQLModel.metadata.drop_all(sync_engine)
+    sync_engine.dispose()
 
 
 @pytest.fixture
-def client(db_session: Session) -> Generator[TestClient, None, None]:
+def client(db_engine: AsyncEngine) -> Generator[TestClient, None, None]:
     """Return a TestClient with overridden dependencies."""
 
-    def override_repo() -> AppointmentRepository:
-        return AppointmentRepository(db_session)
+    async def override_session() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(db_engine, expire_on_commit=False) as session:
+            yield session
 
     # Mock messaging so lifespan doesn't try to connect to RabbitMQ
     mock_messaging = MagicMock(spec=MessagingManager)
     mock_messaging.start_all = AsyncMock()
     mock_messaging.stop_all = AsyncMock()
-    mock_messaging.get_pubsub = MagicMock(return_value=MagicMock(publish=AsyncMock()))
+    mock_messaging.get_pubsub = MagicMock(
+        return_value=MagicMock(publish_bodies=AsyncMock())
+    )
+    mock_messaging.publish_stats = MagicMock(return_value={})
 
-    app.dependency_overrides[get_appointment_repository] = override_repo
+    app.dependency_overrides[get_db_session] = override_session
+    # Tables are recreated per test, so anything cached earlier is stale.
+    slot_occupancy_cache.clear()
+    queue_snapshot_cache.clear()
 
     with (
         patch("main.messaging_manager", mock_messaging),
+        patch("main.outbox_relay", MagicMock(stop=AsyncMock())),
         TestClient(app, raise_server_exceptions=False) as c,
     ):
         yield c
@@ -125,6 +143,40 @@ def test_create_appointment_assigns_sequential_slots(client: TestClient) -> None
     assert slots == ["08:00:00", "09:00:00"]
 
 
+def test_get_queue_answers_304_until_queue_changes(client: TestClient) -> None:
+    """A poll with the current ETag should get 304; a booking changes the tag."""
+    booking = {
+        "patient_id": 1,
+        "doctor_id": 5,
+        "appointment_date": "2026-03-14",
+        "time_preference": "AM",
+    }
+    params = {"doctor_id": 5, "appointment_date": "2026-03-14"}
+    client.post("/api/v1/appointments", json=booking)
+    first = client.get("/api/v1/appointments/queue/day", params=params)
+    assert first.status_code == HTTP_200
+    assert len(first.json()) == 1
+    etag = first.headers["etag"]
+
+    unchanged = client.get(
+        "/api/v1/appointments/queue/day",
+        params=params,
+        headers={"If-None-Match": etag},
+    )
+    assert unchanged.status_code == HTTP_304
+    assert unchanged.content == b""
+
+    client.post("/api/v1/appointments", json={**booking, "patient_id": 2})
+    changed = client.get(
+        "/api/v1/appointments/queue/day",
+        params=params,
+        headers={"If-None-Match": etag},
+    )
+    assert changed.status_code == HTTP_200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == MIN_EXPECTED_APPOINTMENTS
+
+
 def test_create_appointment_returns_409_when_full(client: TestClient) -> None:
     """Should return 409 when all slots are taken."""
     for i in range(4):
@@ -153,6 +205,24 @@ def test_create_appointment_returns_409_when_full(client: TestClient) -> None:
 # ── GET /api/v1/appointments/{id}
 
 
+def test_bulk_create_returns_per_row_results(client: TestClient) -> None:
+    """A bulk booking should create what fits and flag the rest as conflicts."""
+    rows = [
+        {
+            "patient_id": i,
+            "doctor_id": 4,
+            "appointment_date": "2026-03-13",
+            "time_preference": "PM",
+        }
+        for i in range(5)
+    ]
+    response = client.post("/api/v1/appointments/bulk", json={"appointments": rows})
+    assert response.status_code == HTTP_200
+    statuses = [r["status"] for r in response.json()]
+    assert statuses == ["created"] * 4 + ["conflict"]
+    assert response.json()[0]["appointment"]["assigned_time"] == "13:00:00"
+
+
 def test_get_appointment_returns_200(client: TestClient) -> None:
     """Should return appointment details."""
     create = client.post(
@@ -211,9 +281,9 @@ def test_update_status_returns_404_when_not_found(client: TestClient) -> None:
 # ── GET /api/v1/appointments/patient/{id}
 
 
-def test_get_patient_appointments_returns_list(client: TestClient) -> None:
-    """Should return all appointments for a patient."""
-    for i in range(2):
+def test_get_patient_appointments_returns_pages(client: TestClient) -> None:
+    """Should page through a patient's appointments with a cursor."""
+    for i in range(3):
         client.post(
             "/api/v1/appointments",
             json={
@@ -223,6 +293,50 @@ def test_get_patient_appointments_returns_list(client: TestClient) -> None:
                 "time_preference": "AM",
             },
         )
-    response = client.get("/api/v1/appointments/patient/42")
+    response = client.get("/api/v1/appointments/patient/42", params={"limit": 2})
+    assert response.status_code == HTTP_200
+    first = response.json()
+    assert len(first["items"]) == MIN_EXPECTED_APPOINTMENTS
+    response = client.get(
+        "/api/v1/appointments/patient/42",
+        params={"limit": 2, "cursor": first["next_cursor"]},
+    )
+    second = response.json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+
+def test_get_patient_appointments_rejects_bad_cursor(client: TestClient) -> None:
+    """A malformed cursor should return 400."""
+    response = client.get("/api/v1/appointments/patient/42", params={"cursor": "x"})
+    assert response.status_code == HTTP_400
+
+
+def test_stream_patient_appointments_returns_ndjson(client: TestClient) -> None:
+    """The stream should return one JSON appointment per line."""
+    for i in range(2):
+        client.post(
+            "/api/v1/appointments",
+            json={
+                "patient_id": STREAMED_PATIENT_ID,
+                "doctor_id": 9 + i,
+                "appointment_date": "2026-03-16",
+                "time_preference": "PM",
+            },
+        )
+    response = client.get(f"/api/v1/appointments/patient/{STREAMED_PATIENT_ID}/stream")
+    assert response.status_code == HTTP_200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert len(lines) == MIN_EXPECTED_APPOINTMENTS
+    assert json.loads(lines[0])["patient_id"] == STREAMED_PATIENT_ID
+
+
+# ── GET /metrics
+
+
+def test_metrics_exposes_pool_stats(client: TestClient) -> None:
+    """The metrics endpoint should report the database pool gauges."""
+    response = client.get("/metrics")
     assert response.status_code == HTTP_200
-    assert len(response.json()) >= MIN_EXPECTED_APPOINTMENTS
+    assert {"checked_out", "overflow", "waits"} <= response.json()["db_pool"].keys()
@@ -5,6 +5,7 @@ from typing import Any, Awaitable, Callable, Generator
 import pytest
 
 from src.messaging.pubsub_facade import MessageType, PubSubFacade
+from src.models.msg.codecs import JSON
 from tests.integration.messaging.utils.rabbitmq_container import (
     EXCHANGE_NAME,
     QUEUE_NAME,
@@ -102,3 +103,33 @@ async def _subscribe_to_exchange(
     await facade.connect()
     facade.subscribe(QUEUE_NAME, on_message_callback, DummyMessage)
     return facade
+
+
+@pytest.mark.asyncio
+async def test_published_bodies_are_confirmed_and_delivered(
+    _rabbitmq_container: RabbitMqContainer,  # noqa: F811, PT019
+) -> None:
+    """Bodies should be confirmed, counted and delivered in order."""
+    received_messages = []
+    all_received = asyncio.Event()
+    count = 10
+
+    async def on_message(message: DummyMessage) -> None:
+        received_messages.append(message)
+        if len(received_messages) == count:
+            all_received.set()
+
+    subscriber_facade = await _subscribe_to_exchange(_rabbitmq_container, on_message)
+    await asyncio.sleep(1)
+
+    publisher = PubSubFacade(get_amqp_url(_rabbitmq_container), EXCHANGE_NAME)
+    await publisher.connect()
+    await publisher.publish_bodies(
+        [DummyMessage(content=str(i)).to_bytes(JSON) for i in range(count)]
+    )
+    assert publisher.publish_stats()["published"] == count
+    await publisher.close()
+
+    await asyncio.wait_for(all_received.wait(), timeout=5.0)
+    assert [m.content for m in received_messages] == [str(i) for i in range(count)]
+    await subscriber_facade.close()
@@ -0,0 +1,321 @@
+"""Integration tests for AppointmentRepository against Postgres."""
+
+import asyncio
+from datetime import date, time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from testcontainers.postgres import PostgresContainer
+
+from src.api.dependencies import to_async_url
+from src.messaging.pubsub_exchanges import (
+    APPOINTMENT_CREATED,
+    APPOINTMENT_STATUS_CHANGED,
+)
+from src.models.db.appointment import Appointment, AppointmentStatus, TimePreference
+from src.models.dto.patient_history_query import PatientHistoryQuery
+from src.repositories.appointment_repository import AppointmentRepository
+from src.services.outbox_relay import OutboxRelay
+
+SLOTS = [time(8, 0), time(9, 0), time(10, 0), time(11, 0)]
+CONCURRENT_BOOKINGS = 6
+
+
+@pytest.fixture(scope="module")
+def postgres_container() -> Generator[PostgresContainer, None, None]:
+    """Start a Postgres testcontainer for the module."""
+    container = PostgresContainer("postgres:17-alpine")
+    container.start()
+    try:
+        yield container
+    finally:
+        container.stop()
+
+
+@pytest.fixture
+async def db_engine(
+    postgres_container: PostgresContainer,
+) -> AsyncGenerator[AsyncEngine, None]:
+    """Create tables and yield an async engine bound to the test database."""
+    db_url = postgres_container.get_connection_url()
+    sync_engine = create_engine(db_url, echo=False)
+    SQLModel.metadata.create_all(sync_engine)
+    engine = create_async_engine(to_async_url(db_url), poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+    SQLModel.metadata.drop_all(sync_engine)
+    sync_engine.dispose()
+
+
+def _make_appointment(patient_id: int) -> Appointment:
+    """Create an unsaved AM appointment for doctor 1."""
+    return Appointment(
+        patient_id=patient_id,
+        doctor_id=1,
+        appointment_date=date(2026, 3, 10),
+        time_preference=TimePreference.AM,
+    )
+
+
+async def _book(engine: AsyncEngine, patient_id: int) -> Appointment | None:
+    """Book an appointment on its own session, like a separate request."""
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        return await AppointmentRepository(session).create_in_first_free_slot(
+            _make_appointment(patient_id), SLOTS
+        )
+
+
+async def test_concurrent_bookings_never_share_a_slot(db_engine: AsyncEngine) -> None:
+    """Racing bookings should fill each slot once and reject the overflow."""
+    results = await asyncio.gather(
+        *(_book(db_engine, i) for i in range(CONCURRENT_BOOKINGS))
+    )
+    booked = [a.assigned_time for a in results if a is not None]
+    assert sorted(booked) == SLOTS
+    assert results.count(None) == CONCURRENT_BOOKINGS - len(SLOTS)
+
+
+async def test_bulk_booking_fills_free_slots_and_reports_overflow(
+    db_engine: AsyncEngine,
+) -> None:
+    """A batch should skip existing bookings and report rows that do not fit."""
+    await _book(db_engine, 0)
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        results = await AppointmentRepository(session).create_many_in_free_slots(
+            [_make_appointment(i) for i in range(1, 5)],
+            {TimePreference.AM: SLOTS, TimePreference.PM: []},
+        )
+    assert [a.assigned_time for a in results[:3]] == SLOTS[1:]
+    assert all(a.id is not None for a in results[:3])
+    assert results[3] is None
+
+
+async def _book_history(engine: AsyncEngine, days: int) -> None:
+    """Book one appointment per day for patient 1, cancelling even days."""
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        repo = AppointmentRepository(session)
+        for day in range(1, days + 1):
+            appointment = _make_appointment(1)
+            appointment.appointment_date = date(2026, 3, day)
+            created = await repo.create_in_first_free_slot(appointment, SLOTS)
+            if day % 2 == 0:
+                await repo.update_status(created.id, AppointmentStatus.CANCELLED)
+
+
+async def test_patient_history_pages_do_not_overlap(db_engine: AsyncEngine) -> None:
+    """Following the keyset should visit every row once, newest first."""
+    await _book_history(db_engine, 5)
+    seen: list[date] = []
+    after = None
+    async with AsyncSession(db_engine) as session:
+        repo = AppointmentRepository(session)
+        while page := await repo.get_page_by_patient_id(
+            1, PatientHistoryQuery(), 2, after
+        ):
+            seen.extend(a.appointment_date for a in page)
+            after = (page[-1].appointment_date, page[-1].id)
+    assert seen == [date(2026, 3, day) for day in range(5, 0, -1)]
+
+
+async def test_patient_history_stream_applies_filters(db_engine: AsyncEngine) -> None:
+    """Streaming should honour the date range and status filters."""
+    await _book_history(db_engine, 5)
+    query = PatientHistoryQuery(
+        date_from=date(2026, 3, 2),
+        date_to=date(2026, 3, 5),
+        status=AppointmentStatus.SCHEDULED,
+    )
+    async with AsyncSession(db_engine) as session:
+        streamed = [
+            a.appointment_date
+            async for a in AppointmentRepository(session).stream_by_patient_id(1, query)
+        ]
+    assert streamed == [date(2026, 3, 5), date(2026, 3, 3)]
+
+
+async def test_cancelled_slot_can_be_rebooked(db_engine: AsyncEngine) -> None:
+    """A cancelled appointment should release its slot."""
+    first = await _book(db_engine, 1)
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        await AppointmentRepository(session).update_status(
+            first.id, AppointmentStatus.CANCELLED
+        )
+    second = await _book(db_engine, 2)
+    assert second.assigned_time == first.assigned_time
+
+
+async def test_reorder_can_swap_slots(db_engine: AsyncEngine) -> None:
+    """Swapping two slots should not trip the slot constraint mid-transaction."""
+    first = await _book(db_engine, 1)
+    second = await _book(db_engine, 2)
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        saved = await AppointmentRepository(session).reorder(
+            {second.id: first.assigned_time, first.id: second.assigned_time}
+        )
+    assert [(a.id, a.assigned_time) for a in saved] == [
+        (second.id, time(8, 0)),
+        (first.id, time(9, 0)),
+    ]
+
+
+async def test_reorder_rejects_cancelled_appointment(db_engine: AsyncEngine) -> None:
+    """An appointment cancelled since the queue was read should not move."""
+    first = await _book(db_engine, 1)
+    second = await _book(db_engine, 2)
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        repo = AppointmentRepository(session)
+        await repo.update_status(second.id, AppointmentStatus.CANCELLED)
+        with pytest.raises(ValueError):
+            await repo.reorder(
+                {second.id: first.assigned_time, first.id: second.assigned_time}
+            )
+        (unchanged,) = await repo.get_by_doctor_and_date(1, date(2026, 3, 10))
+    assert unchanged.assigned_time == first.assigned_time
+
+
+async def test_reorder_overwrites_loaded_appointments(db_engine: AsyncEngine) -> None:
+    """Appointments loaded in the session should reflect the returned slots."""
+    await _book(db_engine, 1)
+    await _book(db_engine, 2)
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        repo = AppointmentRepository(session)
+        first, second = await repo.get_by_doctor_and_date(1, date(2026, 3, 10))
+        await repo.reorder({second.id: time(8, 0), first.id: time(9, 0)})
+        assert (first.assigned_time, second.assigned_time) == (
+            time(9, 0),
+            time(8, 0),
+        )
+
+
+def _relay(db_engine: AsyncEngine, pubsub: MagicMock) -> tuple[OutboxRelay, MagicMock]:
+    """Create an outbox relay publishing through the given facade stub."""
+    messaging = MagicMock(get_pubsub=MagicMock(return_value=pubsub))
+    relay = OutboxRelay(async_sessionmaker(db_engine, class_=AsyncSession), messaging)
+    return relay, messaging
+
+
+async def test_outbox_events_are_relayed_in_commit_order(
+    db_engine: AsyncEngine,
+) -> None:
+    """Each committed change should be published once, then leave the outbox."""
+    booked = await _book(db_engine, 1)
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        await AppointmentRepository(session).update_status(
+            booked.id, AppointmentStatus.CANCELLED
+        )
+    relay, messaging = _relay(db_engine, MagicMock(publish_bodies=AsyncMock()))
+    exchanges = [APPOINTMENT_CREATED, APPOINTMENT_STATUS_CHANGED]
+
+    assert await relay.relay_once() == len(exchanges)
+    published = [call.args[0] for call in messaging.get_pubsub.call_args_list]
+    assert published == exchanges
+    assert await relay.relay_once() == 0
+
+
+async def test_unconfirmed_outbox_events_stay_queued(db_engine: AsyncEngine) -> None:
+    """An event the broker did not confirm should be retried by the next run."""
+    await _book(db_engine, 1)
+    pubsub = MagicMock(publish_bodies=AsyncMock(side_effect=RuntimeError("down")))
+    relay, _ = _relay(db_engine, pubsub)
+
+    with pytest.raises(RuntimeError):
+        await relay.relay_once()
+    pubsub.publish_bodies.side_effect = None
+    assert await relay.relay_once() == 1
+
+
+async def test_flush_drains_the_outbox(db_engine: AsyncEngine) -> None:
+    """Flushing should relay batch after batch until the outbox is empty."""
+    booked, batch_size = 3, 2
+    for patient_id in range(booked):
+        await _book(db_engine, patient_id)
+    pubsub = MagicMock(publish_bodies=AsyncMock())
+    relay = OutboxRelay(
+        async_sessionmaker(db_engine, class_=AsyncSession),
+        MagicMock(get_pubsub=MagicMock(return_value=pubsub)),
+        batch_size=batch_size,
+    )
+
+    assert await relay.flush() == booked
+    assert pubsub.publish_bodies.await_count == -(-booked // batch_size)
+    assert await relay.relay_once() == 0
+
+
+async def test_stop_flushes_pending_events(db_engine: AsyncEngine) -> None:
+    """Stopping should publish events still in the outbox."""
+    await _book(db_engine, 1)
+    pubsub = MagicMock(publish_bodies=AsyncMock())
+    relay, _ = _relay(db_engine, pubsub)
+
+    await relay.stop()
+    pubsub.publish_bodies.assert_awaited_once()
+
+
+async def _explain(
+    engine: AsyncEngine, query: Callable[[AppointmentRepository], Awaitable[Any]]
+) -> str:
+    """Run a repository query and return the plan of the SQL it issued.
+
+    Sequential scans are disabled because the test table is tiny and the
+    planner would otherwise ignore every index.
+    """
+    statements = []
+
+    def capture(
+        _conn: Any,  # noqa: ANN401
+        _cursor: Any,  # noqa: ANN401
+        statement: str,
+        parameters: Any,  # noqa: ANN401
+        *_: Any,  # noqa: ANN401
+    ) -> None:
+        statements.append((statement, parameters))
+
+    async with AsyncSession(engine) as session:
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await query(AppointmentRepository(session))
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        statement, parameters = statements[-1]
+        connection = await session.connection()
+        await connection.exec_driver_sql("SET enable_seqscan = off")
+        result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.parametrize(
+    ("query", "index"),
+    [
+        (
+            lambda repo: repo.get_by_doctor_and_date(1, date(2026, 3, 10)),
+            "ex_appointment_doctor_slot",
+        ),
+        (
+            lambda repo: repo.get_by_doctor_date_and_preference(
+                1, date(2026, 3, 10), TimePreference.AM
+            ),
+            "ix_appointment_doctor_date_preference",
+        ),
+        (
+            lambda repo: repo.get_page_by_patient_id(
+                1, PatientHistoryQuery(), 50, (date(2026, 3, 10), 1)
+            ),
+            "ix_appointment_patient_date",
+        ),
+    ],
+)
+async def test_hot_queries_use_indexes(
+    db_engine: AsyncEngine,
+    query: Callable[[AppointmentRepository], Awaitable[Any]],
+    index: str,
+) -> None:
+    """Each lookup should be answered from its matching index."""
+    plan = await _explain(db_engine, query)
+    assert index in plan
+    assert "Seq Scan" not in plan
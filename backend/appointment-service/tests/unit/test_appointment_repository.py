@@ -1,11 +1,14 @@
 """Unit tests for AppointmentRepository."""
 
 from datetime import date, time
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.exc import IntegrityError
 
+from src.messaging.pubsub_exchanges import APPOINTMENT_CREATED
 from src.models.db.appointment import Appointment, AppointmentStatus, TimePreference
+from src.models.dto.patient_history_query import PatientHistoryQuery
 from src.repositories.appointment_repository import AppointmentRepository
 
 EXPECTED_TWO_APPOINTMENTS = 2
@@ -32,8 +35,14 @@ def _make_appointment(
 
 @pytest.fixture
 def session() -> MagicMock:
-    """Return a mocked SQLModel Session."""
-    return MagicMock()
+    """Return a mocked SQLModel AsyncSession."""
+    mock = MagicMock()
+    mock.get = AsyncMock()
+    mock.exec = AsyncMock()
+    mock.commit = AsyncMock()
+    mock.rollback = AsyncMock()
+    mock.refresh = AsyncMock()
+    return mock
 
 
 @pytest.fixture
@@ -42,79 +51,263 @@ def repo(session: MagicMock) -> AppointmentRepository:
     return AppointmentRepository(session)
 
 
-# ── create
+# ── create_in_first_free_slot
 
+SLOTS = [time(8, 0), time(9, 0)]
 
-def test_create_saves_and_returns_appointment(
+
+def _insert_result(appointment: Appointment | None) -> MagicMock:
+    return MagicMock(scalar_one_or_none=MagicMock(return_value=appointment))
+
+
+def _integrity_error() -> IntegrityError:
+    return IntegrityError("INSERT", {}, Exception("slot taken"))
+
+
+async def test_create_in_first_free_slot_returns_created_appointment(
     repo: AppointmentRepository, session: MagicMock
 ) -> None:
-    """Create should add, commit and refresh the appointment."""
+    """The row returned by the insert should be committed and returned."""
     appointment = _make_appointment(1)
-    result = repo.create(appointment)
-    session.add.assert_called_once_with(appointment)
-    session.commit.assert_called_once()
-    session.refresh.assert_called_once_with(appointment)
+    session.exec.return_value = _insert_result(appointment)
+    result = await repo.create_in_first_free_slot(appointment, SLOTS)
+    session.exec.assert_awaited_once()
+    session.commit.assert_awaited_once()
     assert result == appointment
 
 
+async def test_create_in_first_free_slot_returns_none_when_full(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """No returned row means every candidate slot is taken."""
+    session.exec.return_value = _insert_result(None)
+    result = await repo.create_in_first_free_slot(_make_appointment(1), SLOTS)
+    assert result is None
+
+
+async def test_create_in_first_free_slot_retries_on_conflict(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """A slot conflict with a concurrent booking should roll back and retry."""
+    appointment = _make_appointment(1)
+    session.exec.side_effect = [_integrity_error(), _insert_result(appointment)]
+    result = await repo.create_in_first_free_slot(appointment, SLOTS)
+    session.rollback.assert_awaited_once()
+    assert result == appointment
+
+
+async def test_create_in_first_free_slot_gives_up_after_max_attempts(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """Conflicts should surface once every slot could have been filled."""
+    session.exec.side_effect = _integrity_error()
+    with pytest.raises(IntegrityError):
+        await repo.create_in_first_free_slot(_make_appointment(1), SLOTS)
+    assert session.exec.await_count == len(SLOTS) + 1
+
+
+# ── create_many_in_free_slots
+
+BULK_SLOTS = {TimePreference.AM: SLOTS, TimePreference.PM: [time(13, 0)]}
+
+
+def _unsaved(patient_id: int) -> Appointment:
+    return Appointment(
+        patient_id=patient_id,
+        doctor_id=1,
+        appointment_date=date(2026, 3, 10),
+        time_preference=TimePreference.AM,
+    )
+
+
+def _rows_result(appointments: list[Appointment]) -> MagicMock:
+    # RETURNING hands back the rows with their generated ids.
+    for appointment_id, appointment in enumerate(appointments, start=1):
+        appointment.id = appointment.id or appointment_id
+    return MagicMock(scalars=MagicMock(return_value=appointments))
+
+
+async def test_create_many_assigns_distinct_slots_in_one_insert(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """Rows for the same day should get successive free slots."""
+    batch = [_unsaved(1), _unsaved(2), _unsaved(3)]
+    session.exec.side_effect = [
+        [(1, date(2026, 3, 10), time(8, 0))],
+        _rows_result(batch[:1]),
+    ]
+    result = await repo.create_many_in_free_slots(batch, BULK_SLOTS)
+    assert session.exec.await_count == EXPECTED_TWO_APPOINTMENTS
+    session.commit.assert_awaited_once()
+    (events,) = session.add_all.call_args.args
+    assert [e.exchange for e in events] == [APPOINTMENT_CREATED]
+    assert result == [batch[0], None, None]
+    assert batch[0].assigned_time == time(9, 0)
+
+
+async def test_create_many_retries_whole_batch_on_conflict(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """A slot lost to a concurrent booking should reassign the batch."""
+    batch = [_unsaved(1)]
+    session.exec.side_effect = [
+        [],
+        _integrity_error(),
+        [(1, date(2026, 3, 10), time(8, 0))],
+        _rows_result(batch),
+    ]
+    result = await repo.create_many_in_free_slots(batch, BULK_SLOTS)
+    session.rollback.assert_awaited_once()
+    assert result == batch
+    assert batch[0].assigned_time == time(9, 0)
+
+
 # ── get_by_id
 
 
-def test_get_by_id_returns_appointment(
+async def test_get_by_id_returns_appointment(
     repo: AppointmentRepository, session: MagicMock
 ) -> None:
     """Should return appointment when found."""
     appointment = _make_appointment(1)
     session.get.return_value = appointment
-    result = repo.get_by_id(1)
+    result = await repo.get_by_id(1)
     session.get.assert_called_once_with(Appointment, 1)
     assert result == appointment
 
 
-def test_get_by_id_returns_none_when_not_found(
+async def test_get_by_id_returns_none_when_not_found(
     repo: AppointmentRepository, session: MagicMock
 ) -> None:
     """Should return None when appointment does not exist."""
     session.get.return_value = None
-    result = repo.get_by_id(99)
+    result = await repo.get_by_id(99)
     assert result is None
 
 
+# ── read replica routing
+
+
+@pytest.fixture
+def read_session() -> MagicMock:
+    """Return a mocked read-replica AsyncSession."""
+    mock = MagicMock()
+    mock.get = AsyncMock()
+    mock.exec = AsyncMock()
+    return mock
+
+
+async def test_reads_use_read_session(
+    session: MagicMock, read_session: MagicMock
+) -> None:
+    """Reads should go to the replica while the repository has not written."""
+    repo = AppointmentRepository(session, read_session)
+    await repo.get_by_id(1)
+    read_session.get.assert_awaited_once_with(Appointment, 1)
+    session.get.assert_not_awaited()
+
+
+async def test_reads_after_write_use_primary(
+    session: MagicMock, read_session: MagicMock
+) -> None:
+    """After a write, reads should see it by going to the primary."""
+    repo = AppointmentRepository(session, read_session)
+    session.exec.return_value = _insert_result(_make_appointment(1))
+    await repo.update_status(1, AppointmentStatus.DONE)
+    await repo.get_by_id(1)
+    session.get.assert_awaited_once_with(Appointment, 1)
+    read_session.get.assert_not_awaited()
+
+
+async def test_primary_read_bypasses_replica(
+    session: MagicMock, read_session: MagicMock
+) -> None:
+    """Reads ahead of a write can ask for the primary explicitly."""
+    repo = AppointmentRepository(session, read_session)
+    session.exec.return_value = []
+    await repo.get_by_doctor_and_date(1, date(2026, 3, 10), primary=True)
+    session.exec.assert_awaited_once()
+    read_session.exec.assert_not_awaited()
+
+
 # ── update_status
 
 
-def test_update_status_saves_new_status(
+async def test_update_status_saves_new_status(
     repo: AppointmentRepository, session: MagicMock
 ) -> None:
-    """Should update status and persist the change."""
-    appointment = _make_appointment(1)
-    result = repo.update_status(appointment, AppointmentStatus.IN_PROGRESS)
-    assert result.status == AppointmentStatus.IN_PROGRESS
-    session.add.assert_called_once_with(appointment)
-    session.commit.assert_called_once()
-    session.refresh.assert_called_once_with(appointment)
+    """Should update the status in one RETURNING statement and commit."""
+    updated = _make_appointment(1, status=AppointmentStatus.IN_PROGRESS)
+    session.exec.return_value = _insert_result(updated)
+    result = await repo.update_status(1, AppointmentStatus.IN_PROGRESS)
+    assert result == updated
+    session.exec.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    session.refresh.assert_not_awaited()
+
+
+async def test_update_status_returns_none_when_not_found(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """No returned row means the appointment does not exist."""
+    session.exec.return_value = _insert_result(None)
+    assert await repo.update_status(99, AppointmentStatus.DONE) is None
+
+
+async def test_update_status_raises_on_slot_conflict(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """Reactivating into an occupied slot should raise ValueError."""
+    session.exec.side_effect = _integrity_error()
+    with pytest.raises(ValueError):
+        await repo.update_status(1, AppointmentStatus.SCHEDULED)
+    session.rollback.assert_awaited_once()
 
 
 # ── reorder
 
 
-def test_reorder_persists_all_appointments(
+async def test_reorder_persists_all_appointments(
     repo: AppointmentRepository, session: MagicMock
 ) -> None:
-    """Reorder should add and commit all appointments."""
-    appointments = [
-        _make_appointment(1, assigned_time=time(8, 0)),
-        _make_appointment(2, assigned_time=time(9, 0)),
+    """Reorder should update every row in one statement, in queue order."""
+    returned = [
+        _make_appointment(1, assigned_time=time(9, 0)),
+        _make_appointment(2, assigned_time=time(8, 0)),
     ]
-    repo.reorder(appointments)
-    assert session.add.call_count == EXPECTED_TWO_APPOINTMENTS
-    session.commit.assert_called_once()
+    session.exec.return_value = _rows_result(returned)
+    result = await repo.reorder({2: time(8, 0), 1: time(9, 0)})
+    assert [a.id for a in result] == [2, 1]
+    session.exec.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    session.add.assert_not_called()
+
+
+async def test_reorder_empty_queue_skips_the_update(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """An empty reorder should not run an UPDATE with an empty VALUES list."""
+    assert await repo.reorder({}) == []
+    session.exec.assert_not_awaited()
+
+
+async def test_reorder_raises_when_an_appointment_vanished(
+    repo: AppointmentRepository, session: MagicMock
+) -> None:
+    """A row cancelled or deleted since the read should raise ValueError."""
+    session.exec.return_value = _rows_result(
+        [_make_appointment(1, assigned_time=time(8, 0))]
+    )
+    with pytest.raises(ValueError):
+        await repo.reorder({1: time(8, 0), 2: time(9, 0)})
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
 
 
 # ── get_by_doctor_and_date
 
 
-def test_get_by_doctor_and_date_excludes_cancelled(
+async def test_get_by_doctor_and_date_excludes_cancelled(
     repo: AppointmentRepository, session: MagicMock
 ) -> None:
     """Should not include cancelled appointments in query."""
@@ -122,24 +315,30 @@ def test_get_by_doctor_and_date_excludes_cancelled(
     mock_result.__iter__ = MagicMock(return_value=iter([]))
     session.exec.return_value = mock_result
 
-    repo.get_by_doctor_and_date(1, date(2026, 3, 10))
+    await repo.get_by_doctor_and_date(1, date(2026, 3, 10))
     session.exec.assert_called_once()
     # Verify the query was executed
     call_args = session.exec.call_args[0][0]
     assert call_args is not None
 
 
-# ── get_by_patient_id
+# ── get_page_by_patient_id
 
 
-def test_get_by_patient_id_returns_list(
+async def test_get_page_by_patient_id_returns_list(
     repo: AppointmentRepository, session: MagicMock
 ) -> None:
-    """Should return list of appointments for a patient."""
+    """Should return a page of appointments for a patient."""
     appointments = [_make_appointment(1), _make_appointment(2)]
     mock_result = MagicMock()
     mock_result.__iter__ = MagicMock(return_value=iter(appointments))
     session.exec.return_value = mock_result
 
-    result = repo.get_by_patient_id(1)
+    result = await repo.get_page_by_patient_id(
+        1, PatientHistoryQuery(), limit=10, after=(date(2026, 3, 10), 5)
+    )
     assert len(result) == EXPECTED_TWO_APPOINTMENTS
+    statement = str(session.exec.call_args[0][0])
+    assert "ORDER BY appointment.appointment_date DESC, appointment.id DESC" in (
+        statement
+    )
@@ -1,17 +1,24 @@
 """Unit tests for AppointmentService."""
 
 from datetime import date, time
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 
 import pytest
 
 from src.models.db.appointment import Appointment, AppointmentStatus, TimePreference
+from src.models.dto.appointment_bulk_create_request import (
+    AppointmentBulkCreateRequest,
+)
+from src.models.dto.appointment_bulk_result import BulkRowStatus
 from src.models.dto.appointment_create_request import AppointmentCreateRequest
 from src.models.dto.appointment_status_update_request import (
     AppointmentStatusUpdateRequest,
 )
+from src.models.dto.patient_history_query import PatientHistoryQuery
 from src.models.dto.queue_reorder_request import QueueReorderRequest
-from src.services.appointment_service import AppointmentService
+from src.services.appointment_service import SLOTS, AppointmentService
+from src.services.queue_snapshot_cache import QueueSnapshotCache
+from src.services.slot_occupancy_cache import SlotOccupancyCache
 
 
 def _make_appointment(
@@ -33,44 +40,62 @@ def _make_appointment(
     return a
 
 
-class DummyPubSub:
-    """Stub for PubSubFacade."""
+class DummyOutbox:
+    """Stub for OutboxRelay."""
 
-    def publish(self, message: object) -> None:
-        """Do nothing."""
+    def __init__(self) -> None:
+        """Start with no notifications."""
+        self.notified = 0
 
+    def notify(self) -> None:
+        """Count the notification."""
+        self.notified += 1
 
-class DummyMessaging:
-    """Stub for MessagingManager."""
 
-    @staticmethod
-    def get_pubsub(exchange_name: str) -> "DummyPubSub":
-        """Return a dummy pubsub."""
-        return DummyPubSub()
+@pytest.fixture
+def repo() -> AsyncMock:
+    """Return a mocked AppointmentRepository."""
+    return AsyncMock()
 
 
 @pytest.fixture
-def repo() -> MagicMock:
-    """Return a mocked AppointmentRepository."""
-    return MagicMock()
+def slot_cache() -> SlotOccupancyCache:
+    """Return an empty SlotOccupancyCache."""
+    return SlotOccupancyCache()
+
+
+@pytest.fixture
+def queue_snapshots() -> QueueSnapshotCache:
+    """Return an empty QueueSnapshotCache."""
+    return QueueSnapshotCache()
+
+
+@pytest.fixture
+def outbox() -> DummyOutbox:
+    """Return an outbox relay stub."""
+    return DummyOutbox()
 
 
 @pytest.fixture
-def service(repo: MagicMock) -> AppointmentService:
+def service(
+    repo: AsyncMock,
+    outbox: DummyOutbox,
+    slot_cache: SlotOccupancyCache,
+    queue_snapshots: QueueSnapshotCache,
+) -> AppointmentService:
     """Return an AppointmentService with mocked dependencies."""
-    return AppointmentService(repo, DummyMessaging())
+    return AppointmentService(repo, outbox, slot_cache, queue_snapshots)
 
 
 # ── Slot assignment
 
 
-def test_create_appointment_assigns_first_am_slot(
-    service: AppointmentService, repo: MagicMock
+async def test_create_appointment_assigns_first_am_slot(
+    service: AppointmentService, repo: AsyncMock, outbox: DummyOutbox
 ) -> None:
     """First AM booking should get 08:00."""
-    repo.get_by_doctor_date_and_preference.return_value = []
     appointment = _make_appointment(1, assigned_time=time(8, 0))
-    repo.create.return_value = appointment
+    repo.create_in_first_free_slot.return_value = appointment
 
     request = AppointmentCreateRequest(
         patient_id=1,
@@ -78,18 +103,16 @@ def test_create_appointment_assigns_first_am_slot(
         appointment_date=date(2026, 3, 10),
         time_preference=TimePreference.AM,
     )
-    result = service.create_appointment(request)
+    result = await service.create_appointment(request)
     assert result.assigned_time == time(8, 0)
+    assert outbox.notified == 1
 
 
-def test_create_appointment_assigns_next_available_slot(
-    service: AppointmentService, repo: MagicMock
+async def test_create_appointment_offers_am_slots_in_order(
+    service: AppointmentService, repo: AsyncMock
 ) -> None:
-    """Second AM booking should get 09:00 if 08:00 is taken."""
-    existing = _make_appointment(1, assigned_time=time(8, 0))
-    repo.get_by_doctor_date_and_preference.return_value = [existing]
-    appointment = _make_appointment(2, assigned_time=time(9, 0))
-    repo.create.return_value = appointment
+    """AM bookings should offer the AM slots to the repository in order."""
+    repo.create_in_first_free_slot.return_value = _make_appointment(2)
 
     request = AppointmentCreateRequest(
         patient_id=2,
@@ -97,16 +120,18 @@ def test_create_appointment_assigns_next_available_slot(
         appointment_date=date(2026, 3, 10),
         time_preference=TimePreference.AM,
     )
-    result = service.create_appointment(request)
-    assert result.assigned_time == time(9, 0)
+    await service.create_appointment(request)
+    entity, slots = repo.create_in_first_free_slot.call_args[0]
+    assert slots == SLOTS[TimePreference.AM]
+    assert entity.assigned_time is None
+    assert entity.patient_id == request.patient_id
 
 
-def test_create_appointment_raises_when_no_slots_available(
-    service: AppointmentService, repo: MagicMock
+async def test_create_appointment_raises_when_no_slots_available(
+    service: AppointmentService, repo: AsyncMock
 ) -> None:
     """Should raise ValueError when all AM slots are taken."""
-    existing = [_make_appointment(i, assigned_time=time(8 + i, 0)) for i in range(4)]
-    repo.get_by_doctor_date_and_preference.return_value = existing
+    repo.create_in_first_free_slot.return_value = None
 
     request = AppointmentCreateRequest(
         patient_id=99,
@@ -115,18 +140,17 @@ def test_create_appointment_raises_when_no_slots_available(
         time_preference=TimePreference.AM,
     )
     with pytest.raises(ValueError):
-        service.create_appointment(request)
+        await service.create_appointment(request)
 
 
-def test_create_appointment_assigns_first_pm_slot(
-    service: AppointmentService, repo: MagicMock
+async def test_create_appointment_assigns_first_pm_slot(
+    service: AppointmentService, repo: AsyncMock
 ) -> None:
     """First PM booking should get 13:00."""
-    repo.get_by_doctor_date_and_preference.return_value = []
     appointment = _make_appointment(
         1, time_preference=TimePreference.PM, assigned_time=time(13, 0)
     )
-    repo.create.return_value = appointment
+    repo.create_in_first_free_slot.return_value = appointment
 
     request = AppointmentCreateRequest(
         patient_id=1,
@@ -134,44 +158,186 @@ def test_create_appointment_assigns_first_pm_slot(
         appointment_date=date(2026, 3, 10),
         time_preference=TimePreference.PM,
     )
-    result = service.create_appointment(request)
+    result = await service.create_appointment(request)
     assert result.assigned_time == time(13, 0)
+    assert repo.create_in_first_free_slot.call_args[0][1] == SLOTS[TimePreference.PM]
+
+
+async def test_create_appointment_skips_cached_taken_slots(
+    service: AppointmentService, repo: AsyncMock, slot_cache: SlotOccupancyCache
+) -> None:
+    """Slots the cache knows are taken should not be offered to the repository."""
+    slot_cache.mark_taken(1, date(2026, 3, 10), [time(8, 0), time(10, 0)])
+    repo.create_in_first_free_slot.return_value = _make_appointment(
+        1, assigned_time=time(9, 0)
+    )
+
+    request = AppointmentCreateRequest(
+        patient_id=1,
+        doctor_id=1,
+        appointment_date=date(2026, 3, 10),
+        time_preference=TimePreference.AM,
+    )
+    await service.create_appointment(request)
+    assert repo.create_in_first_free_slot.call_args[0][1] == [time(9, 0), time(11, 0)]
+    assert slot_cache.taken(1, date(2026, 3, 10)) == (1 << 8) | (1 << 9) | (1 << 10)
+
+
+async def test_create_appointment_rejects_full_day_from_cache(
+    service: AppointmentService, repo: AsyncMock
+) -> None:
+    """Once a day is known to be full, bookings should not reach the database."""
+    repo.create_in_first_free_slot.return_value = None
+    request = AppointmentCreateRequest(
+        patient_id=1,
+        doctor_id=1,
+        appointment_date=date(2026, 3, 10),
+        time_preference=TimePreference.AM,
+    )
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await service.create_appointment(request)
+    repo.create_in_first_free_slot.assert_awaited_once()
+
+
+# ── Bulk booking
+
+
+async def test_create_appointments_reports_created_and_conflict_rows(
+    service: AppointmentService, repo: AsyncMock, slot_cache: SlotOccupancyCache
+) -> None:
+    """Each row should be reported in request order."""
+    created = _make_appointment(1, assigned_time=time(9, 0))
+    repo.create_many_in_free_slots.return_value = [created, None]
+    row = AppointmentCreateRequest(
+        patient_id=1,
+        doctor_id=1,
+        appointment_date=date(2026, 3, 10),
+        time_preference=TimePreference.AM,
+    )
+
+    results = await service.create_appointments(
+        AppointmentBulkCreateRequest(appointments=[row, row])
+    )
+    assert [r.status for r in results] == [
+        BulkRowStatus.CREATED,
+        BulkRowStatus.CONFLICT,
+    ]
+    assert results[0].appointment.assigned_time == time(9, 0)
+    assert results[1].index == 1
+    assert repo.create_many_in_free_slots.call_args[0][1] == SLOTS
+    assert slot_cache.taken(1, date(2026, 3, 10)) != 0
+
+
+# ── Queue snapshot
+
+
+async def test_get_queue_snapshot_reuses_snapshot_until_queue_changes(
+    service: AppointmentService, repo: AsyncMock
+) -> None:
+    """Polling an unchanged queue should not query the repository again."""
+    repo.get_by_doctor_and_date.return_value = [_make_appointment(1)]
+    first = await service.get_queue_snapshot(1, date(2026, 3, 10))
+    second = await service.get_queue_snapshot(1, date(2026, 3, 10))
+    assert first is second
+    repo.get_by_doctor_and_date.assert_awaited_once_with(
+        1, date(2026, 3, 10), primary=True
+    )
+
+    repo.update_status.return_value = _make_appointment(
+        1, status=AppointmentStatus.IN_PROGRESS
+    )
+    await service.update_status(
+        1, AppointmentStatusUpdateRequest(status=AppointmentStatus.IN_PROGRESS)
+    )
+    repo.get_by_doctor_and_date.return_value = [
+        _make_appointment(1, status=AppointmentStatus.IN_PROGRESS)
+    ]
+    third = await service.get_queue_snapshot(1, date(2026, 3, 10))
+    assert third.etag != first.etag
+
+
+# ── Patient history
+
+
+async def test_get_patient_appointments_returns_cursor_when_more_rows(
+    service: AppointmentService, repo: AsyncMock
+) -> None:
+    """A full page should carry a cursor that resumes after its last row."""
+    repo.get_page_by_patient_id.return_value = [
+        _make_appointment(3),
+        _make_appointment(2),
+        _make_appointment(1),
+    ]
+    page = await service.get_patient_appointments(1, PatientHistoryQuery(limit=2))
+    assert [a.id for a in page.items] == [3, 2]
+    assert page.next_cursor is not None
+
+    repo.get_page_by_patient_id.return_value = [_make_appointment(1)]
+    last = await service.get_patient_appointments(
+        1, PatientHistoryQuery(limit=2, cursor=page.next_cursor)
+    )
+    assert repo.get_page_by_patient_id.call_args[0][3] == (date(2026, 3, 10), 2)
+    assert last.next_cursor is None
+
+
+async def test_get_patient_appointments_rejects_malformed_cursor(
+    service: AppointmentService,
+) -> None:
+    """A cursor that was not issued by the service should raise ValueError."""
+    with pytest.raises(ValueError):
+        await service.get_patient_appointments(
+            1, PatientHistoryQuery(cursor="not-a-cursor")
+        )
 
 
 # ── Status update
 
 
-def test_update_status_returns_none_when_not_found(
-    service: AppointmentService, repo: MagicMock
+async def test_update_status_returns_none_when_not_found(
+    service: AppointmentService, repo: AsyncMock
 ) -> None:
     """Should return None if appointment does not exist."""
-    repo.get_by_id.return_value = None
-    result = service.update_status(
+    repo.update_status.return_value = None
+    result = await service.update_status(
         99, AppointmentStatusUpdateRequest(status=AppointmentStatus.DONE)
     )
     assert result is None
 
 
-def test_update_status_updates_correctly(
-    service: AppointmentService, repo: MagicMock
+async def test_update_status_updates_correctly(
+    service: AppointmentService, repo: AsyncMock
 ) -> None:
     """Should return updated appointment with new status."""
-    appointment = _make_appointment(1)
     updated = _make_appointment(1, status=AppointmentStatus.IN_PROGRESS)
-    repo.get_by_id.return_value = appointment
     repo.update_status.return_value = updated
 
-    result = service.update_status(
+    result = await service.update_status(
         1, AppointmentStatusUpdateRequest(status=AppointmentStatus.IN_PROGRESS)
     )
     assert result.status == AppointmentStatus.IN_PROGRESS
 
 
+async def test_update_status_cancel_frees_cached_slot(
+    service: AppointmentService, repo: AsyncMock, slot_cache: SlotOccupancyCache
+) -> None:
+    """Cancelling should make the slot bookable again without a cache miss."""
+    slot_cache.mark_taken(1, date(2026, 3, 10), [time(8, 0), time(9, 0)])
+    repo.update_status.return_value = _make_appointment(
+        1, status=AppointmentStatus.CANCELLED
+    )
+
+    await service.update_status(
+        1, AppointmentStatusUpdateRequest(status=AppointmentStatus.CANCELLED)
+    )
+    assert slot_cache.taken(1, date(2026, 3, 10)) == 1 << 9
+
+
 # ── Queue reorder
 
 
-def test_reorder_queue_reassigns_am_slots(
-    service: AppointmentService, repo: MagicMock
+async def test_reorder_queue_reassigns_am_slots(
+    service: AppointmentService, repo: AsyncMock
 ) -> None:
     """Reordering should reassign time slots in requested order."""
     a1 = _make_appointment(1, assigned_time=time(8, 0))
@@ -179,19 +345,36 @@ def test_reorder_queue_reassigns_am_slots(
     repo.get_by_doctor_and_date.return_value = [a1, a2]
     repo.reorder.return_value = [a2, a1]
 
-    service.reorder_queue(
+    await service.reorder_queue(
+        doctor_id=1,
+        appointment_date=date(2026, 3, 10),
+        request=QueueReorderRequest(appointment_ids=[2, 1]),
+    )
+    repo.reorder.assert_called_once_with({2: time(8, 0), 1: time(9, 0)})
+
+
+async def test_reorder_queue_replaces_cached_occupancy(
+    service: AppointmentService, repo: AsyncMock, slot_cache: SlotOccupancyCache
+) -> None:
+    """After a reorder the cache should hold exactly the reassigned slots."""
+    slot_cache.mark_taken(1, date(2026, 3, 10), [time(8, 0), time(10, 0)])
+    a1 = _make_appointment(1, assigned_time=time(8, 0))
+    a2 = _make_appointment(2, assigned_time=time(10, 0))
+    repo.get_by_doctor_and_date.return_value = [a1, a2]
+    repo.reorder.side_effect = lambda new_slots: [
+        _make_appointment(i, assigned_time=slot) for i, slot in new_slots.items()
+    ]
+
+    await service.reorder_queue(
         doctor_id=1,
         appointment_date=date(2026, 3, 10),
         request=QueueReorderRequest(appointment_ids=[2, 1]),
     )
-    repo.reorder.assert_called_once()
-    reordered = repo.reorder.call_args[0][0]
-    assert reordered[0].assigned_time == time(8, 0)
-    assert reordered[1].assigned_time == time(9, 0)
+    assert slot_cache.taken(1, date(2026, 3, 10)) == (1 << 8) | (1 << 9)
 
 
-def test_reorder_queue_raises_on_invalid_ids(
-    service: AppointmentService, repo: MagicMock
+async def test_reorder_queue_raises_on_invalid_ids(
+    service: AppointmentService, repo: AsyncMock
 ) -> None:
     """Should raise ValueError if appointment_ids don't match active appointments."""
     a1 = _make_appointment(1)
@@ -199,7 +382,7 @@ def test_reorder_queue_raises_on_invalid_ids(
     repo.get_by_doctor_and_date.return_value = [a1, a2]
 
     with pytest.raises(ValueError):
-        service.reorder_queue(
+        await service.reorder_queue(
             doctor_id=1,
             appointment_date=date(2026, 3, 10),
             request=QueueReorderRequest(appointment_ids=[1, 99]),
@@ -0,0 +1,45 @@
+"""Unit tests for the message codecs."""
+
+from datetime import date, time
+
+import pytest
+
+from src.models.db.appointment import AppointmentStatus, TimePreference
+from src.models.msg.appointment_message import AppointmentMessage
+from src.models.msg.codecs import JSON, MSGPACK, get_codec
+
+MESSAGE = AppointmentMessage(
+    appointment_id=1,
+    patient_id=2,
+    doctor_id=3,
+    appointment_date=date(2026, 3, 10),
+    time_preference=TimePreference.AM,
+    assigned_time=time(9, 0),
+    status=AppointmentStatus.SCHEDULED,
+)
+
+
+@pytest.mark.parametrize("content_type", [JSON, MSGPACK])
+def test_message_round_trips(content_type: str) -> None:
+    """Test that every codec decodes what it encodes."""
+    body = MESSAGE.to_bytes(content_type)
+
+    assert AppointmentMessage.from_bytes(body, content_type) == MESSAGE
+
+
+def test_msgpack_is_smaller_than_json() -> None:
+    """Test that the binary format is more compact on the wire."""
+    assert len(MESSAGE.to_bytes(MSGPACK)) < len(MESSAGE.to_bytes(JSON))
+
+
+def test_missing_content_type_reads_json() -> None:
+    """Test that messages published before codecs existed still decode."""
+    body = MESSAGE.model_dump_json().encode()
+
+    assert AppointmentMessage.from_bytes(body) == MESSAGE
+
+
+def test_unknown_content_type_raises() -> None:
+    """Test that an unsupported content type is rejected."""
+    with pytest.raises(ValueError, match="text/xml"):
+        get_codec("text/xml")
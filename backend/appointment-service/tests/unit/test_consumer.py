@@ -0,0 +1,209 @@
+"""Unit tests for the concurrent facade consumer."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from src.messaging.consumer import (
+    BatchOptions,
+    ConsumerOptions,
+    consume,
+    consume_batches,
+)
+from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.codecs import JSON
+
+CONCURRENCY = 3
+
+
+class DummyMessage(AbstractMessage):
+    """Message with an ordering key."""
+
+    key: int
+    seq: int
+
+
+class FakeDelivery:
+    """Incoming delivery that records its acknowledgement."""
+
+    def __init__(self, message: DummyMessage) -> None:
+        """Wrap an encoded message."""
+        self.body = message.to_bytes()
+        self.content_type = JSON
+        self.acked = False
+        self.multiple_acked = False
+
+    @asynccontextmanager
+    async def process(self, requeue: bool = False) -> AsyncIterator[None]:
+        """Acknowledge when the block exits."""
+        yield
+        self.acked = True
+
+    async def ack(self, multiple: bool = False) -> None:
+        """Record an explicit acknowledgement."""
+        self.acked = True
+        self.multiple_acked = multiple
+
+
+class FakeRetries:
+    """Retry router that records which deliveries it was handed."""
+
+    def __init__(self) -> None:
+        """Start with nothing retried or dead-lettered."""
+        self.retried: list[FakeDelivery] = []
+        self.dead: list[FakeDelivery] = []
+
+    async def retry(self, message: FakeDelivery, _: BaseException) -> None:
+        """Record a retried delivery."""
+        self.retried.append(message)
+
+    async def dead_letter(self, message: FakeDelivery, _: BaseException) -> None:
+        """Record a dead-lettered delivery."""
+        self.dead.append(message)
+
+
+class FakeQueue:
+    """Queue delivering what was put on it until it is ended."""
+
+    def __init__(self, deliveries: list[FakeDelivery], ended: bool = True) -> None:
+        """Queue the deliveries, optionally followed by the end of the stream."""
+        self._pending: asyncio.Queue[FakeDelivery | None] = asyncio.Queue()
+        for delivery in deliveries:
+            self._pending.put_nowait(delivery)
+        if ended:
+            self.end()
+
+    def end(self) -> None:
+        """End the stream after the queued deliveries."""
+        self._pending.put_nowait(None)
+
+    @asynccontextmanager
+    async def iterator(self) -> AsyncIterator["FakeQueue"]:
+        """Iterate over the deliveries."""
+        yield self
+
+    def __aiter__(self) -> "FakeQueue":
+        """Return the iterator."""
+        return self
+
+    async def __anext__(self) -> FakeDelivery:
+        """Wait for the next delivery."""
+        delivery = await self._pending.get()
+        if delivery is None:
+            raise StopAsyncIteration
+        return delivery
+
+
+def _deliveries(keys: list[int]) -> list[FakeDelivery]:
+    """Create one delivery per key, numbered in order."""
+    return [FakeDelivery(DummyMessage(key=k, seq=i)) for i, k in enumerate(keys)]
+
+
+async def test_handlers_run_concurrently_up_to_the_limit() -> None:
+    """Slow handlers should overlap, but never beyond the concurrency level."""
+    active = peak = 0
+
+    async def on_message(_: DummyMessage) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    deliveries = _deliveries([0] * 10)
+    await consume(
+        FakeQueue(deliveries),
+        DummyMessage,
+        on_message,
+        ConsumerOptions(concurrency=CONCURRENCY),
+    )
+    assert peak == CONCURRENCY
+    assert all(d.acked for d in deliveries)
+
+
+async def test_messages_with_the_same_key_keep_their_order() -> None:
+    """An ordering key should serialise handlers per key only."""
+    handled: list[int] = []
+
+    async def on_message(message: DummyMessage) -> None:
+        # Earlier messages sleep longer, so unordered handling would reverse them.
+        await asyncio.sleep(0.01 * (10 - message.seq))
+        handled.append(message.seq)
+
+    await consume(
+        FakeQueue(_deliveries([1, 2, 1, 2, 1])),
+        DummyMessage,
+        on_message,
+        ConsumerOptions(concurrency=CONCURRENCY, ordering_key=lambda m: m.key),
+    )
+    assert [seq for seq in handled if seq % 2 == 0] == [0, 2, 4]
+    assert [seq for seq in handled if seq % 2 == 1] == [1, 3]
+
+
+async def test_batches_are_cut_by_size_and_acked_once() -> None:
+    """Full batches should be delivered together and acked by their last message."""
+    batches: list[list[int]] = []
+
+    async def on_batch(messages: list[DummyMessage]) -> None:
+        batches.append([m.seq for m in messages])
+
+    deliveries = _deliveries([0] * 5)
+    await consume_batches(
+        FakeQueue(deliveries), DummyMessage, on_batch, BatchOptions(size=2)
+    )
+    assert batches == [[0, 1], [2, 3], [4]]
+    assert [d.multiple_acked for d in deliveries] == [False, True, False, True, True]
+
+
+async def test_partial_batch_is_delivered_after_max_wait() -> None:
+    """A batch that does not fill should be delivered once the wait expires."""
+    delivered = asyncio.Event()
+
+    async def on_batch(messages: list[DummyMessage]) -> None:
+        assert [m.seq for m in messages] == [0, 1]
+        delivered.set()
+
+    queue = FakeQueue(_deliveries([0, 0]), ended=False)
+    consumer = asyncio.create_task(
+        consume_batches(
+            queue, DummyMessage, on_batch, BatchOptions(size=10, max_wait_seconds=0.01)
+        )
+    )
+    await asyncio.wait_for(delivered.wait(), 1)
+    queue.end()
+    await consumer
+
+
+async def test_failed_and_undecodable_messages_are_rerouted_then_acked() -> None:
+    """Handler failures should be retried and decode failures dead-lettered."""
+
+    async def on_message(message: DummyMessage) -> None:
+        if message.seq == 1:
+            raise ValueError("boom")
+
+    deliveries = _deliveries([0, 0, 0])
+    deliveries[2].body = b"not json"
+    retries = FakeRetries()
+    await consume(
+        FakeQueue(deliveries), DummyMessage, on_message, ConsumerOptions(), retries
+    )
+    assert retries.retried == [deliveries[1]]
+    assert retries.dead == [deliveries[2]]
+    assert all(d.acked for d in deliveries)
+
+
+async def test_failed_batch_is_retried_message_by_message() -> None:
+    """Every decoded message of a failed batch should be handed to the router."""
+
+    async def on_batch(_: list[DummyMessage]) -> None:
+        raise ValueError("boom")
+
+    deliveries = _deliveries([0, 0, 0])
+    deliveries[1].body = b"not json"
+    retries = FakeRetries()
+    await consume_batches(
+        FakeQueue(deliveries), DummyMessage, on_batch, BatchOptions(size=3), retries
+    )
+    assert retries.retried == [deliveries[0], deliveries[2]]
+    assert retries.dead == [deliveries[1]]
+    assert deliveries[2].multiple_acked
@@ -0,0 +1,38 @@
+"""Unit tests for the replica event subscriptions."""
+
+from datetime import date, time
+from unittest.mock import MagicMock
+
+from src.messaging.pubsub_exchanges import APPOINTMENT_QUEUE_REORDERED
+from src.models.msg.queue_reordered_message import QueueReorderedMessage
+from src.services.event_subscriptions import (
+    EVENT_HANDLERS,
+    subscribe_event_handlers,
+)
+from src.services.queue_snapshot_cache import queue_snapshot_cache
+from src.services.slot_occupancy_cache import slot_occupancy_cache
+
+DAY = date(2026, 3, 10)
+
+
+async def test_reorder_event_reaches_every_cache() -> None:
+    """One exclusive subscription per exchange should fan out to all caches."""
+    messaging = MagicMock()
+    subscribe_event_handlers(messaging, "replica")
+
+    subscriptions = {
+        call.args[0]: call for call in messaging.get_pubsub.return_value.mock_calls
+    }
+    assert len(subscriptions) == len(EVENT_HANDLERS)
+    assert all(call.kwargs["exclusive"] for call in subscriptions.values())
+
+    slot_occupancy_cache.mark_taken(1, DAY, [time(8, 0)])
+    queue_snapshot_cache.store(1, DAY, 0, [])
+    handler = subscriptions[f"{APPOINTMENT_QUEUE_REORDERED}.replica.replica"].args[1]
+    await handler(
+        QueueReorderedMessage(
+            doctor_id=1, appointment_date=DAY, appointment_ids=[], assigned_times=[]
+        )
+    )
+    assert slot_occupancy_cache.taken(1, DAY) == 0
+    assert queue_snapshot_cache.get(1, DAY)[1] is None
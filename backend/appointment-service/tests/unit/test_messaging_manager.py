@@ -0,0 +1,44 @@
+"""Unit tests for MessagingManager connection sharing."""
+
+from unittest.mock import AsyncMock, patch
+
+import aio_pika
+
+from src.messaging.direct_message_facade import DirectMessageFacade
+from src.messaging.messaging_manager import MessagingManager
+from src.messaging.pubsub_facade import PubSubFacade
+
+AMQP_URL = "amqp://broker"
+
+
+def _connection() -> AsyncMock:
+    """Return a mocked robust connection."""
+    connection = AsyncMock(is_closed=False)
+    connection.channel.return_value = AsyncMock(is_closed=False)
+    return connection
+
+
+async def test_facades_share_one_connection_per_broker() -> None:
+    """Every facade should get a channel on a single shared connection."""
+    manager = MessagingManager()
+    manager.add_pubsubs([PubSubFacade(AMQP_URL, "a"), PubSubFacade(AMQP_URL, "b")])
+    manager.add_direct(DirectMessageFacade(AMQP_URL, "c"))
+    connection = _connection()
+    connect = AsyncMock(return_value=connection)
+
+    with patch.object(aio_pika, "connect_robust", connect):
+        await manager.start_all()
+    connect.assert_awaited_once_with(AMQP_URL)
+    assert connection.channel.await_count == len(["a", "b", "c"])
+
+    await manager.stop_all()
+    connection.close.assert_awaited_once()
+
+
+async def test_closing_a_facade_keeps_the_shared_connection() -> None:
+    """A facade should only close a connection it opened itself."""
+    connection = _connection()
+    facade = PubSubFacade(AMQP_URL, "a")
+    await facade.connect(connection)
+    await facade.close()
+    connection.close.assert_not_awaited()
@@ -0,0 +1,43 @@
+"""Unit tests for MeteredAsyncQueuePool."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from src.api.pool_metrics import MeteredAsyncQueuePool
+
+
+@pytest.fixture
+def pool() -> MeteredAsyncQueuePool:
+    """Return a one-connection pool over fake DBAPI connections."""
+    return MeteredAsyncQueuePool(
+        creator=MagicMock, pool_size=1, max_overflow=0, timeout=0.01
+    )
+
+
+async def test_checkouts_are_counted(pool: MeteredAsyncQueuePool) -> None:
+    """Each checkout should be counted and reflected in the gauges."""
+    connection = await greenlet_spawn(pool.connect)
+    stats = pool.stats()
+    assert stats["checkouts"] == 1
+    assert stats["checked_out"] == 1
+    assert stats["waits"] == 0
+
+    await greenlet_spawn(connection.close)
+    assert pool.stats()["checked_in"] == 1
+
+
+async def test_exhausted_pool_records_wait_and_timeout(
+    pool: MeteredAsyncQueuePool,
+) -> None:
+    """Checking out of a saturated pool should count a wait and a timeout."""
+    held = await greenlet_spawn(pool.connect)
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    await greenlet_spawn(held.close)
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds"] > 0
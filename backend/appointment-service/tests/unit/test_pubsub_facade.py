@@ -0,0 +1,55 @@
+"""Unit tests for the confirmed publish path of PubSubFacade."""
+
+from unittest.mock import AsyncMock, patch
+
+import aio_pika
+import pytest
+
+from src.messaging.pubsub_facade import PubSubFacade
+
+MESSAGES = 5
+BATCH_SIZE = 2
+
+
+async def _connected_facade(exchange: AsyncMock) -> PubSubFacade:
+    """Connect a facade to a mocked broker that uses the given exchange."""
+    channel = AsyncMock()
+    channel.declare_exchange.return_value = exchange
+    connection = AsyncMock()
+    connection.channel.return_value = channel
+    facade = PubSubFacade("amqp://broker", "test", batch_size=BATCH_SIZE)
+    with patch.object(aio_pika, "connect_robust", AsyncMock(return_value=connection)):
+        await facade.connect()
+    return facade
+
+
+async def test_publish_bodies_without_connect_raises() -> None:
+    """Publishing should require a connection."""
+    with pytest.raises(RuntimeError):
+        await PubSubFacade("amqp://broker", "test").publish_bodies([b"{}"])
+
+
+async def test_publish_bodies_counts_every_confirm() -> None:
+    """Each confirmed body should be counted, in batches of batch_size."""
+    exchange = AsyncMock()
+    facade = await _connected_facade(exchange)
+    await facade.publish_bodies([b"{}"] * MESSAGES)
+
+    stats = facade.publish_stats()
+    assert exchange.publish.await_count == MESSAGES
+    assert stats["published"] == MESSAGES
+    assert stats["batches"] == -(-MESSAGES // BATCH_SIZE)
+    await facade.close()
+
+
+async def test_unconfirmed_messages_are_counted_and_raised() -> None:
+    """A nacked publish should be counted as failed and fail the call."""
+    exchange = AsyncMock()
+    exchange.publish.side_effect = [None, aio_pika.exceptions.DeliveryError(None, None)]
+    facade = await _connected_facade(exchange)
+    with pytest.raises(aio_pika.exceptions.DeliveryError):
+        await facade.publish_bodies([b"ok", b"nacked"])
+
+    stats = facade.publish_stats()
+    assert (stats["published"], stats["failed"]) == (1, 1)
+    await facade.close()
@@ -0,0 +1,83 @@
+"""Unit tests for QueueBroadcaster."""
+
+from datetime import date, time
+
+from src.models.db.appointment import AppointmentStatus, TimePreference
+from src.models.msg.appointment_message import AppointmentMessage
+from src.models.msg.queue_reordered_message import QueueReorderedMessage
+from src.services.queue_broadcaster import RESYNC, QueueBroadcaster
+
+DAY = date(2026, 3, 10)
+
+
+def _message(status: AppointmentStatus) -> AppointmentMessage:
+    """Create an appointment event for doctor 1 on DAY."""
+    return AppointmentMessage(
+        appointment_id=1,
+        patient_id=1,
+        doctor_id=1,
+        appointment_date=DAY,
+        time_preference=TimePreference.AM,
+        assigned_time=time(8, 0),
+        status=status,
+        notes=None,
+    )
+
+
+async def test_events_reach_only_the_watched_queue() -> None:
+    """A client should receive diffs for its own doctor and day only."""
+    broadcaster = QueueBroadcaster()
+    with (
+        broadcaster.subscribe(1, DAY) as watched,
+        broadcaster.subscribe(2, DAY) as other,
+    ):
+        await broadcaster.on_appointment_event(_message(AppointmentStatus.SCHEDULED))
+        await broadcaster.on_appointment_event(_message(AppointmentStatus.CANCELLED))
+        await broadcaster.on_queue_reordered(
+            QueueReorderedMessage(
+                doctor_id=1,
+                appointment_date=DAY,
+                appointment_ids=[1],
+                assigned_times=[time(9, 0)],
+            )
+        )
+        events = [watched.get_nowait() for _ in range(watched.qsize())]
+        assert [e.event for e in events] == ["upsert", "remove", "reordered"]
+        assert events[2].data == '{"assigned_times": {"1": "09:00:00"}}'
+        assert other.empty()
+    assert broadcaster.subscriber_count == 0
+
+
+async def test_slow_client_is_told_to_resync() -> None:
+    """A client whose buffer is full should get a single resync event."""
+    broadcaster = QueueBroadcaster(max_pending=2)
+    with broadcaster.subscribe(1, DAY) as events:
+        for _ in range(3):
+            await broadcaster.on_appointment_event(
+                _message(AppointmentStatus.SCHEDULED)
+            )
+        assert events.qsize() == 1
+        assert events.get_nowait() == RESYNC
+
+
+async def test_stream_sends_snapshot_keepalive_and_diffs() -> None:
+    """The stream should start with a snapshot and end on disconnect."""
+    broadcaster = QueueBroadcaster(keepalive_seconds=0.01)
+    disconnected = False
+
+    async def load_snapshot() -> bytes:
+        return b"[]"
+
+    async def is_disconnected() -> bool:
+        return disconnected
+
+    stream = broadcaster.stream(1, DAY, load_snapshot, is_disconnected)
+    assert await anext(stream) == "event: snapshot\ndata: []\n\n"
+    assert await anext(stream) == ": keepalive\n\n"
+
+    await broadcaster.on_appointment_event(_message(AppointmentStatus.SCHEDULED))
+    assert (await anext(stream)).startswith("event: upsert\ndata: {")
+
+    disconnected = True
+    assert [chunk async for chunk in stream] == []
+    assert broadcaster.subscriber_count == 0
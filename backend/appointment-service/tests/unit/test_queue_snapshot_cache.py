@@ -0,0 +1,92 @@
+"""Unit tests for QueueSnapshotCache."""
+
+from datetime import date, time
+from unittest.mock import patch
+
+from src.models.db.appointment import AppointmentStatus, TimePreference
+from src.models.dto.appointment_response import AppointmentResponse
+from src.models.msg.appointment_message import AppointmentMessage
+from src.services.queue_snapshot_cache import QueueSnapshotCache
+
+DAY = date(2026, 3, 10)
+
+
+def _response(appointment_id: int) -> AppointmentResponse:
+    """Create an appointment response."""
+    return AppointmentResponse(
+        id=appointment_id,
+        patient_id=1,
+        doctor_id=1,
+        appointment_date=DAY,
+        time_preference=TimePreference.AM,
+        assigned_time=time(8, 0),
+        status=AppointmentStatus.SCHEDULED,
+        notes=None,
+    )
+
+
+def test_stored_snapshot_is_served_until_bumped() -> None:
+    """A snapshot should be reused until its queue changes."""
+    cache = QueueSnapshotCache()
+    version, snapshot = cache.get(1, DAY)
+    assert snapshot is None
+
+    stored = cache.store(1, DAY, version, [_response(1)])
+    assert cache.get(1, DAY)[1] == stored
+    assert stored.body.startswith(b'[{"id":1')
+
+    cache.bump(1, DAY)
+    assert cache.get(1, DAY)[1] is None
+
+
+def test_snapshot_built_during_a_change_is_not_cached() -> None:
+    """A queue read before a bump must not be cached under the new version."""
+    cache = QueueSnapshotCache()
+    version, _ = cache.get(1, DAY)
+    cache.bump(1, DAY)
+    cache.store(1, DAY, version, [_response(1)])
+    assert cache.get(1, DAY)[1] is None
+
+
+def test_etag_depends_only_on_content() -> None:
+    """Equal queues should share an ETag, so replicas agree on it."""
+    first, second = QueueSnapshotCache(), QueueSnapshotCache()
+    second.bump(1, DAY)
+    a = first.store(1, DAY, first.get(1, DAY)[0], [_response(1)])
+    b = second.store(1, DAY, second.get(1, DAY)[0], [_response(1)])
+    c = second.store(2, DAY, 0, [_response(2)])
+    assert a.etag == b.etag
+    assert a.etag != c.etag
+
+
+def test_snapshot_expires_after_ttl() -> None:
+    """A snapshot older than the TTL should be rebuilt, even without an event."""
+    cache = QueueSnapshotCache(ttl_seconds=10)
+    with patch("src.services.queue_snapshot_cache.clock.monotonic") as monotonic:
+        monotonic.return_value = 100.0
+        version, _ = cache.get(1, DAY)
+        cache.store(1, DAY, version, [_response(1)])
+        monotonic.return_value = 111.0
+        version, snapshot = cache.get(1, DAY)
+        assert snapshot is None
+
+        rebuilt = cache.store(1, DAY, version, [_response(1)])
+        assert cache.get(1, DAY)[1] == rebuilt
+
+
+async def test_appointment_event_bumps_queue() -> None:
+    """An event from another replica should discard the snapshot."""
+    cache = QueueSnapshotCache()
+    cache.store(1, DAY, 0, [_response(1)])
+    await cache.on_queue_changed(
+        AppointmentMessage(
+            appointment_id=2,
+            patient_id=2,
+            doctor_id=1,
+            appointment_date=DAY,
+            time_preference=TimePreference.AM,
+            assigned_time=time(9, 0),
+            status=AppointmentStatus.SCHEDULED,
+        )
+    )
+    assert cache.get(1, DAY)[1] is None
@@ -0,0 +1,81 @@
+"""Unit tests for SlotOccupancyCache."""
+
+from datetime import date, time
+from unittest.mock import patch
+
+from src.models.db.appointment import AppointmentStatus, TimePreference
+from src.models.msg.appointment_message import AppointmentMessage
+from src.services.slot_occupancy_cache import SlotOccupancyCache, slot_bit
+
+DAY = date(2026, 3, 10)
+
+
+def _message(
+    doctor_id: int = 1,
+    assigned_time: time = time(9, 0),
+    status: AppointmentStatus = AppointmentStatus.SCHEDULED,
+) -> AppointmentMessage:
+    """Create an appointment event message."""
+    return AppointmentMessage(
+        appointment_id=1,
+        patient_id=1,
+        doctor_id=doctor_id,
+        appointment_date=DAY,
+        time_preference=TimePreference.AM,
+        assigned_time=assigned_time,
+        status=status,
+    )
+
+
+def test_mark_taken_and_free_update_mask() -> None:
+    """Marking slots should set and clear their hour bits."""
+    cache = SlotOccupancyCache()
+    cache.mark_taken(1, DAY, [time(8, 0), time(13, 0), None])
+    assert cache.taken(1, DAY) == slot_bit(time(8, 0)) | slot_bit(time(13, 0))
+
+    cache.mark_free(1, DAY, time(8, 0))
+    assert cache.taken(1, DAY) == slot_bit(time(13, 0))
+    assert cache.taken(2, DAY) == 0
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """The cache should drop the least recently used day when full."""
+    cache = SlotOccupancyCache(max_entries=2)
+    cache.mark_taken(1, DAY, [time(8, 0)])
+    cache.mark_taken(2, DAY, [time(8, 0)])
+    cache.taken(1, DAY)
+    cache.mark_taken(3, DAY, [time(8, 0)])
+    assert cache.taken(1, DAY) != 0
+    assert cache.taken(2, DAY) == 0
+
+
+def test_entries_expire_after_ttl() -> None:
+    """Entries older than the TTL should read as empty."""
+    cache = SlotOccupancyCache(ttl_seconds=10)
+    with patch("src.services.slot_occupancy_cache.clock.monotonic") as monotonic:
+        monotonic.return_value = 100.0
+        cache.mark_taken(1, DAY, [time(8, 0)])
+        monotonic.return_value = 111.0
+        assert cache.taken(1, DAY) == 0
+
+
+async def test_created_event_updates_only_cached_days() -> None:
+    """A booking event should mark its slot, but not fill unknown days."""
+    cache = SlotOccupancyCache()
+    cache.mark_taken(1, DAY, [time(8, 0)])
+
+    await cache.on_appointment_created(_message(doctor_id=1))
+    await cache.on_appointment_created(_message(doctor_id=2))
+    assert cache.taken(1, DAY) == slot_bit(time(8, 0)) | slot_bit(time(9, 0))
+    assert cache.taken(2, DAY) == 0
+
+
+async def test_status_changed_event_invalidates_day() -> None:
+    """A status change elsewhere should drop the cached day."""
+    cache = SlotOccupancyCache()
+    cache.mark_taken(1, DAY, [time(8, 0), time(9, 0)])
+
+    await cache.on_appointment_status_changed(
+        _message(status=AppointmentStatus.CANCELLED)
+    )
+    assert cache.taken(1, DAY) == 0
@@ -8,10 +8,15 @@ from dotenv import load_dotenv
 from fastapi import FastAPI
 
 from src.messaging.messaging_manager import messaging_manager
-from src.messaging.pubsub_exchanges import TRANSCRIPTION_COMPLETED
+from src.messaging.pubsub_exchanges import (
+    TRANSCRIPTION_COMPLETED,
+    TRANSCRIPTION_SEGMENT,
+)
 from src.messaging.pubsub_facade import PubSubFacade
+from src.transcription.jobs import job_runner
 from src.transcription.router import router
 from src.transcription.whisper import get_model
+from src.transcription.worker_pool import transcription_pool
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,7 @@ if not AMQP_URL:
 async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
     """Manage application startup and shutdown lifecycle."""
     messaging_manager.add_pubsub(PubSubFacade(AMQP_URL, TRANSCRIPTION_COMPLETED))
+    messaging_manager.add_pubsub(PubSubFacade(AMQP_URL, TRANSCRIPTION_SEGMENT))
 
     logger.info("Starting up messaging manager...")
     await messaging_manager.start_all()
@@ -35,8 +41,14 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None, Any]:
     await asyncio.to_thread(get_model)  # runs blocking load off the event loop
     logger.info("Whisper model ready.")
 
+    await job_runner.start()
+
     yield
 
+    await job_runner.stop()
+    logger.info("Waiting for running transcriptions...")
+    await asyncio.to_thread(transcription_pool.shutdown)
+
     logger.info("Shutting down messaging manager...")
     await messaging_manager.stop_all()
     logger.info("Messaging manager shut down.")
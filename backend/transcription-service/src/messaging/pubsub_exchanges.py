@@ -1,3 +1,4 @@
 """Pub/Sub exchange names for the transcription service."""
 
 TRANSCRIPTION_COMPLETED = "transcription.completed"
+TRANSCRIPTION_SEGMENT = "transcription.segment"
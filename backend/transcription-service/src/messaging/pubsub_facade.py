@@ -5,9 +5,11 @@ from contextlib import suppress
 from typing import Any, Awaitable, Callable, TypeVar
 
 import aio_pika
-from aio_pika.abc import AbstractRobustQueue
+from aio_pika.abc import AbstractIncomingMessage, AbstractRobustQueue
 
+from src.messaging.retry import RetryPolicy, RetryRouter
 from src.models.msg.abstract_message import AbstractMessage
+from src.models.msg.codecs import MESSAGE_CONTENT_TYPE
 
 MessageType = TypeVar("MessageType", bound=AbstractMessage)
 
@@ -70,18 +72,34 @@ class PubSubFacade:
         if not self._exchange:
             raise RuntimeError("Exchange not declared; call 'connect' first.")
         amqp_message = aio_pika.Message(
-            body=message.to_bytes(), content_type="application/json"
+            body=message.to_bytes(MESSAGE_CONTENT_TYPE),
+            content_type=MESSAGE_CONTENT_TYPE,
         )
         await self._exchange.publish(amqp_message, routing_key="")
-        logger.info("Published message: %s", amqp_message.body)
+        logger.debug("Published %d-byte message", len(amqp_message.body))
 
     def subscribe(
         self,
         queue_name: str,
         on_message: Callable[[MessageType], Awaitable[Any]],
         message_class: type[MessageType],
+        retry: RetryPolicy | None = None,
     ) -> None:
-        """Subscribe to messages broadcasted on the fanout exchange."""
+        """Subscribe to messages broadcasted on the fanout exchange.
+
+        Messages whose handler fails are retried with backoff and, after
+        ``retry.max_attempts`` failures, dead-lettered.
+
+        Args:
+            queue_name (str): The name of the durable queue to bind to the exchange.
+            on_message (Callable[[MessageType], Awaitable[Any]]): Async callback to process received messages.
+            message_class (type[MessageType]): The class type of the message for deserialization.
+            retry (RetryPolicy | None): Attempts and backoff; defaults to RetryPolicy().
+
+        Raises:
+            RuntimeError: If the messaging infrastructure is not properly initialized.
+
+        """  # noqa: E501
         if not self._exchange or not self._channel:
             raise RuntimeError(
                 "Exchange or channel not declared; call 'connect' first."
@@ -90,7 +108,7 @@ class PubSubFacade:
             return
 
         self._consumer_task = self._loop.create_task(
-            self._consume(queue_name, on_message, message_class)
+            self._consume(queue_name, on_message, message_class, retry or RetryPolicy())
         )
 
     async def _consume(
@@ -98,28 +116,59 @@ class PubSubFacade:
         queue_name: str,
         on_message: Callable[[MessageType], Awaitable[Any]],
         message_class: type[AbstractMessage],
+        retry: RetryPolicy,
     ) -> None:
-        """Consume messages from the specified queue."""
+        """Declare the queue with its retry and dead-letter queues, then consume."""
         queue = await self._channel.declare_queue(queue_name, durable=True)
         await queue.bind(self._exchange)
-        await self._consume_messages(message_class, on_message, queue)
+        retries = RetryRouter(self._channel, self._exchange_name, queue_name, retry)
+        await retries.declare()
+        await self._consume_messages(message_class, on_message, queue, retries)
 
     @staticmethod
     async def _consume_messages(
         message_class: type[AbstractMessage],
         on_message: Callable[[MessageType], Awaitable[Any]],
         queue: AbstractRobustQueue,
+        retries: RetryRouter,
     ) -> None:
-        """Process messages from the queue."""
+        """Process messages from the queue.
+
+        A message is acknowledged only after a failure was handed to
+        ``retries``; if that fails too, the message is requeued.
+        """
         async with queue.iterator() as queue_iter:
             async for message in queue_iter:
-                async with message.process():
-                    try:
-                        logger.info("Received message: %s", message.body)
-                        event = message_class.from_bytes(message.body)
-                        await on_message(event)
-                    except Exception as e:
-                        logger.exception("Error processing message: %s", e)
+                try:
+                    async with message.process(requeue=True):
+                        await PubSubFacade._process(
+                            message, message_class, on_message, retries
+                        )
+                except Exception as e:
+                    logger.exception(
+                        "Requeued message that could not be retried: %s", e
+                    )
+
+    @staticmethod
+    async def _process(
+        message: AbstractIncomingMessage,
+        message_class: type[AbstractMessage],
+        on_message: Callable[[MessageType], Awaitable[Any]],
+        retries: RetryRouter,
+    ) -> None:
+        """Decode and handle one message, rerouting it on failure."""
+        logger.debug("Received %d-byte message", len(message.body))
+        try:
+            event = message_class.from_bytes(message.body, message.content_type)
+        except Exception as e:
+            logger.exception("Error decoding message: %s", e)
+            await retries.dead_letter(message, e)
+            return
+        try:
+            await on_message(event)
+        except Exception as e:
+            logger.exception("Error processing message: %s", e)
+            await retries.retry(message, e)
 
     @property
     def exchange_name(self) -> str:
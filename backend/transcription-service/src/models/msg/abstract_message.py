@@ -1,30 +1,38 @@
 from pydantic import BaseModel
 
+from src.models.msg.codecs import JSON, get_codec
+
 
 class AbstractMessage(BaseModel):
     """Abstract base class for messages to be sent and received via messaging system."""
 
-    def to_bytes(self) -> bytes:
-        """Serialize the message to bytes using JSON encoding.
+    def to_bytes(self, content_type: str = JSON) -> bytes:
+        """Serialize the message to bytes.
+
+        Args:
+            content_type (str): The wire format, e.g. ``application/json``.
 
         Returns:
             bytes: The serialized message in bytes.
 
         """
-        return self.model_dump_json().encode()
+        return get_codec(content_type).encode(self)
 
     @classmethod
-    def from_bytes(cls, body: bytes) -> "AbstractMessage":
+    def from_bytes(
+        cls, body: bytes, content_type: str | None = None
+    ) -> "AbstractMessage":
         """Deserialize bytes to an instance of the message class.
 
         Args:
             body (bytes): The byte representation of the message.
+            content_type (str | None): The wire format; None means JSON.
 
         Returns:
             An instance of the message class.
 
         """
-        return cls.model_validate_json(body)
+        return get_codec(content_type).decode(cls, body)
 
     def __str__(self) -> str:
         """Return string representation of the message."""
@@ -14,6 +14,7 @@ class TranscriptMessage(AbstractMessage):
         language (str): Detected language code (e.g. "en").
         language_probability (float): Confidence score for the detected language.
         transcribed_at (datetime): UTC timestamp of when transcription completed.
+        job_id (str | None): The transcription job, for uploads submitted as jobs.
 
     """
 
@@ -22,6 +23,7 @@ class TranscriptMessage(AbstractMessage):
     language: str
     language_probability: float
     transcribed_at: datetime = None
+    job_id: str | None = None
 
     def model_post_init(self, __context: object) -> None:
         """Set transcribed_at to current UTC time if not provided."""
@@ -0,0 +1,29 @@
+"""Transcript segment message published while an audio file is transcribed."""
+
+from src.models.msg.abstract_message import AbstractMessage
+
+
+class TranscriptSegmentMessage(AbstractMessage):
+    """Message published for every segment of a streamed transcription.
+
+    Segments of one transcription share a stream id and are numbered from 0;
+    the complete transcript follows as a ``TranscriptMessage``.
+
+    Attributes:
+        stream_id (str): Identifier shared by the segments of one transcription.
+        filename (str): Original name of the uploaded audio file.
+        index (int): Position of the segment in the transcript.
+        start (float): Start of the segment, in seconds from the audio start.
+        end (float): End of the segment, in seconds.
+        text (str): The transcribed text of the segment.
+        language (str): Detected language code (e.g. "en").
+
+    """
+
+    stream_id: str
+    filename: str
+    index: int
+    start: float
+    end: float
+    text: str
+    language: str
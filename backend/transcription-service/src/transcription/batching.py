@@ -0,0 +1,179 @@
+"""Micro-batching of concurrent transcriptions into shared inference calls."""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+import numpy as np
+from faster_whisper import decode_audio
+
+from src.transcription.whisper import (
+    CLIP_SECONDS,
+    LANGUAGE,
+    SAMPLE_RATE,
+    model_registry,
+    transcribe_batch,
+    transcribe_chunked,
+)
+from src.transcription.worker_pool import TranscriptionPool, transcription_pool
+
+logger = logging.getLogger(__name__)
+
+# Clips decoded together in one inference call.
+TRANSCRIPTION_BATCH_SIZE = int(os.getenv("TRANSCRIPTION_BATCH_SIZE", "8"))
+# How long the first clip of a batch waits for others to join it.
+TRANSCRIPTION_BATCH_WAIT_MS = float(os.getenv("TRANSCRIPTION_BATCH_WAIT_MS", "50"))
+
+
+@dataclass
+class _Batch:
+    """Clips waiting to be decoded together, with their callers' futures."""
+
+    clips: list[np.ndarray] = field(default_factory=list)
+    results: list[asyncio.Future[str]] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class BatchScheduler:
+    """Groups concurrently pending clips into batched inference calls.
+
+    Clips of up to ``CLIP_SECONDS`` that share a model and language wait
+    at most ``max_wait_seconds`` for others, then decode together as one
+    batch on a single pool worker; a batch that fills up is decoded right
+    away. Encoding and decoding a batch costs little more than a single
+    clip, so concurrent short requests finish sooner overall. Longer audio
+    is split at pauses and its chunks are batched among themselves.
+
+    Each request is admitted to the pool once and holds that admission
+    until its transcript is ready, so waiting for a batch counts against
+    the pool's capacity and a batch, once formed, is never refused.
+    """
+
+    def __init__(
+        self,
+        pool: TranscriptionPool,
+        max_batch_size: int = TRANSCRIPTION_BATCH_SIZE,
+        max_wait_seconds: float = TRANSCRIPTION_BATCH_WAIT_MS / 1000,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            pool (TranscriptionPool): The pool running decoding and batches.
+            max_batch_size (int): Clips decoded per inference call.
+            max_wait_seconds (float): Longest a clip waits for a batch to fill.
+
+        """
+        self._pool = pool
+        self._max_batch_size = max_batch_size
+        self._max_wait_seconds = max_wait_seconds
+        self._pending: dict[tuple[str, str], _Batch] = {}
+        self._running: set[asyncio.Task] = set()
+
+    async def transcribe(
+        self,
+        audio: str | BinaryIO,
+        language: str = LANGUAGE,
+        model: str | None = None,
+    ) -> tuple[str, str, float]:
+        """Transcribe an audio file, batched with concurrent requests.
+
+        Args:
+            audio (str | BinaryIO): A file path or an open audio file.
+            language (str): ISO 639-1 language code of the speech.
+            model (str | None): The model to use; None for the default model.
+
+        Returns:
+            tuple[str, str, float]: The transcript, the language and its
+                probability, which is 1 since the language is given.
+
+        Raises:
+            PoolSaturatedError: If the pool is at capacity.
+            PoolClosedError: If the pool was shut down.
+
+        """
+        async with self._pool.admit():
+            samples = await self._pool.run_admitted(decode_audio, audio, SAMPLE_RATE)
+            if len(samples) > CLIP_SECONDS * SAMPLE_RATE:
+                return await self._pool.run_admitted(
+                    transcribe_chunked, samples, self._max_batch_size, language, model
+                )
+            return await self.submit(samples, language, model), language, 1.0
+
+    async def submit(
+        self, samples: np.ndarray, language: str = LANGUAGE, model: str | None = None
+    ) -> str:
+        """Queue a clip for the next batch of its model and language.
+
+        The caller holds a pool admission (see ``TranscriptionPool.admit``)
+        until this returns; the batch is decoded without admitting it again.
+
+        Args:
+            samples (np.ndarray): 16 kHz mono float32 samples, at most
+                ``CLIP_SECONDS`` long.
+            language (str): ISO 639-1 language code of the speech.
+            model (str | None): The model to use; None for the default model.
+
+        Returns:
+            str: The clip's transcript.
+
+        Raises:
+            UnknownModelError: If the model is not offered.
+            PoolClosedError: If the pool was shut down.
+
+        """
+        key = (language, model_registry.resolve(model).name)
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch()
+            batch.timer = loop.call_later(self._max_wait_seconds, self._flush, key)
+        result: asyncio.Future[str] = loop.create_future()
+        batch.clips.append(samples)
+        batch.results.append(result)
+        if len(batch.clips) >= self._max_batch_size:
+            self._flush(key)
+        return await result
+
+    def _flush(self, key: tuple[str, str]) -> None:
+        """Start decoding the pending batch of a model and language.
+
+        Args:
+            key (tuple[str, str]): The language and model name.
+
+        """
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.create_task(self._run(batch, *key))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _Batch, language: str, model: str) -> None:
+        """Decode a batch and hand each caller its transcript.
+
+        Args:
+            batch (_Batch): The clips and their futures.
+            language (str): ISO 639-1 language code of the speech.
+            model (str): The model's name.
+
+        """
+        try:
+            texts = await self._pool.run_admitted(
+                transcribe_batch, batch.clips, language, model
+            )
+        except Exception as e:
+            for result in batch.results:
+                if not result.done():
+                    result.set_exception(e)
+            return
+        logger.debug("Decoded a batch of %d clips", len(batch.clips))
+        for result, text in zip(batch.results, texts, strict=True):
+            if not result.done():
+                result.set_result(text)
+
+
+transcription_batcher = BatchScheduler(transcription_pool)
@@ -0,0 +1,212 @@
+"""SQLite-backed store of transcription jobs, kept on the local disk."""
+
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+
+from pydantic import BaseModel
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a transcription job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class TranscriptionJob(BaseModel):
+    """A transcription job as stored and returned by the API.
+
+    Attributes:
+        id (str): Unique identifier of the job.
+        filename (str): Original name of the uploaded audio file.
+        status (JobStatus): Where the job is in its lifecycle.
+        transcript (str | None): The transcript, once done.
+        language (str | None): Detected language code, once done.
+        language_probability (float | None): Confidence of the language.
+        error (str | None): Why the job failed, if it did.
+        created_at (datetime): UTC time the job was submitted.
+        updated_at (datetime): UTC time of the last status change.
+
+    """
+
+    id: str
+    filename: str
+    status: JobStatus
+    transcript: str | None = None
+    language: str | None = None
+    language_probability: float | None = None
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcription_job (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    transcript TEXT,
+    language TEXT,
+    language_probability REAL,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_transcription_job_status
+    ON transcription_job (status, created_at);
+"""
+
+
+class JobStore:
+    """Persists jobs in a SQLite file so they survive restarts.
+
+    Every call is a short single-row statement but still touches the disk,
+    so the job runner makes them off the event loop; a lock serializes them
+    across threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open or create the job database.
+
+        Args:
+            path (Path): The SQLite file; its directory is created if needed.
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+    def create(self, filename: str) -> TranscriptionJob:
+        """Record a new queued job.
+
+        Args:
+            filename (str): Original name of the uploaded audio file.
+
+        Returns:
+            TranscriptionJob: The job.
+
+        """
+        now = datetime.now(tz=timezone.utc)
+        job = TranscriptionJob(
+            id=uuid.uuid4().hex,
+            filename=filename,
+            status=JobStatus.QUEUED,
+            created_at=now,
+            updated_at=now,
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO transcription_job"
+                " (id, filename, status, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job.id, filename, job.status.value, now.isoformat(), now.isoformat()),
+            )
+        return job
+
+    def get(self, job_id: str) -> TranscriptionJob | None:
+        """Return a job by id.
+
+        Args:
+            job_id (str): The job's id.
+
+        Returns:
+            TranscriptionJob | None: The job, or None if unknown.
+
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM transcription_job WHERE id = ?", (job_id,)
+            ).fetchone()
+        return TranscriptionJob.model_validate(dict(row)) if row else None
+
+    def unfinished(self) -> list[TranscriptionJob]:
+        """Return queued and running jobs, oldest first.
+
+        Returns:
+            list[TranscriptionJob]: Jobs to (re)start.
+
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM transcription_job WHERE status IN (?, ?)"
+                " ORDER BY created_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchall()
+        return [TranscriptionJob.model_validate(dict(row)) for row in rows]
+
+    def count_unfinished(self) -> int:
+        """Return the number of queued and running jobs.
+
+        Returns:
+            int: The backlog size.
+
+        """
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM transcription_job WHERE status IN (?, ?)",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchone()
+        return count
+
+    def mark_running(self, job_id: str) -> None:
+        """Record that a worker picked up a job.
+
+        Args:
+            job_id (str): The job's id.
+
+        """
+        self._update(job_id, status=JobStatus.RUNNING.value)
+
+    def mark_done(
+        self, job_id: str, transcript: str, language: str, language_probability: float
+    ) -> None:
+        """Store a job's result.
+
+        Args:
+            job_id (str): The job's id.
+            transcript (str): The transcript.
+            language (str): Detected language code.
+            language_probability (float): Confidence of the language.
+
+        """
+        self._update(
+            job_id,
+            status=JobStatus.DONE.value,
+            transcript=transcript,
+            language=language,
+            language_probability=language_probability,
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        """Record why a job failed.
+
+        Args:
+            job_id (str): The job's id.
+            error (str): The failure.
+
+        """
+        self._update(job_id, status=JobStatus.FAILED.value, error=error)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def _update(self, job_id: str, **values: str | float) -> None:
+        columns = ", ".join(f"{column} = ?" for column in values)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"UPDATE transcription_job SET {columns}, updated_at = ?"  # noqa: S608
+                " WHERE id = ?",
+                (*values.values(), datetime.now(tz=timezone.utc).isoformat(), job_id),
+            )
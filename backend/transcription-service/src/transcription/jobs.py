@@ -0,0 +1,239 @@
+"""Background transcription jobs, persisted so they survive restarts."""
+
+import asyncio
+import logging
+import os
+import shutil
+from contextlib import suppress
+from pathlib import Path
+from typing import BinaryIO
+
+from src.messaging.messaging_manager import messaging_manager
+from src.messaging.pubsub_exchanges import TRANSCRIPTION_COMPLETED
+from src.models.msg.transcript_message import TranscriptMessage
+from src.transcription.job_store import JobStore, TranscriptionJob
+from src.transcription.whisper import transcribe_audio
+from src.transcription.worker_pool import (
+    PoolClosedError,
+    PoolSaturatedError,
+    TranscriptionPool,
+    transcription_pool,
+)
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPTION_JOBS_DIR = Path(os.getenv("TRANSCRIPTION_JOBS_DIR", "data/jobs"))
+# Queued and running jobs accepted before uploads are turned away.
+TRANSCRIPTION_MAX_UNFINISHED_JOBS = int(
+    os.getenv("TRANSCRIPTION_MAX_UNFINISHED_JOBS", "100")
+)
+# How long a job waits before trying again when synchronous requests
+# occupy the whole worker pool.
+POOL_RETRY_SECONDS = 1.0
+
+
+class JobBacklogFullError(Exception):
+    """Raised when too many jobs are queued or running to accept another."""
+
+
+class TranscriptionJobRunner:
+    """Accepts uploads as jobs and transcribes them on the worker pool.
+
+    The audio of each job is written to ``jobs_dir`` and its state to a
+    SQLite store in the same directory. On start, jobs that were queued or
+    running when the service stopped are picked up again, so a restart
+    delays but never loses a job. Finished jobs are published as a
+    ``TranscriptMessage`` carrying the job id.
+    """
+
+    def __init__(
+        self,
+        pool: TranscriptionPool,
+        jobs_dir: Path = TRANSCRIPTION_JOBS_DIR,
+        max_unfinished: int = TRANSCRIPTION_MAX_UNFINISHED_JOBS,
+    ) -> None:
+        """Initialize the runner; call ``start`` before submitting jobs.
+
+        Args:
+            pool (TranscriptionPool): The pool running the transcriptions.
+            jobs_dir (Path): Directory for the job store and uploaded audio.
+            max_unfinished (int): Queued and running jobs allowed at once.
+
+        """
+        self._pool = pool
+        self._jobs_dir = jobs_dir
+        self._max_unfinished = max_unfinished
+        self._store: JobStore | None = None
+        self._pending: asyncio.Queue[str] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Open the job store, requeue unfinished jobs and start the workers."""
+        self._store = await asyncio.to_thread(JobStore, self._jobs_dir / "jobs.sqlite3")
+        for job in await asyncio.to_thread(self._store.unfinished):
+            self._pending.put_nowait(job.id)
+        if not self._pending.empty():
+            logger.info("Resuming %d transcription jobs", self._pending.qsize())
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self._pool.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers; unfinished jobs resume on the next start."""
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with suppress(asyncio.CancelledError):
+                await worker
+        self._workers = []
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def submit(self, filename: str, audio: BinaryIO) -> TranscriptionJob:
+        """Store an upload and queue it for transcription.
+
+        Args:
+            filename (str): Original name of the uploaded audio file.
+            audio (BinaryIO): The uploaded audio, read from its current position.
+
+        Returns:
+            TranscriptionJob: The queued job.
+
+        Raises:
+            JobBacklogFullError: If the backlog is at its limit.
+            OSError: If the upload cannot be stored; its job is marked failed.
+
+        """
+        store = self._require_store()
+        if await asyncio.to_thread(store.count_unfinished) >= self._max_unfinished:
+            raise JobBacklogFullError(
+                f"{self._max_unfinished} transcription jobs are already pending."
+            )
+        job = await asyncio.to_thread(store.create, filename)
+        try:
+            await asyncio.to_thread(self._save_audio, job.id, audio)
+        except BaseException as e:
+            # Never leave a queued job without its audio behind.
+            await asyncio.to_thread(
+                self._fail, job.id, f"Could not store the upload: {e}"
+            )
+            raise
+        self._pending.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: str) -> TranscriptionJob | None:
+        """Return a job by id.
+
+        Args:
+            job_id (str): The job's id.
+
+        Returns:
+            TranscriptionJob | None: The job, or None if unknown.
+
+        """
+        return await asyncio.to_thread(self._require_store().get, job_id)
+
+    async def _work(self) -> None:
+        """Run queued jobs one after another."""
+        while True:
+            job_id = await self._pending.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.exception("Transcription job %s crashed: %s", job_id, e)
+            finally:
+                self._pending.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        """Transcribe one job, record its outcome and publish the transcript.
+
+        Args:
+            job_id (str): The job's id.
+
+        """
+        store = self._require_store()
+        audio_path = self._audio_path(job_id)
+        await asyncio.to_thread(store.mark_running, job_id)
+        while True:
+            try:
+                transcript, language, probability = await self._pool.run(
+                    transcribe_audio, str(audio_path)
+                )
+                break
+            except PoolSaturatedError:
+                await asyncio.sleep(POOL_RETRY_SECONDS)
+            except PoolClosedError:
+                return  # Shutting down; the job resumes on the next start.
+            except Exception as e:
+                logger.exception("Transcription job %s failed: %s", job_id, e)
+                await asyncio.to_thread(self._fail, job_id, str(e))
+                return
+        job = await asyncio.to_thread(
+            self._finish, job_id, transcript, language, probability
+        )
+        try:
+            await messaging_manager.get_pubsub(TRANSCRIPTION_COMPLETED).publish(
+                TranscriptMessage(
+                    job_id=job_id,
+                    filename=job.filename,
+                    transcript=transcript,
+                    language=language,
+                    language_probability=probability,
+                )
+            )
+        except Exception as e:
+            logger.exception("Failed to publish transcript of job %s: %s", job_id, e)
+
+    def _save_audio(self, job_id: str, audio: BinaryIO) -> None:
+        """Copy an upload to the jobs directory in chunks.
+
+        Args:
+            job_id (str): The job's id.
+            audio (BinaryIO): The uploaded audio.
+
+        """
+        with self._audio_path(job_id).open("wb") as target:
+            shutil.copyfileobj(audio, target)
+
+    def _fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed and delete its audio; blocking.
+
+        Args:
+            job_id (str): The job's id.
+            error (str): Why the job failed.
+
+        """
+        self._require_store().mark_failed(job_id, error)
+        self._audio_path(job_id).unlink(missing_ok=True)
+
+    def _finish(
+        self, job_id: str, transcript: str, language: str, probability: float
+    ) -> TranscriptionJob:
+        """Record a job's transcript and delete its audio; blocking.
+
+        Args:
+            job_id (str): The job's id.
+            transcript (str): The transcript.
+            language (str): The detected language.
+            probability (float): The language's probability.
+
+        Returns:
+            TranscriptionJob: The finished job.
+
+        """
+        store = self._require_store()
+        store.mark_done(job_id, transcript, language, probability)
+        self._audio_path(job_id).unlink(missing_ok=True)
+        return store.get(job_id)
+
+    def _audio_path(self, job_id: str) -> Path:
+        return self._jobs_dir / f"{job_id}.audio"
+
+    def _require_store(self) -> JobStore:
+        if self._store is None:
+            raise RuntimeError("Job runner not started; call 'start' first.")
+        return self._store
+
+
+job_runner = TranscriptionJobRunner(transcription_pool)
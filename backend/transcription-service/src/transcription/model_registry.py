@@ -0,0 +1,232 @@
+"""Registry of loaded Whisper models, evicted least recently used."""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+# Approximate memory all loaded models may use together.
+WHISPER_MODEL_MEMORY_BUDGET_MB = int(
+    os.getenv("WHISPER_MODEL_MEMORY_BUDGET_MB", "4096")
+)
+
+# Weights of each model size, in millions; unknown sizes count as large.
+_MILLION_PARAMETERS = {
+    "tiny": 39,
+    "base": 74,
+    "small": 244,
+    "medium": 769,
+    "large-v3-turbo": 809,
+    "turbo": 809,
+    "distil-large-v3": 756,
+}
+_LARGE_MILLION_PARAMETERS = 1550
+_BYTES_PER_WEIGHT = {"int8": 1, "int16": 2, "float16": 2, "bfloat16": 2}
+_FLOAT32_BYTES = 4
+
+Model = TypeVar("Model")
+
+
+class UnknownModelError(ValueError):
+    """Raised when a request names a model the service does not offer."""
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A Whisper model size with the precision it runs at.
+
+    Attributes:
+        size (str): Model size or path, e.g. ``small`` or ``medium.en``.
+        compute_type (str): CTranslate2 compute type, e.g. ``int8``.
+
+    """
+
+    size: str
+    compute_type: str = WHISPER_COMPUTE_TYPE
+
+    @classmethod
+    def parse(cls, name: str) -> "ModelSpec":
+        """Parse ``size`` or ``size:compute_type``.
+
+        Args:
+            name (str): The model name.
+
+        Returns:
+            ModelSpec: The spec, with the default compute type if none given.
+
+        """
+        size, _, compute_type = name.strip().partition(":")
+        return cls(size, compute_type or WHISPER_COMPUTE_TYPE)
+
+    @property
+    def name(self) -> str:
+        """Get the spec as ``size:compute_type``."""
+        return f"{self.size}:{self.compute_type}"
+
+    @property
+    def memory_mb(self) -> int:
+        """Get the approximate memory the loaded weights take, in MB."""
+        parameters = _MILLION_PARAMETERS.get(
+            self.size.removesuffix(".en"), _LARGE_MILLION_PARAMETERS
+        )
+        weight_type = self.compute_type.partition("_")[0]
+        return parameters * _BYTES_PER_WEIGHT.get(weight_type, _FLOAT32_BYTES)
+
+
+class ModelRegistry(Generic[Model]):
+    """Loads models on demand and keeps the recently used ones in memory.
+
+    Only the default model and the ``allowed`` ones can be requested. Before
+    a model is loaded, the least recently used ones are dropped until it
+    fits within ``memory_budget_mb`` alongside the rest, so the budget
+    holds while it loads too; the model just used is always kept, even if
+    it alone exceeds the budget. A dropped model is freed once the
+    transcriptions still running on it finish.
+
+    Each model is loaded once and shared by all worker threads: CTranslate2
+    runs one replica per worker on shared weights, so a model already serves
+    as many concurrent transcriptions as the pool has workers.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[ModelSpec], Model],
+        default: ModelSpec,
+        allowed: Iterable[ModelSpec] = (),
+        memory_budget_mb: int = WHISPER_MODEL_MEMORY_BUDGET_MB,
+    ) -> None:
+        """Initialize an empty registry.
+
+        Args:
+            load (Callable[[ModelSpec], Model]): Loads a model; blocking.
+            default (ModelSpec): The model used when a request names none.
+            allowed (Iterable[ModelSpec]): Further models requests may name.
+            memory_budget_mb (int): Memory the loaded models may use together.
+
+        """
+        self._load = load
+        self._default = default
+        self._allowed = {default, *allowed}
+        self._memory_budget_mb = memory_budget_mb
+        self._models: OrderedDict[ModelSpec, Model] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: dict[ModelSpec, threading.Lock] = {}
+
+    def resolve(self, name: str | None) -> ModelSpec:
+        """Return the spec a model name refers to.
+
+        Args:
+            name (str | None): ``size`` or ``size:compute_type``; None for the
+                default model.
+
+        Returns:
+            ModelSpec: The spec.
+
+        Raises:
+            UnknownModelError: If the model is not offered.
+
+        """
+        if name is None:
+            return self._default
+        spec = ModelSpec.parse(name)
+        if spec not in self._allowed:
+            offered = ", ".join(sorted(allowed.name for allowed in self._allowed))
+            raise UnknownModelError(f"Unknown model '{name}'; offered: {offered}.")
+        return spec
+
+    def get(self, name: str | None = None) -> Model:
+        """Return a model, loading it first if necessary.
+
+        Loads of different models run concurrently; callers of a model that
+        is still loading wait for that load instead of starting another.
+
+        Args:
+            name (str | None): The model; None for the default model.
+
+        Returns:
+            Model: The loaded model.
+
+        Raises:
+            UnknownModelError: If the model is not offered.
+
+        """
+        spec = self.resolve(name)
+        with self._lock:
+            model = self._touch(spec)
+            if model is not None:
+                return model
+            loading = self._loading.setdefault(spec, threading.Lock())
+        with loading:
+            with self._lock:
+                model = self._touch(spec)
+                if model is None:
+                    self._evict(keep=spec, incoming_mb=spec.memory_mb)
+            if model is not None:
+                return model
+            logger.info("Loading Whisper model (%s)...", spec.name)
+            model = self._load(spec)
+            logger.info("Whisper model loaded (%s).", spec.name)
+            with self._lock:
+                self._models[spec] = model
+                self._evict(keep=spec)
+        return model
+
+    def loaded(self) -> list[str]:
+        """Return the loaded models, least recently used first.
+
+        Returns:
+            list[str]: Their names.
+
+        """
+        with self._lock:
+            return [spec.name for spec in self._models]
+
+    def clear(self) -> None:
+        """Drop every loaded model."""
+        with self._lock:
+            self._models.clear()
+
+    @property
+    def default(self) -> ModelSpec:
+        """Get the model used when a request names none."""
+        return self._default
+
+    def _touch(self, spec: ModelSpec) -> Model | None:
+        """Mark a loaded model as most recently used; hold the lock.
+
+        Args:
+            spec (ModelSpec): The model.
+
+        Returns:
+            Model | None: The model, or None if not loaded.
+
+        """
+        model = self._models.get(spec)
+        if model is not None:
+            self._models.move_to_end(spec)
+        return model
+
+    def _evict(self, keep: ModelSpec, incoming_mb: int = 0) -> None:
+        """Drop least recently used models until within budget; hold the lock.
+
+        Args:
+            keep (ModelSpec): The model never to drop.
+            incoming_mb (int): Memory of a model about to be loaded, which
+                must fit alongside the models kept.
+
+        """
+        used_mb = incoming_mb + sum(spec.memory_mb for spec in self._models)
+        for spec in list(self._models):
+            if used_mb <= self._memory_budget_mb:
+                return
+            if spec == keep:
+                continue
+            del self._models[spec]
+            used_mb -= spec.memory_mb
+            logger.info("Evicted Whisper model (%s) to stay in budget.", spec.name)
@@ -0,0 +1,327 @@
+"""Live dictation: voice-activity detection and rolling-window decoding."""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.transcription.whisper import LANGUAGE, SAMPLE_RATE, transcribe_samples
+from src.transcription.worker_pool import (
+    PoolSaturatedError,
+    TranscriptionPool,
+    transcription_pool,
+)
+
+logger = logging.getLogger(__name__)
+
+# VAD decides per 30 ms frame, the frame size WebRTC-style detectors use.
+FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000
+# How long a final decode waits before trying again when the pool is full.
+POOL_RETRY_SECONDS = 0.2
+
+REALTIME_VAD_THRESHOLD = float(os.getenv("REALTIME_VAD_THRESHOLD", "0.01"))
+REALTIME_ENDPOINT_SILENCE_SECONDS = float(
+    os.getenv("REALTIME_ENDPOINT_SILENCE_SECONDS", "0.6")
+)
+REALTIME_PARTIAL_INTERVAL_SECONDS = float(
+    os.getenv("REALTIME_PARTIAL_INTERVAL_SECONDS", "1")
+)
+REALTIME_WINDOW_SECONDS = float(os.getenv("REALTIME_WINDOW_SECONDS", "8"))
+REALTIME_MAX_UTTERANCE_SECONDS = float(
+    os.getenv("REALTIME_MAX_UTTERANCE_SECONDS", "20")
+)
+REALTIME_OVERLAP_SECONDS = float(os.getenv("REALTIME_OVERLAP_SECONDS", "0.5"))
+REALTIME_PARTIAL_BEAM_SIZE = int(os.getenv("REALTIME_PARTIAL_BEAM_SIZE", "1"))
+# A smaller model for partials, e.g. "small"; defaults to the final model.
+REALTIME_PARTIAL_MODEL = os.getenv("REALTIME_PARTIAL_MODEL") or None
+# Retries of a final decode refused by a full pool before the session fails.
+REALTIME_FINAL_RETRIES = int(os.getenv("REALTIME_FINAL_RETRIES", "10"))
+
+Emit = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class RealtimeOptions:
+    """How a dictation is segmented and decoded.
+
+    Attributes:
+        vad_threshold (float): RMS level, on samples in [-1, 1], above which
+            a frame counts as speech.
+        endpoint_silence_seconds (float): Silence after speech that ends an
+            utterance.
+        partial_interval_seconds (float): New audio between partial decodes.
+        window_seconds (float): Length of the trailing window decoded for a
+            partial; consecutive windows overlap.
+        max_utterance_seconds (float): Length at which an utterance is cut
+            even without a pause; must stay below Whisper's 30 s window.
+        overlap_seconds (float): Audio kept from before a cut, as pre-roll
+            for the next utterance.
+        partial_beam_size (int): Beam size for partials; finals use 5.
+        partial_model (str | None): Model decoding partials; None uses the
+            final model.
+        final_model (str | None): Model decoding finals; None uses the
+            service's default model.
+        final_retries (int): Times a final decode refused by a full pool is
+            retried, ``POOL_RETRY_SECONDS`` apart, before giving up.
+
+    """
+
+    vad_threshold: float = REALTIME_VAD_THRESHOLD
+    endpoint_silence_seconds: float = REALTIME_ENDPOINT_SILENCE_SECONDS
+    partial_interval_seconds: float = REALTIME_PARTIAL_INTERVAL_SECONDS
+    window_seconds: float = REALTIME_WINDOW_SECONDS
+    max_utterance_seconds: float = REALTIME_MAX_UTTERANCE_SECONDS
+    overlap_seconds: float = REALTIME_OVERLAP_SECONDS
+    partial_beam_size: int = REALTIME_PARTIAL_BEAM_SIZE
+    partial_model: str | None = REALTIME_PARTIAL_MODEL
+    final_model: str | None = None
+    final_retries: int = REALTIME_FINAL_RETRIES
+
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit PCM to float32 samples in [-1, 1].
+
+    Args:
+        pcm (bytes): The raw audio; a trailing odd byte is ignored.
+
+    Returns:
+        np.ndarray: The samples.
+
+    """
+    usable = len(pcm) - len(pcm) % 2
+    return np.frombuffer(pcm[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def speech_frames(samples: np.ndarray, threshold: float) -> np.ndarray:
+    """Classify each whole 30 ms frame of a clip as speech or not.
+
+    Args:
+        samples (np.ndarray): The float32 samples.
+        threshold (float): RMS level above which a frame is speech.
+
+    Returns:
+        np.ndarray: One boolean per frame.
+
+    """
+    frames = samples[: len(samples) // FRAME_SAMPLES * FRAME_SAMPLES]
+    rms = np.sqrt(np.mean(frames.reshape(-1, FRAME_SAMPLES) ** 2, axis=1))
+    return rms > threshold
+
+
+class DictationSession:
+    """Turns a live 16 kHz PCM stream into partial and final transcripts.
+
+    Audio accumulates into the current utterance. While speech is present,
+    the last ``window_seconds`` are decoded every ``partial_interval_seconds``
+    with a small beam and emitted as ``partial`` events; a partial is
+    skipped while another decode is still running, so slow decodes never
+    build a backlog. A pause of ``endpoint_silence_seconds``, or reaching
+    ``max_utterance_seconds``, decodes the whole utterance with the full
+    beam as a ``final`` event, conditioned on the previous final text.
+    """
+
+    def __init__(
+        self,
+        emit: Emit,
+        pool: TranscriptionPool = transcription_pool,
+        options: RealtimeOptions | None = None,
+    ) -> None:
+        """Start an empty session.
+
+        Args:
+            emit (Emit): Async callback receiving each event.
+            pool (TranscriptionPool): The pool running the decodes.
+            options (RealtimeOptions | None): Segmentation and decoding
+                settings; defaults to RealtimeOptions().
+
+        """
+        self._emit = emit
+        self._pool = pool
+        self._options = options or RealtimeOptions()
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._chunks: list[np.ndarray] = []
+        self._length = 0
+        self._utterance_start = 0
+        self._speech_seen = False
+        self._trailing_silence = 0
+        self._since_partial = 0
+        self._generation = 0
+        self._previous_text: str | None = None
+        self._decode_lock = asyncio.Lock()
+        self._partial_task: asyncio.Task | None = None
+
+    async def feed(self, pcm: bytes) -> None:
+        """Add audio, emitting partial and final transcripts as they are due.
+
+        Args:
+            pcm (bytes): Little-endian 16-bit mono PCM at 16 kHz.
+
+        Raises:
+            PoolSaturatedError: If a final decode found the pool full on
+                every try.
+            PoolClosedError: If the pool was shut down.
+
+        """
+        self._pending = np.concatenate([self._pending, pcm16_to_float(pcm)])
+        whole = len(self._pending) // FRAME_SAMPLES * FRAME_SAMPLES
+        if whole == 0:
+            return
+        chunk, self._pending = self._pending[:whole], self._pending[whole:]
+        speech = speech_frames(chunk, self._options.vad_threshold)
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        self._since_partial += len(chunk)
+        if speech.any():
+            self._speech_seen = True
+            last_speech = int(np.flatnonzero(speech)[-1])
+            self._trailing_silence = (len(speech) - 1 - last_speech) * FRAME_SAMPLES
+        else:
+            self._trailing_silence += len(chunk)
+        await self._advance()
+
+    async def finish(self) -> None:
+        """Emit the final transcript of any speech not yet finalized.
+
+        Raises:
+            PoolSaturatedError: If the final decode found the pool full on
+                every try.
+            PoolClosedError: If the pool was shut down.
+
+        """
+        if self._partial_task is not None:
+            await asyncio.wait([self._partial_task])
+        if self._speech_seen:
+            await self._finalize(keep=0)
+
+    async def close(self) -> None:
+        """Abandon the session, cancelling a partial decode in flight."""
+        if self._partial_task is not None:
+            self._partial_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._partial_task
+
+    async def _advance(self) -> None:
+        """Finalize, trim or partially decode the utterance after new audio."""
+        options = self._options
+        if not self._speech_seen:
+            # Keep only a short pre-roll of silence before speech starts.
+            self._truncate(_samples(options.overlap_seconds))
+            self._since_partial = 0
+        elif self._trailing_silence >= _samples(options.endpoint_silence_seconds):
+            await self._finalize(keep=self._trailing_silence)
+        elif self._length >= _samples(options.max_utterance_seconds):
+            await self._finalize(keep=_samples(options.overlap_seconds))
+        elif self._since_partial >= _samples(options.partial_interval_seconds):
+            self._since_partial = 0
+            if not self._decode_lock.locked():
+                window = self._audio()[-_samples(options.window_seconds) :]
+                self._partial_task = asyncio.create_task(
+                    self._partial(window, self._generation)
+                )
+
+    async def _partial(self, window: np.ndarray, generation: int) -> None:
+        """Decode a window and emit it unless its utterance was finalized.
+
+        Args:
+            window (np.ndarray): The trailing audio of the utterance.
+            generation (int): The utterance the window belongs to.
+
+        """
+        async with self._decode_lock:
+            try:
+                text = await self._pool.run(
+                    transcribe_samples,
+                    window,
+                    self._options.partial_beam_size,
+                    self._previous_text,
+                    LANGUAGE,
+                    self._options.partial_model or self._options.final_model,
+                )
+            except PoolSaturatedError:
+                return
+            except Exception as e:
+                logger.exception("Partial decode failed: %s", e)
+                return
+        if generation == self._generation and text:
+            await self._emit({"type": "partial", "text": text})
+
+    async def _finalize(self, keep: int) -> None:
+        """Decode the utterance as a final segment and start the next one.
+
+        Args:
+            keep (int): Trailing samples carried into the next utterance,
+                either the pause that ended it or an overlap after a cut.
+
+        Raises:
+            PoolSaturatedError: If the pool was full on every try.
+            PoolClosedError: If the pool was shut down.
+
+        """
+        audio, start = self._audio(), self._utterance_start
+        self._generation += 1
+        self._speech_seen = False
+        self._since_partial = 0
+        self._trailing_silence = 0
+        self._truncate(keep)
+        retries = self._options.final_retries
+        async with self._decode_lock:
+            for attempt in range(retries + 1):
+                try:
+                    text = await self._pool.run(
+                        transcribe_samples,
+                        audio,
+                        5,
+                        self._previous_text,
+                        LANGUAGE,
+                        self._options.final_model,
+                    )
+                    break
+                except PoolSaturatedError:
+                    if attempt == retries:
+                        raise
+                    await asyncio.sleep(POOL_RETRY_SECONDS)
+        if not text:
+            return
+        self._previous_text = text
+        await self._emit(
+            {
+                "type": "final",
+                "start": start / SAMPLE_RATE,
+                "end": (start + len(audio)) / SAMPLE_RATE,
+                "text": text,
+            }
+        )
+
+    def _audio(self) -> np.ndarray:
+        """Return the current utterance as one array.
+
+        Returns:
+            np.ndarray: The utterance's samples.
+
+        """
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0] if self._chunks else np.zeros(0, dtype=np.float32)
+
+    def _truncate(self, keep: int) -> None:
+        """Drop all but the last samples of the utterance.
+
+        Args:
+            keep (int): Samples to keep.
+
+        """
+        if self._length <= keep:
+            return
+        tail = self._audio()[self._length - keep :]
+        self._utterance_start += self._length - len(tail)
+        self._chunks = [tail] if len(tail) else []
+        self._length = len(tail)
+
+
+def _samples(seconds: float) -> int:
+    return int(seconds * SAMPLE_RATE)
@@ -1,29 +1,90 @@
-import os
-import tempfile
+import logging
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+import orjson
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
 from src.messaging.messaging_manager import messaging_manager
-from src.messaging.pubsub_exchanges import TRANSCRIPTION_COMPLETED
+from src.messaging.pubsub_exchanges import (
+    TRANSCRIPTION_COMPLETED,
+    TRANSCRIPTION_SEGMENT,
+)
+from src.models.msg.abstract_message import AbstractMessage
 from src.models.msg.transcript_message import TranscriptMessage
-from src.transcription.whisper import transcribe_audio
+from src.models.msg.transcript_segment_message import TranscriptSegmentMessage
+from src.transcription.batching import transcription_batcher
+from src.transcription.job_store import TranscriptionJob
+from src.transcription.jobs import JobBacklogFullError, job_runner
+from src.transcription.model_registry import UnknownModelError
+from src.transcription.realtime import DictationSession, RealtimeOptions
+from src.transcription.uploads import UPLOAD_OPENAPI, upload_file
+from src.transcription.whisper import (
+    LANGUAGE,
+    TranscriptSegment,
+    join_segments,
+    model_registry,
+    transcribe_segments,
+)
+from src.transcription.worker_pool import (
+    TRANSCRIPTION_RETRY_AFTER_SECONDS,
+    PoolClosedError,
+    PoolSaturatedError,
+    transcription_pool,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/transcription", tags=["transcription"])
 
+UPLOAD = Depends(upload_file)
+MODEL_QUERY = Query(
+    None,
+    description="Whisper model as size or size:compute_type, e.g. 'small' or "
+    "'medium:int8'; defaults to the service's model.",
+)
+
+# Sent by a realtime client once it stops recording.
+END_OF_DICTATION = "end"
+# Stands in for the upload filename in messages about a dictation.
+REALTIME_FILENAME = "dictation"
 
-@router.post("/")
-async def transcribe(file: UploadFile = File(...)) -> dict[str, str]:
-    """Receive an audio file, return its transcript, and publish it to RabbitMQ."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        tmp.write(await file.read())
-        tmp_path = tmp.name
 
+@router.post("/", openapi_extra=UPLOAD_OPENAPI)
+async def transcribe(
+    file: UploadFile = UPLOAD, model: str | None = MODEL_QUERY
+) -> dict[str, str]:
+    """Receive an audio file, return its transcript, and publish it to RabbitMQ.
+
+    The spooled upload is decoded straight from its file object, so the audio
+    is never copied to another file. Short clips are batched with concurrent
+    requests before inference. Transcription runs on the worker pool; when
+    it is full the request is refused with 429, or 503 while shutting down,
+    both with Retry-After.
+    """
+    _check_model(model)
+    await file.seek(0)
     try:
-        transcript, language, language_probability = transcribe_audio(tmp_path)
+        (
+            transcript,
+            language,
+            language_probability,
+        ) = await transcription_batcher.transcribe(file.file, LANGUAGE, model)
+    except (PoolSaturatedError, PoolClosedError) as e:
+        raise _unavailable(e) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
-    finally:
-        os.unlink(tmp_path)
 
     message = TranscriptMessage(
         filename=file.filename or "unknown",
@@ -42,3 +103,250 @@ async def transcribe(file: UploadFile = File(...)) -> dict[str, str]:
         ) from e
 
     return {"transcript": transcript}
+
+
+@router.post("/stream", openapi_extra=UPLOAD_OPENAPI)
+async def transcribe_stream(
+    file: UploadFile = UPLOAD, model: str | None = MODEL_QUERY
+) -> StreamingResponse:
+    """Transcribe an audio file, streaming segments as NDJSON while they decode.
+
+    The first line carries the detected language, then one line per segment
+    follows as soon as Whisper has decoded it. Each segment is also
+    published as a ``TranscriptSegmentMessage``, and the complete transcript
+    as a ``TranscriptMessage`` once the stream ends.
+    """
+    _check_model(model)
+    await file.seek(0)
+    try:
+        segments, language, language_probability = await transcription_pool.run(
+            transcribe_segments, file.file, LANGUAGE, model
+        )
+    except (PoolSaturatedError, PoolClosedError) as e:
+        raise _unavailable(e) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    return StreamingResponse(
+        _stream_segments(
+            file.filename or "unknown", segments, language, language_probability
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/jobs", status_code=202, openapi_extra=UPLOAD_OPENAPI)
+async def submit_job(file: UploadFile = UPLOAD) -> TranscriptionJob:
+    """Queue an audio file for transcription and return the job immediately.
+
+    Poll ``GET /transcription/jobs/{job_id}`` for the result, or consume the
+    ``transcription.completed`` event carrying the job id.
+    """
+    await file.seek(0)
+    try:
+        return await job_runner.submit(file.filename or "unknown", file.file)
+    except JobBacklogFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(TRANSCRIPTION_RETRY_AFTER_SECONDS)},
+        ) from e
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> TranscriptionJob:
+    """Return the status, and once done the transcript, of a job."""
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
+
+
+@router.websocket("/realtime")
+async def transcribe_realtime(websocket: WebSocket, model: str | None = None) -> None:
+    """Transcribe live dictation, pushing text back while the user speaks.
+
+    The client sends 16 kHz mono 16-bit little-endian PCM as binary frames
+    and the text frame ``end`` when it stops recording. The server answers
+    with JSON text frames: ``partial`` events carry the provisional text of
+    the utterance in progress, ``final`` events the settled text and timing
+    of each utterance, which is also published as a
+    ``TranscriptSegmentMessage``. After ``end`` the whole transcript is
+    published as a ``TranscriptMessage`` and the socket is closed; if the
+    pool shuts down meanwhile, or stays too full to decode a final, it is
+    closed with 1013 (try again later).
+    ``model`` picks the model of the finals; an unknown one refuses the
+    connection with 1008.
+    """
+    try:
+        model_registry.resolve(model)
+    except UnknownModelError as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+        return
+    await websocket.accept()
+    stream_id = uuid.uuid4().hex
+    texts: list[str] = []
+
+    async def emit(event: dict[str, Any]) -> None:
+        await websocket.send_text(orjson.dumps(event).decode())
+        if event["type"] != "final":
+            return
+        await _publish_quietly(
+            TRANSCRIPTION_SEGMENT,
+            TranscriptSegmentMessage(
+                stream_id=stream_id,
+                filename=REALTIME_FILENAME,
+                index=len(texts),
+                start=event["start"],
+                end=event["end"],
+                text=event["text"],
+                language=LANGUAGE,
+            ),
+        )
+        texts.append(event["text"])
+
+    session = DictationSession(emit, options=RealtimeOptions(final_model=model))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                await session.feed(message["bytes"])
+            elif message.get("text") == END_OF_DICTATION:
+                await session.finish()
+                break
+    except WebSocketDisconnect:
+        return
+    except (PoolSaturatedError, PoolClosedError) as e:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(e))
+        return
+    finally:
+        await session.close()
+    await _publish_quietly(
+        TRANSCRIPTION_COMPLETED,
+        TranscriptMessage(
+            filename=REALTIME_FILENAME,
+            transcript=join_segments(texts),
+            language=LANGUAGE,
+            # The language of a dictation is configured, not detected.
+            language_probability=1.0,
+        ),
+    )
+    await websocket.close()
+
+
+async def _stream_segments(
+    filename: str,
+    segments: Iterator[TranscriptSegment],
+    language: str,
+    language_probability: float,
+) -> AsyncIterator[bytes]:
+    """Yield NDJSON lines for a transcription and publish its segments.
+
+    Args:
+        filename (str): Original name of the uploaded audio file.
+        segments (Iterator[TranscriptSegment]): The lazily decoded segments.
+        language (str): Detected language code.
+        language_probability (float): Confidence of the language.
+
+    Yields:
+        bytes: One JSON document per line.
+
+    """
+    stream_id = uuid.uuid4().hex
+    yield _ndjson(
+        type="language", language=language, language_probability=language_probability
+    )
+    texts: list[str] = []
+    index = 0
+    async for segment in transcription_pool.iterate(segments):
+        texts.append(segment.text)
+        yield _ndjson(
+            type="segment", start=segment.start, end=segment.end, text=segment.text
+        )
+        await _publish_quietly(
+            TRANSCRIPTION_SEGMENT,
+            TranscriptSegmentMessage(
+                stream_id=stream_id,
+                filename=filename,
+                index=index,
+                start=segment.start,
+                end=segment.end,
+                text=segment.text,
+                language=language,
+            ),
+        )
+        index += 1
+    await _publish_quietly(
+        TRANSCRIPTION_COMPLETED,
+        TranscriptMessage(
+            filename=filename,
+            transcript=join_segments(texts),
+            language=language,
+            language_probability=language_probability,
+        ),
+    )
+
+
+def _ndjson(**fields: str | float) -> bytes:
+    """Encode one NDJSON line.
+
+    Args:
+        **fields (str | float): The fields of the JSON object.
+
+    Returns:
+        bytes: The JSON object followed by a newline.
+
+    """
+    return orjson.dumps(fields) + b"\n"
+
+
+async def _publish_quietly(exchange: str, message: AbstractMessage) -> None:
+    """Publish a message, logging rather than raising if the broker fails.
+
+    The response is already streaming, so a failed publish can no longer be
+    reported to the client.
+
+    Args:
+        exchange (str): The exchange to publish on.
+        message (AbstractMessage): The message.
+
+    """
+    try:
+        await messaging_manager.get_pubsub(exchange).publish(message)
+    except Exception as e:
+        logger.exception("Failed to publish %s: %s", type(message).__name__, e)
+
+
+def _check_model(model: str | None) -> None:
+    """Reject a request naming a model the service does not offer.
+
+    Args:
+        model (str | None): The requested model.
+
+    Raises:
+        HTTPException: 422 if the model is unknown.
+
+    """
+    try:
+        model_registry.resolve(model)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+
+def _unavailable(error: PoolSaturatedError | PoolClosedError) -> HTTPException:
+    """Map a refused admission to a response telling the client to retry.
+
+    Args:
+        error (PoolSaturatedError | PoolClosedError): Why the pool refused.
+
+    Returns:
+        HTTPException: 429 when the pool is full, 503 while shutting down,
+            both with Retry-After.
+
+    """
+    return HTTPException(
+        status_code=429 if isinstance(error, PoolSaturatedError) else 503,
+        detail=str(error),
+        headers={"Retry-After": str(TRANSCRIPTION_RETRY_AFTER_SECONDS)},
+    )
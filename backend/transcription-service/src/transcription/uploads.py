@@ -0,0 +1,184 @@
+"""Multipart audio uploads spooled in memory, or on disk once they grow large."""
+
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from tempfile import SpooledTemporaryFile
+
+from fastapi import HTTPException, Request, UploadFile
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+
+# Uploads stay in memory up to this size and roll over to disk beyond it.
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+# The form field carrying the audio file.
+UPLOAD_FIELD = "file"
+
+# Request body schema of the upload routes, which parse the body themselves.
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": [UPLOAD_FIELD],
+                    "properties": {
+                        UPLOAD_FIELD: {"type": "string", "format": "binary"}
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+class _FilePart:
+    """Picks the audio file out of a multipart body as it is parsed.
+
+    The parser calls back synchronously, so data of the file part is only
+    collected here and written to the spool by ``read_upload`` in between
+    chunks, where writes that reach the disk can leave the event loop.
+    """
+
+    def __init__(self) -> None:
+        """Start before the first part."""
+        self.filename: str | None = None
+        self.headers: list[tuple[bytes, bytes]] = []
+        self.found = False
+        self.pending: list[bytes] = []
+        self._reading = False
+        self._part_headers: list[tuple[bytes, bytes]] = []
+        self._field = b""
+        self._value = b""
+
+    def callbacks(self) -> dict:
+        """Return the parser callbacks feeding this collector.
+
+        Returns:
+            dict: Callbacks by the name ``MultipartParser`` expects.
+
+        """
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self) -> None:
+        self._part_headers = []
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._part_headers.append((self._field.lower(), self._value))
+        self._field, self._value = b"", b""
+
+    def _on_headers_finished(self) -> None:
+        disposition = dict(self._part_headers).get(b"content-disposition")
+        _, options = parse_options_header(disposition)
+        is_upload = options.get(b"name") == UPLOAD_FIELD.encode()
+        self._reading = is_upload and b"filename" in options and not self.found
+        if self._reading:
+            self.found = True
+            self.filename = options[b"filename"].decode(errors="replace")
+            self.headers = self._part_headers
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._reading:
+            self.pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._reading = False
+
+
+async def read_upload(request: Request) -> UploadFile:
+    """Parse the audio file of a multipart request into a spooled file.
+
+    The body is read chunk by chunk; the file stays in memory up to
+    ``UPLOAD_SPOOL_MAX_BYTES`` and is written to disk beyond that, off the
+    event loop. Other form fields are skipped.
+
+    Args:
+        request (Request): The upload request.
+
+    Returns:
+        UploadFile: The file, positioned at its start.
+
+    Raises:
+        HTTPException: 422 if the request is not a multipart upload with a
+            ``file`` field, 400 if its body is malformed.
+
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type"))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Expected a multipart/form-data upload with a '{UPLOAD_FIELD}'"
+            " file field.",
+        )
+    part = _FilePart()
+    parser = MultipartParser(boundary, part.callbacks())
+    # Handed to the caller, who closes it.
+    spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES)  # noqa: SIM115
+    size = 0
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for data in part.pending:
+                size += len(data)
+                if size <= UPLOAD_SPOOL_MAX_BYTES:
+                    spool.write(data)
+                else:
+                    await asyncio.to_thread(spool.write, data)
+            part.pending.clear()
+        parser.finalize()
+    except MultipartParseError as e:
+        spool.close()
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except BaseException:
+        spool.close()
+        raise
+    if not part.found:
+        spool.close()
+        raise HTTPException(
+            status_code=422,
+            detail=f"The upload has no '{UPLOAD_FIELD}' file field.",
+        )
+    spool.seek(0)
+    return UploadFile(
+        file=spool,  # type: ignore[arg-type]
+        size=size,
+        filename=part.filename,
+        headers=Headers(raw=part.headers),
+    )
+
+
+async def upload_file(request: Request) -> AsyncIterator[UploadFile]:
+    """Provide a route's uploaded audio file and close it afterwards.
+
+    Args:
+        request (Request): The upload request.
+
+    Yields:
+        UploadFile: The spooled file.
+
+    Raises:
+        HTTPException: If the body holds no valid upload.
+
+    """
+    upload = await read_upload(request)
+    try:
+        yield upload
+    finally:
+        await upload.close()
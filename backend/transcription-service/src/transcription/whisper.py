@@ -1,44 +1,275 @@
 import logging
 import os
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
 from datetime import datetime
+from typing import BinaryIO
 
-from faster_whisper import WhisperModel
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+from src.transcription.model_registry import ModelRegistry, ModelSpec
+from src.transcription.worker_pool import TRANSCRIPTION_WORKERS
 
 logger = logging.getLogger(__name__)
 
 MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "medium")
+# Further models, as size or size:compute_type, that requests may pick.
+MODELS = [
+    ModelSpec.parse(name)
+    for name in os.getenv("WHISPER_MODELS", "").split(",")
+    if name.strip()
+]
 LANGUAGE = os.getenv("WHISPER_LANGUAGE", "en")
+SAMPLE_RATE = 16000
+# Whisper decodes audio in windows of this length.
+CLIP_SECONDS = 30
+# Each concurrent transcription gets its own share of the cores.
+CPU_THREADS = max(1, (os.cpu_count() or 1) // TRANSCRIPTION_WORKERS)
+
+
+def _load_model(spec: ModelSpec) -> WhisperModel:
+    """Load a Whisper model onto the CPU.
+
+    Args:
+        spec (ModelSpec): The size and compute type.
+
+    Returns:
+        WhisperModel: The model, with one replica per pool worker.
+
+    """
+    return WhisperModel(
+        spec.size,
+        device="cpu",
+        compute_type=spec.compute_type,
+        cpu_threads=CPU_THREADS,
+        num_workers=TRANSCRIPTION_WORKERS,
+    )
+
+
+model_registry: ModelRegistry[WhisperModel] = ModelRegistry(
+    _load_model, ModelSpec.parse(MODEL_SIZE), MODELS
+)
+
+
+def get_model(model: str | None = None) -> WhisperModel:
+    """Return a loaded WhisperModel, loading it if necessary.
+
+    Args:
+        model (str | None): ``size`` or ``size:compute_type`` of an offered
+            model; None for the default model.
+
+    Returns:
+        WhisperModel: The model.
+
+    Raises:
+        UnknownModelError: If the model is not offered.
 
-_model_cache: list[WhisperModel | None] = [None]
+    """
+    return model_registry.get(model)
 
 
-def get_model() -> WhisperModel:
-    """Return the cached WhisperModel, loading it if necessary."""
-    if _model_cache[0] is None:
-        logger.info("Loading Whisper model (%s)...", MODEL_SIZE)
-        _model_cache[0] = WhisperModel(MODEL_SIZE, device="cpu", compute_type="int8")
-        logger.info("Whisper model loaded.")
-    return _model_cache[0]  # type: ignore[return-value]
+@dataclass(frozen=True)
+class TranscriptSegment:
+    """A decoded stretch of speech.
+
+    Attributes:
+        start (float): Start of the segment, in seconds from the audio start.
+        end (float): End of the segment, in seconds.
+        text (str): The transcribed text.
+
+    """
+
+    start: float
+    end: float
+    text: str
+
+
+def transcribe_segments(
+    audio: str | BinaryIO | np.ndarray,
+    language: str = LANGUAGE,
+    model: str | None = None,
+) -> tuple[Iterator[TranscriptSegment], str, float]:
+    """Start transcribing audio, yielding segments as Whisper decodes them.
+
+    Only language detection runs before this returns; each segment is
+    decoded when the iterator is advanced, so the caller sees text early
+    and holds one segment at a time.
+
+    Args:
+        audio (str | BinaryIO | np.ndarray): A file path, an open audio file
+            (decoded without touching disk), or 16 kHz mono float32 samples.
+        language (str): ISO 639-1 language code of the speech.
+        model (str | None): The model to use; None for the default model.
+
+    Returns:
+        tuple[Iterator[TranscriptSegment], str, float]: The lazy segments,
+            the detected language and its probability.
+
+    """
+    segments, info = get_model(model).transcribe(audio, beam_size=5, language=language)
+    logger.info(
+        "Detected language: %s (probability: %.2f)",
+        info.language,
+        info.language_probability,
+    )
+
+    def decode() -> Iterator[TranscriptSegment]:
+        for segment in segments:
+            logger.debug(
+                "[%.2fs -> %.2fs] %s", segment.start, segment.end, segment.text
+            )
+            yield TranscriptSegment(segment.start, segment.end, segment.text)
+
+    return decode(), info.language, info.language_probability
 
 
 def transcribe_audio(
-    audio_file: str,
+    audio: str | BinaryIO | np.ndarray,
     language: str = LANGUAGE,
+    model: str | None = None,
 ) -> tuple[str, str, float]:
-    """Transcribe an audio file using Faster-Whisper."""
-    model = get_model()
-    segments, info = model.transcribe(audio_file, beam_size=5, language=language)
+    """Transcribe audio using Faster-Whisper.
+
+    Args:
+        audio (str | BinaryIO | np.ndarray): A file path, an open audio file
+            (decoded without touching disk), or 16 kHz mono float32 samples.
+        language (str): ISO 639-1 language code of the speech.
+        model (str | None): The model to use; None for the default model.
 
-    lang = info.language
-    prob = info.language_probability
-    logger.info("Detected language: %s (probability: %.2f)", lang, prob)
+    Returns:
+        tuple[str, str, float]: The transcript, the detected language and its
+            probability.
 
-    full_transcript = ""
+    """
+    segments, lang, prob = transcribe_segments(audio, language, model)
+    return join_segments(segment.text for segment in segments), lang, prob
+
+
+def transcribe_samples(
+    samples: np.ndarray,
+    beam_size: int = 5,
+    initial_prompt: str | None = None,
+    language: str = LANGUAGE,
+    model: str | None = None,
+) -> str:
+    """Transcribe a short clip of live audio.
+
+    Skips language detection and timestamps, which live dictation does not
+    need, so a clip decodes in as few passes as possible.
+
+    Args:
+        samples (np.ndarray): 16 kHz mono float32 samples, under 30 s.
+        beam_size (int): Beam size; 1 decodes greedily.
+        initial_prompt (str | None): Preceding text, to keep the wording of
+            consecutive clips consistent.
+        language (str): ISO 639-1 language code of the speech.
+        model (str | None): The model to use; None for the default model.
+
+    Returns:
+        str: The transcript.
+
+    """
+    segments, _ = get_model(model).transcribe(
+        samples,
+        beam_size=beam_size,
+        language=language,
+        initial_prompt=initial_prompt,
+        condition_on_previous_text=False,
+        without_timestamps=True,
+    )
+    return join_segments(segment.text for segment in segments)
+
+
+def transcribe_batch(
+    clips: Sequence[np.ndarray],
+    language: str = LANGUAGE,
+    model: str | None = None,
+) -> list[str]:
+    """Transcribe several short clips in batched inference calls.
+
+    The clips are laid end to end and each is marked as its own Whisper
+    window, so they are encoded and decoded together as one batch while
+    staying independent of each other.
+
+    Args:
+        clips (Sequence[np.ndarray]): 16 kHz mono float32 samples, each at
+            most ``CLIP_SECONDS`` long.
+        language (str): ISO 639-1 language code of the speech.
+        model (str | None): The model to use; None for the default model.
+
+    Returns:
+        list[str]: The transcript of each clip, in order.
+
+    """
+    texts: list[list[str]] = [[] for _ in clips]
+    # Empty clips have nothing to decode and would yield an empty window.
+    decoded = [i for i, clip in enumerate(clips) if len(clip)]
+    if not decoded:
+        return ["" for _ in clips]
+    lengths = [len(clips[i]) for i in decoded]
+    bounds = (np.cumsum([0, *lengths]) / SAMPLE_RATE).tolist()
+    pipeline = BatchedInferencePipeline(get_model(model))
+    segments, _ = pipeline.transcribe(
+        np.concatenate([clips[i] for i in decoded]),
+        language=language,
+        beam_size=5,
+        batch_size=len(decoded),
+        clip_timestamps=[
+            {"start": start, "end": end}
+            for start, end in zip(bounds[:-1], bounds[1:], strict=True)
+        ],
+    )
     for segment in segments:
-        logger.debug("[%.2fs -> %.2fs] %s", segment.start, segment.end, segment.text)
-        full_transcript += segment.text + " "
+        middle = (segment.start + segment.end) / 2
+        texts[decoded[bisect_right(bounds, middle) - 1]].append(segment.text)
+    return [join_segments(clip_texts) for clip_texts in texts]
+
+
+def transcribe_chunked(
+    samples: np.ndarray,
+    batch_size: int,
+    language: str = LANGUAGE,
+    model: str | None = None,
+) -> tuple[str, str, float]:
+    """Transcribe long audio by decoding its speech chunks in batches.
+
+    Voice-activity detection splits the audio into chunks of at most
+    ``CLIP_SECONDS`` at pauses, which are then decoded ``batch_size`` at a
+    time instead of one window after another. Chunks are not conditioned
+    on the text before them.
+
+    Args:
+        samples (np.ndarray): 16 kHz mono float32 samples.
+        batch_size (int): Chunks decoded per inference call.
+        language (str): ISO 639-1 language code of the speech.
+        model (str | None): The model to use; None for the default model.
+
+    Returns:
+        tuple[str, str, float]: The transcript, the language and its
+            probability.
+
+    """
+    pipeline = BatchedInferencePipeline(get_model(model))
+    segments, info = pipeline.transcribe(
+        samples, language=language, beam_size=5, batch_size=batch_size
+    )
+    transcript = join_segments(segment.text for segment in segments)
+    return transcript, info.language, info.language_probability
+
+
+def join_segments(texts: Iterable[str]) -> str:
+    """Join segment texts into one transcript.
+
+    Args:
+        texts (Iterable[str]): The segment texts, in order.
+
+    Returns:
+        str: The texts separated by spaces, without outer whitespace.
 
-    return full_transcript.strip(), lang, prob
+    """
+    return " ".join(texts).strip()
 
 
 def save_transcript(transcript: str, filename: str = "transcript.txt") -> None:
@@ -0,0 +1,188 @@
+"""Bounded pool running blocking transcriptions off the event loop."""
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Whisper inference runs in CTranslate2, which releases the GIL, so worker
+# threads share one loaded model and still use every core.
+TRANSCRIPTION_WORKERS = int(
+    os.getenv("TRANSCRIPTION_WORKERS", str(max(1, (os.cpu_count() or 1) // 4)))
+)
+# Requests allowed to wait for a free worker before new ones are turned away.
+TRANSCRIPTION_QUEUE_SIZE = int(os.getenv("TRANSCRIPTION_QUEUE_SIZE", "4"))
+TRANSCRIPTION_RETRY_AFTER_SECONDS = int(
+    os.getenv("TRANSCRIPTION_RETRY_AFTER_SECONDS", "30")
+)
+
+Result = TypeVar("Result")
+Item = TypeVar("Item")
+
+_END = object()
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the admission queue is full."""
+
+
+class PoolClosedError(Exception):
+    """Raised when the pool no longer accepts work, e.g. during shutdown."""
+
+
+class TranscriptionPool:
+    """Thread pool with bounded admission for CPU-heavy transcriptions.
+
+    At most ``workers`` jobs run at once and ``queue_size`` more wait for a
+    worker. Further submissions fail immediately instead of queueing without
+    bound, so callers can tell clients to come back later while the event
+    loop keeps serving other requests.
+    """
+
+    def __init__(
+        self,
+        workers: int = TRANSCRIPTION_WORKERS,
+        queue_size: int = TRANSCRIPTION_QUEUE_SIZE,
+    ) -> None:
+        """Initialize the pool; threads are started on first use.
+
+        Args:
+            workers (int): Jobs run concurrently.
+            queue_size (int): Jobs allowed to wait for a worker.
+
+        """
+        self._workers = workers
+        self._capacity = workers + queue_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="transcription"
+        )
+        self._admitted = 0
+        self._closed = False
+
+    async def run(self, fn: Callable[..., Result], *args: Any) -> Result:  # noqa: ANN401
+        """Run a blocking function on a worker thread.
+
+        Args:
+            fn (Callable[..., Result]): The function to run.
+            *args (Any): Its positional arguments.
+
+        Returns:
+            Result: What the function returned.
+
+        Raises:
+            PoolSaturatedError: If the pool is at capacity.
+            PoolClosedError: If the pool was shut down.
+
+        """
+        async with self.admit():
+            return await self.run_admitted(fn, *args)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold one admission across several calls made for one request.
+
+        Work run with ``run_admitted`` inside the block counts against this
+        admission instead of being checked again, so a request that was let
+        in is never refused halfway, and time spent between calls, e.g.
+        waiting for a batch, still counts against the pool's capacity.
+
+        Yields:
+            None: While the admission is held.
+
+        Raises:
+            PoolSaturatedError: If the pool is at capacity.
+            PoolClosedError: If the pool was shut down.
+
+        """
+        if self._closed:
+            raise PoolClosedError("Transcription pool is shutting down.")
+        if self._admitted >= self._capacity:
+            raise PoolSaturatedError(
+                f"All {self._workers} transcription workers are busy and "
+                f"{self._capacity - self._workers} requests are waiting."
+            )
+        self._admitted += 1
+        try:
+            yield
+        finally:
+            self._admitted -= 1
+
+    async def run_admitted(self, fn: Callable[..., Result], *args: Any) -> Result:  # noqa: ANN401
+        """Run a blocking function for work already admitted through ``admit``.
+
+        Args:
+            fn (Callable[..., Result]): The function to run.
+            *args (Any): Its positional arguments.
+
+        Returns:
+            Result: What the function returned.
+
+        Raises:
+            PoolClosedError: If the pool was shut down.
+
+        """
+        if self._closed:
+            raise PoolClosedError("Transcription pool is shutting down.")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(fn, *args)
+        )
+
+    async def iterate(self, items: Iterator[Item]) -> AsyncIterator[Item]:
+        """Advance a blocking iterator on the worker threads.
+
+        Meant for the lazy result of a call admitted through ``run``, such as
+        a transcription's segments. The stream occupies a slot while it is
+        consumed but is not admission-checked, so a started stream is never
+        cut off.
+
+        Args:
+            items (Iterator[Item]): The iterator, advanced one item per hop.
+
+        Yields:
+            Item: The iterator's items, in order.
+
+        """
+        self._admitted += 1
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                item = await loop.run_in_executor(self._executor, next, items, _END)
+                if item is _END:
+                    return
+                yield item
+        finally:
+            self._admitted -= 1
+
+    def shutdown(self) -> None:
+        """Stop admitting work and wait for running jobs to finish."""
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("Transcription pool shut down.")
+
+    @property
+    def workers(self) -> int:
+        """Get the number of jobs run concurrently."""
+        return self._workers
+
+    def stats(self) -> dict[str, int]:
+        """Return the pool's occupancy.
+
+        Returns:
+            dict[str, int]: Workers, capacity, and jobs admitted (running or
+                waiting).
+
+        """
+        return {
+            "workers": self._workers,
+            "capacity": self._capacity,
+            "admitted": self._admitted,
+        }
+
+
+transcription_pool = TranscriptionPool()
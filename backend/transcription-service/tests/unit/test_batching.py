@@ -0,0 +1,150 @@
+"""Unit tests for src/transcription/batching.py."""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import asynccontextmanager
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.transcription.batching import BatchScheduler
+from src.transcription.model_registry import ModelSpec
+from src.transcription.whisper import CLIP_SECONDS, SAMPLE_RATE
+from src.transcription.worker_pool import PoolSaturatedError, TranscriptionPool
+
+BATCH_SIZE = 3
+LONG_WAIT_SECONDS = 60
+
+
+def _clip(seconds: float = 1.0) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+class InlinePool:
+    """Admits every request and runs functions inline on the event loop."""
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Admit the request."""
+        yield
+
+    async def run_admitted(self, fn: Callable[..., Any], *args: Any) -> Any:  # noqa: ANN401
+        """Return the function's result."""
+        return fn(*args)
+
+
+def _transcribe_batch(clips: Sequence[np.ndarray], *_: object) -> list[str]:
+    return [f"clip of {len(clip)}" for clip in clips]
+
+
+@patch("src.transcription.batching.transcribe_batch", side_effect=_transcribe_batch)
+class TestBatchScheduler:
+    """Tests for BatchScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_decodes_immediately(self, mock_batch: MagicMock) -> None:
+        """A batch that fills up is decoded without waiting for the window."""
+        scheduler = BatchScheduler(InlinePool(), BATCH_SIZE, LONG_WAIT_SECONDS)
+        texts = await asyncio.gather(
+            *(scheduler.submit(_clip(i + 1)) for i in range(BATCH_SIZE))
+        )
+
+        mock_batch.assert_called_once()
+        assert texts == [f"clip of {(i + 1) * SAMPLE_RATE}" for i in range(BATCH_SIZE)]
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_decodes_after_wait(
+        self, mock_batch: MagicMock
+    ) -> None:
+        """A lone clip is decoded once the wait window passes."""
+        scheduler = BatchScheduler(InlinePool(), BATCH_SIZE, max_wait_seconds=0.01)
+        text = await scheduler.submit(_clip())
+
+        assert text == f"clip of {SAMPLE_RATE}"
+        assert len(mock_batch.call_args.args[0]) == 1
+
+    @pytest.mark.asyncio
+    async def test_batches_by_model(self, mock_batch: MagicMock) -> None:
+        """Clips for different models never share a batch."""
+        scheduler = BatchScheduler(InlinePool(), BATCH_SIZE, max_wait_seconds=0.01)
+        with patch("src.transcription.batching.model_registry") as mock_registry:
+            mock_registry.resolve.side_effect = ModelSpec.parse
+            await asyncio.gather(
+                scheduler.submit(_clip(), model="small"),
+                scheduler.submit(_clip(), model="medium"),
+            )
+
+        assert mock_batch.call_count == len(["small", "medium"])
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_caller(self, mock_batch: MagicMock) -> None:
+        """A failed batch fails each request in it."""
+        mock_batch.side_effect = RuntimeError("bad")
+        scheduler = BatchScheduler(InlinePool(), BATCH_SIZE, max_wait_seconds=0.01)
+        results = await asyncio.gather(
+            scheduler.submit(_clip()), scheduler.submit(_clip()), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    @patch("src.transcription.batching.decode_audio", return_value=_clip())
+    async def test_requests_waiting_for_a_batch_hold_capacity(
+        self, _mock_decode: MagicMock, mock_batch: MagicMock
+    ) -> None:
+        """Requests stay admitted while they wait, and their batch still runs."""
+        pool = TranscriptionPool(workers=1, queue_size=1)
+        admitted_during_batch: list[int] = []
+
+        def transcribe_batch(clips: Sequence[np.ndarray], *args: object) -> list[str]:
+            admitted_during_batch.append(pool.stats()["admitted"])
+            return _transcribe_batch(clips, *args)
+
+        mock_batch.side_effect = transcribe_batch
+        scheduler = BatchScheduler(pool, BATCH_SIZE, max_wait_seconds=0.01)
+        waiting = [
+            asyncio.create_task(scheduler.transcribe("fake.wav", "en"))
+            for _ in range(pool.stats()["capacity"])
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(PoolSaturatedError):
+            await scheduler.transcribe("fake.wav", "en")
+        results = await asyncio.gather(*waiting)
+        pool.shutdown()
+
+        assert [text for text, *_ in results] == [f"clip of {SAMPLE_RATE}"] * len(
+            waiting
+        )
+        assert admitted_during_batch == [len(waiting)]
+
+    @pytest.mark.asyncio
+    @patch("src.transcription.batching.decode_audio")
+    async def test_short_file_joins_a_batch(
+        self, mock_decode: MagicMock, mock_batch: MagicMock
+    ) -> None:
+        """A decoded file within one window is batched like a clip."""
+        mock_decode.return_value = _clip()
+        scheduler = BatchScheduler(InlinePool(), BATCH_SIZE, max_wait_seconds=0.01)
+        result = await scheduler.transcribe("fake.wav", "en")
+
+        assert result == (f"clip of {SAMPLE_RATE}", "en", 1.0)
+        mock_batch.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("src.transcription.batching.transcribe_chunked")
+    @patch("src.transcription.batching.decode_audio")
+    async def test_long_file_is_chunked(
+        self, mock_decode: MagicMock, mock_chunked: MagicMock, mock_batch: MagicMock
+    ) -> None:
+        """A file longer than one window has its chunks batched instead."""
+        mock_decode.return_value = _clip(CLIP_SECONDS + 1)
+        mock_chunked.return_value = ("long", "en", 1.0)
+        scheduler = BatchScheduler(InlinePool(), BATCH_SIZE, LONG_WAIT_SECONDS)
+        result = await scheduler.transcribe("fake.wav", "en")
+
+        assert result == ("long", "en", 1.0)
+        assert mock_chunked.call_args.args[1] == BATCH_SIZE
+        mock_batch.assert_not_called()
@@ -0,0 +1,37 @@
+"""Unit tests for the message codecs."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.models.msg.codecs import JSON, MSGPACK, get_codec
+from src.models.msg.transcript_message import TranscriptMessage
+
+MESSAGE = TranscriptMessage(
+    filename="audio.wav",
+    transcript="Hello world",
+    language="en",
+    language_probability=0.99,
+    transcribed_at=datetime(2026, 3, 10, 9, 0, tzinfo=timezone.utc),
+)
+
+
+@pytest.mark.parametrize("content_type", [JSON, MSGPACK])
+def test_message_round_trips(content_type: str) -> None:
+    """Test that every codec decodes what it encodes."""
+    body = MESSAGE.to_bytes(content_type)
+
+    assert TranscriptMessage.from_bytes(body, content_type) == MESSAGE
+
+
+def test_missing_content_type_reads_json() -> None:
+    """Test that messages published before codecs existed still decode."""
+    body = MESSAGE.model_dump_json().encode()
+
+    assert TranscriptMessage.from_bytes(body) == MESSAGE
+
+
+def test_unknown_content_type_raises() -> None:
+    """Test that an unsupported content type is rejected."""
+    with pytest.raises(ValueError, match="text/xml"):
+        get_codec("text/xml")
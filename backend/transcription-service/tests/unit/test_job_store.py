@@ -0,0 +1,60 @@
+"""Unit tests for src/transcription/job_store.py."""
+
+from pathlib import Path
+
+import pytest
+
+from src.transcription.job_store import JobStatus, JobStore
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> JobStore:
+    """Return a job store in a temporary directory."""
+    job_store = JobStore(tmp_path / "jobs" / "jobs.sqlite3")
+    yield job_store
+    job_store.close()
+
+
+class TestJobStore:
+    """Tests for JobStore."""
+
+    def test_created_job_is_queued(self, store: JobStore) -> None:
+        """A new job is stored as queued."""
+        job = store.create("audio.wav")
+        assert store.get(job.id) == job
+        assert job.status == JobStatus.QUEUED
+
+    def test_unknown_job_is_none(self, store: JobStore) -> None:
+        """get() returns None for an unknown id."""
+        assert store.get("missing") is None
+
+    def test_mark_done_stores_result(self, store: JobStore) -> None:
+        """A finished job carries its transcript and language."""
+        job = store.create("audio.wav")
+        store.mark_done(job.id, "Hello world", "en", 0.99)
+
+        done = store.get(job.id)
+        assert done.status == JobStatus.DONE
+        assert done.transcript == "Hello world"
+        assert done.language_probability == pytest.approx(0.99)
+
+    def test_unfinished_excludes_done_and_failed(self, store: JobStore) -> None:
+        """Only queued and running jobs are resumed, oldest first."""
+        queued, running, done, failed = (store.create(str(i)) for i in range(4))
+        store.mark_running(running.id)
+        store.mark_done(done.id, "", "en", 1.0)
+        store.mark_failed(failed.id, "boom")
+
+        assert [job.id for job in store.unfinished()] == [queued.id, running.id]
+        assert store.count_unfinished() == len([queued, running])
+
+    def test_jobs_survive_reopening(self, tmp_path: Path) -> None:
+        """Jobs are read back from the file by a new store."""
+        path = tmp_path / "jobs.sqlite3"
+        first = JobStore(path)
+        job = first.create("audio.wav")
+        first.close()
+
+        second = JobStore(path)
+        assert second.get(job.id) == job
+        second.close()
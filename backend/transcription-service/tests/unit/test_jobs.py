@@ -0,0 +1,136 @@
+"""Unit tests for src/transcription/jobs.py."""
+
+import io
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.transcription.job_store import JobStatus
+from src.transcription.jobs import JobBacklogFullError, TranscriptionJobRunner
+from src.transcription.worker_pool import TranscriptionPool
+
+FAKE_TRANSCRIPTION: tuple[str, str, float] = ("Hello world", "en", 0.99)
+
+
+@pytest.fixture
+def pool() -> TranscriptionPool:
+    """Return a single-worker pool."""
+    transcription_pool = TranscriptionPool(workers=1, queue_size=0)
+    yield transcription_pool
+    transcription_pool.shutdown()
+
+
+class TestTranscriptionJobRunner:
+    """Tests for TranscriptionJobRunner."""
+
+    @pytest.mark.asyncio
+    @patch("src.transcription.jobs.messaging_manager")
+    @patch("src.transcription.jobs.transcribe_audio", return_value=FAKE_TRANSCRIPTION)
+    async def test_job_is_transcribed_and_published(
+        self,
+        mock_transcribe: MagicMock,
+        mock_mm: MagicMock,
+        pool: TranscriptionPool,
+        tmp_path: Path,
+    ) -> None:
+        """A submitted job ends done, without its audio, and is published."""
+        mock_publish = AsyncMock()
+        mock_mm.get_pubsub.return_value.publish = mock_publish
+        runner = TranscriptionJobRunner(pool, tmp_path)
+        await runner.start()
+
+        job = await runner.submit("audio.wav", io.BytesIO(b"fake-audio"))
+        await runner._pending.join()
+
+        done = await runner.get(job.id)
+        assert done.status == JobStatus.DONE
+        assert done.transcript == "Hello world"
+        assert not (tmp_path / f"{job.id}.audio").exists()
+        assert mock_publish.await_args.args[0].job_id == job.id
+        await runner.stop()
+
+    @pytest.mark.asyncio
+    @patch("src.transcription.jobs.transcribe_audio", side_effect=RuntimeError("bad"))
+    async def test_failed_job_records_error(
+        self, _mock: MagicMock, pool: TranscriptionPool, tmp_path: Path
+    ) -> None:
+        """A transcription error marks the job failed."""
+        runner = TranscriptionJobRunner(pool, tmp_path)
+        await runner.start()
+
+        job = await runner.submit("audio.wav", io.BytesIO(b"fake-audio"))
+        await runner._pending.join()
+
+        failed = await runner.get(job.id)
+        assert failed.status == JobStatus.FAILED
+        assert failed.error == "bad"
+        await runner.stop()
+
+    @pytest.mark.asyncio
+    async def test_unfinished_jobs_resume_after_restart(
+        self, pool: TranscriptionPool, tmp_path: Path
+    ) -> None:
+        """Jobs left queued by a previous run are picked up on start."""
+        first = TranscriptionJobRunner(MagicMock(workers=0), tmp_path)
+        await first.start()
+        job = await first.submit("audio.wav", io.BytesIO(b"fake-audio"))
+        await first.stop()
+
+        with patch(
+            "src.transcription.jobs.transcribe_audio", return_value=FAKE_TRANSCRIPTION
+        ):
+            second = TranscriptionJobRunner(pool, tmp_path)
+            await second.start()
+            await second._pending.join()
+
+        assert (await second.get(job.id)).status == JobStatus.DONE
+        await second.stop()
+
+    @pytest.mark.asyncio
+    async def test_rejects_jobs_beyond_backlog(self, tmp_path: Path) -> None:
+        """Submissions beyond max_unfinished raise JobBacklogFullError."""
+        runner = TranscriptionJobRunner(
+            MagicMock(workers=0), tmp_path, max_unfinished=1
+        )
+        await runner.start()
+        await runner.submit("audio.wav", io.BytesIO(b"fake-audio"))
+
+        with pytest.raises(JobBacklogFullError):
+            await runner.submit("audio.wav", io.BytesIO(b"fake-audio"))
+        await runner.stop()
+
+    @pytest.mark.asyncio
+    @patch("src.transcription.job_store.uuid.uuid4", return_value=MagicMock(hex="j1"))
+    async def test_failed_upload_leaves_no_queued_job(
+        self, _mock: MagicMock, tmp_path: Path
+    ) -> None:
+        """An upload that cannot be stored fails its job and keeps no audio."""
+        runner = TranscriptionJobRunner(MagicMock(workers=0), tmp_path)
+        await runner.start()
+        audio = MagicMock(spec=io.BytesIO)
+        audio.read.side_effect = OSError("disk full")
+
+        with pytest.raises(OSError, match="disk full"):
+            await runner.submit("audio.wav", audio)
+
+        assert (await runner.get("j1")).status == JobStatus.FAILED
+        assert runner._pending.empty()
+        assert not (tmp_path / "j1.audio").exists()
+        await runner.stop()
+
+    @pytest.mark.asyncio
+    async def test_store_is_queried_off_the_event_loop(self, tmp_path: Path) -> None:
+        """Reading a job never blocks the event loop on SQLite."""
+        runner = TranscriptionJobRunner(MagicMock(workers=0), tmp_path)
+        await runner.start()
+
+        with patch.object(
+            runner._require_store(),
+            "get",
+            side_effect=lambda _: threading.current_thread(),
+        ):
+            thread = await runner.get("j1")
+        assert thread is not threading.main_thread()
+        await runner.stop()
@@ -0,0 +1,137 @@
+"""Unit tests for src/transcription/model_registry.py."""
+
+import threading
+
+import pytest
+
+from src.transcription.model_registry import (
+    ModelRegistry,
+    ModelSpec,
+    UnknownModelError,
+)
+
+SMALL = ModelSpec("small", "int8")
+MEDIUM = ModelSpec("medium", "int8")
+MEDIUM_FLOAT32 = ModelSpec("medium", "float32")
+
+
+class FakeLoader:
+    """Records loads and returns a distinct object per model."""
+
+    def __init__(self) -> None:
+        self.loaded: list[ModelSpec] = []
+
+    def __call__(self, spec: ModelSpec) -> object:
+        """Record the load and return a new model stand-in."""
+        self.loaded.append(spec)
+        return object()
+
+
+def _registry(loader: FakeLoader, memory_budget_mb: int = 10_000) -> ModelRegistry:
+    return ModelRegistry(
+        loader, MEDIUM, [SMALL, MEDIUM_FLOAT32], memory_budget_mb=memory_budget_mb
+    )
+
+
+class TestModelSpec:
+    """Tests for ModelSpec."""
+
+    def test_parses_size_and_compute_type(self) -> None:
+        """'size:compute_type' sets both fields."""
+        assert ModelSpec.parse("medium:float32") == MEDIUM_FLOAT32
+
+    def test_parses_size_with_default_compute_type(self) -> None:
+        """A bare size runs at the default compute type."""
+        assert ModelSpec.parse("small") == SMALL
+
+    def test_memory_grows_with_size_and_precision(self) -> None:
+        """Larger models and wider weights need more memory."""
+        assert SMALL.memory_mb < MEDIUM.memory_mb < MEDIUM_FLOAT32.memory_mb
+
+
+class TestModelRegistry:
+    """Tests for ModelRegistry."""
+
+    def test_loads_default_model_once(self) -> None:
+        """Repeated requests share one loaded model."""
+        loader = FakeLoader()
+        registry = _registry(loader)
+        assert registry.get() is registry.get(None)
+        assert loader.loaded == [MEDIUM]
+
+    def test_holds_several_models(self) -> None:
+        """Different models are loaded side by side within the budget."""
+        loader = FakeLoader()
+        registry = _registry(loader)
+        assert registry.get("small") is not registry.get("medium")
+        assert registry.loaded() == [SMALL.name, MEDIUM.name]
+
+    def test_rejects_model_not_offered(self) -> None:
+        """Only the default and allowed models can be requested."""
+        registry = _registry(FakeLoader())
+        with pytest.raises(UnknownModelError):
+            registry.get("large-v3")
+
+    def test_evicts_least_recently_used_over_budget(self) -> None:
+        """Loading past the budget drops the model unused the longest."""
+        loader = FakeLoader()
+        registry = _registry(loader, memory_budget_mb=MEDIUM.memory_mb + 1)
+        registry.get("small")
+        registry.get("medium")
+
+        assert registry.loaded() == [MEDIUM.name]
+        registry.get("small")
+        assert loader.loaded == [SMALL, MEDIUM, SMALL]
+
+    def test_evicts_before_loading(self) -> None:
+        """Models are dropped before the load, so the budget is never exceeded."""
+        registry: ModelRegistry | None = None
+        loaded_during_load: list[list[str]] = []
+
+        def load(spec: ModelSpec) -> object:
+            loaded_during_load.append(registry.loaded())
+            return object()
+
+        registry = ModelRegistry(
+            load, MEDIUM, [SMALL], memory_budget_mb=MEDIUM.memory_mb + 1
+        )
+        registry.get("small")
+        registry.get("medium")
+
+        assert loaded_during_load == [[], []]
+        assert registry.loaded() == [MEDIUM.name]
+
+    def test_keeps_model_larger_than_budget(self) -> None:
+        """The requested model stays loaded even if it alone is over budget."""
+        loader = FakeLoader()
+        registry = _registry(loader, memory_budget_mb=1)
+        registry.get("medium:float32")
+        registry.get("medium:float32")
+        assert loader.loaded == [MEDIUM_FLOAT32]
+
+    def test_concurrent_requests_load_once(self) -> None:
+        """Threads asking for a loading model wait for that load."""
+        started, release = threading.Event(), threading.Event()
+        loads: list[ModelSpec] = []
+
+        def slow_load(spec: ModelSpec) -> object:
+            loads.append(spec)
+            started.set()
+            release.wait()
+            return object()
+
+        registry = ModelRegistry(slow_load, MEDIUM)
+        models: list[object] = []
+        threads = [
+            threading.Thread(target=lambda: models.append(registry.get()))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert loads == [MEDIUM]
+        assert models[0] is models[1]
@@ -1,6 +1,7 @@
 """Unit tests for src/messaging/pubsub_facade.py."""
 
 import asyncio
+from collections.abc import AsyncIterator
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import aio_pika
@@ -16,12 +17,12 @@ class DummyMessage(AbstractMessage):
 
     content: str = Field(...)
 
-    def to_bytes(self) -> bytes:
+    def to_bytes(self, content_type: str = "application/json") -> bytes:
         """Serialize the message to bytes."""
         return self.content.encode()
 
     @classmethod
-    def from_bytes(cls, body: bytes) -> "DummyMessage":
+    def from_bytes(cls, body: bytes, content_type: str | None = None) -> "DummyMessage":
         """Deserialize bytes to an instance of DummyMessage."""
         return cls(content=body.decode())
 
@@ -165,6 +166,61 @@ class TestSubscribe:
         mock_loop.create_task.assert_called_once()
 
 
+class TestConsumeMessages:
+    """Tests for PubSubFacade._consume_messages()."""
+
+    @staticmethod
+    def _queue(bodies: list[bytes]) -> tuple[MagicMock, list[MagicMock]]:
+        """Create a queue whose iterator yields one delivery per body."""
+        deliveries = []
+        for body in bodies:
+            delivery = MagicMock()
+            delivery.body = body
+            delivery.content_type = "application/json"
+            delivery.process.return_value.__aenter__ = AsyncMock()
+            delivery.process.return_value.__aexit__ = AsyncMock(return_value=False)
+            deliveries.append(delivery)
+
+        async def iterate() -> AsyncIterator[MagicMock]:
+            for delivery in deliveries:
+                yield delivery
+
+        queue = MagicMock()
+        queue.iterator.return_value.__aenter__ = AsyncMock(return_value=iterate())
+        queue.iterator.return_value.__aexit__ = AsyncMock(return_value=False)
+        return queue, deliveries
+
+    @pytest.mark.asyncio
+    async def test_failed_handler_is_retried(self) -> None:
+        """A message whose handler raises is handed to the retry router."""
+        queue, deliveries = self._queue([b"ok", b"fail"])
+        retries = AsyncMock()
+        error = ValueError("boom")
+
+        async def on_message(message: DummyMessage) -> None:
+            if message.content == "fail":
+                raise error
+
+        await PubSubFacade._consume_messages(DummyMessage, on_message, queue, retries)
+
+        retries.retry.assert_awaited_once_with(deliveries[1], error)
+        for delivery in deliveries:
+            delivery.process.assert_called_once_with(requeue=True)
+
+    @pytest.mark.asyncio
+    async def test_undecodable_message_is_dead_lettered(self) -> None:
+        """A message that cannot be decoded goes straight to the dead letters."""
+        queue, deliveries = self._queue([b"\xff"])
+        retries = AsyncMock()
+        on_message = AsyncMock()
+
+        await PubSubFacade._consume_messages(DummyMessage, on_message, queue, retries)
+
+        on_message.assert_not_awaited()
+        retries.dead_letter.assert_awaited_once()
+        assert retries.dead_letter.await_args.args[0] is deliveries[0]
+
+
 class TestClose:
     """Tests for PubSubFacade.close()."""
 
@@ -0,0 +1,204 @@
+"""Unit tests for src/transcription/realtime.py."""
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.transcription.realtime import (
+    FRAME_SAMPLES,
+    SAMPLE_RATE,
+    DictationSession,
+    RealtimeOptions,
+    pcm16_to_float,
+    speech_frames,
+)
+from src.transcription.worker_pool import PoolSaturatedError
+
+OPTIONS = RealtimeOptions(
+    vad_threshold=0.01,
+    endpoint_silence_seconds=0.3,
+    partial_interval_seconds=0.5,
+    window_seconds=2,
+    max_utterance_seconds=3,
+    overlap_seconds=0.1,
+    partial_beam_size=1,
+    final_retries=2,
+)
+FINAL_BEAM_SIZE = 5
+
+
+def _pcm(seconds: float, amplitude: int) -> bytes:
+    """Return a square wave of the given amplitude as 16-bit PCM."""
+    samples = np.full(int(seconds * SAMPLE_RATE), amplitude, dtype="<i2")
+    samples[::2] *= -1
+    return samples.tobytes()
+
+
+def _speech(seconds: float) -> bytes:
+    return _pcm(seconds, 8000)
+
+
+def _silence(seconds: float) -> bytes:
+    return _pcm(seconds, 0)
+
+
+class FakePool:
+    """Runs decodes inline and records their arguments."""
+
+    def __init__(self, text: str = "hello", error: Exception | None = None) -> None:
+        self.text = text
+        self.error = error
+        self.calls: list[tuple[Any, ...]] = []
+
+    async def run(self, fn: Callable[..., str], *args: Any) -> str:  # noqa: ANN401
+        """Record the call and return the canned text or raise the error."""
+        self.calls.append(args)
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+
+def _session(pool: FakePool) -> tuple[DictationSession, list[dict[str, Any]]]:
+    events: list[dict[str, Any]] = []
+
+    async def emit(event: dict[str, Any]) -> None:
+        events.append(event)
+
+    return DictationSession(emit, pool=pool, options=OPTIONS), events  # type: ignore[arg-type]
+
+
+class TestPcm16ToFloat:
+    """Tests for pcm16_to_float()."""
+
+    def test_scales_to_unit_range(self) -> None:
+        """Full-scale 16-bit samples map to -1 and just under 1."""
+        pcm = np.array([-32768, 0, 32767], dtype="<i2").tobytes()
+        samples = pcm16_to_float(pcm)
+        assert samples.dtype == np.float32
+        assert samples[0] == -1.0
+        assert samples[1] == 0.0
+        assert samples[2] == pytest.approx(1.0, abs=1e-4)
+
+    def test_ignores_trailing_odd_byte(self) -> None:
+        """A split sample at the end of a frame is dropped."""
+        assert len(pcm16_to_float(b"\x00\x01\x02")) == 1
+
+
+class TestSpeechFrames:
+    """Tests for speech_frames()."""
+
+    def test_classifies_each_frame(self) -> None:
+        """Loud frames are speech, quiet ones are not."""
+        samples = pcm16_to_float(_silence(0.03) + _speech(0.03) + _silence(0.03))
+        assert speech_frames(samples, 0.01).tolist() == [False, True, False]
+
+    def test_ignores_partial_frame(self) -> None:
+        """Samples short of a whole frame are not classified."""
+        samples = np.ones(FRAME_SAMPLES + 1, dtype=np.float32)
+        assert len(speech_frames(samples, 0.01)) == 1
+
+
+class TestDictationSession:
+    """Tests for DictationSession."""
+
+    @pytest.mark.asyncio
+    async def test_pause_after_speech_emits_final(self) -> None:
+        """Speech followed by endpoint silence is decoded once, fully."""
+        pool = FakePool()
+        session, events = _session(pool)
+        await session.feed(_speech(0.3))
+        await session.feed(_silence(0.3))
+
+        assert events == [
+            {"type": "final", "start": 0.0, "end": pytest.approx(0.6), "text": "hello"}
+        ]
+        assert pool.calls[0][1] == FINAL_BEAM_SIZE
+
+    @pytest.mark.asyncio
+    async def test_silence_is_never_decoded(self) -> None:
+        """Audio without speech emits nothing and is not kept."""
+        pool = FakePool()
+        session, events = _session(pool)
+        for _ in range(10):
+            await session.feed(_silence(0.5))
+        await session.finish()
+
+        assert events == []
+        assert pool.calls == []
+
+    @pytest.mark.asyncio
+    async def test_final_starts_after_leading_silence(self) -> None:
+        """Only a short pre-roll of the silence before speech is decoded."""
+        session, events = _session(FakePool())
+        await session.feed(_silence(1.0))
+        await session.feed(_speech(0.3))
+        await session.feed(_silence(0.4))
+
+        assert events[0]["start"] == pytest.approx(0.9, abs=0.03)
+
+    @pytest.mark.asyncio
+    async def test_long_speech_emits_partials(self) -> None:
+        """Partials of the trailing window arrive while speech continues."""
+        pool = FakePool(text="hel")
+        session, events = _session(pool)
+        await session.feed(_speech(0.6))
+        await asyncio.sleep(0)
+
+        assert events == [{"type": "partial", "text": "hel"}]
+        assert pool.calls[0][1] == OPTIONS.partial_beam_size
+
+    @pytest.mark.asyncio
+    async def test_partial_skipped_when_pool_is_full(self) -> None:
+        """A saturated pool drops the partial instead of failing the session."""
+        session, events = _session(FakePool(error=PoolSaturatedError("busy")))
+        await session.feed(_speech(0.6))
+        await asyncio.sleep(0)
+
+        assert events == []
+
+    @pytest.mark.asyncio
+    @patch("src.transcription.realtime.POOL_RETRY_SECONDS", 0)
+    async def test_final_gives_up_when_pool_stays_full(self) -> None:
+        """A final refused on every retry fails the session instead of stalling."""
+        pool = FakePool(error=PoolSaturatedError("busy"))
+        session, events = _session(pool)
+        await session.feed(_speech(0.3))
+
+        with pytest.raises(PoolSaturatedError):
+            await session.feed(_silence(0.3))
+        assert len(pool.calls) == OPTIONS.final_retries + 1
+        assert events == []
+
+    @pytest.mark.asyncio
+    async def test_long_utterance_is_cut(self) -> None:
+        """Uninterrupted speech is finalized at the maximum length."""
+        session, events = _session(FakePool())
+        for _ in range(7):
+            await session.feed(_speech(0.5))
+
+        finals = [event for event in events if event["type"] == "final"]
+        assert len(finals) == 1
+        assert finals[0]["end"] == pytest.approx(OPTIONS.max_utterance_seconds)
+
+    @pytest.mark.asyncio
+    async def test_finals_are_prompted_with_previous_text(self) -> None:
+        """Each final decode is conditioned on the text of the last one."""
+        pool = FakePool()
+        session, _ = _session(pool)
+        await session.feed(_speech(0.3) + _silence(0.3))
+        await session.feed(_speech(0.3) + _silence(0.3))
+
+        assert [call[2] for call in pool.calls] == [None, "hello"]
+
+    @pytest.mark.asyncio
+    async def test_finish_finalizes_trailing_speech(self) -> None:
+        """Speech still in progress at the end becomes a final."""
+        session, events = _session(FakePool())
+        await session.feed(_speech(0.3))
+        await session.finish()
+
+        assert [event["type"] for event in events] == ["final"]
@@ -0,0 +1,91 @@
+"""Unit tests for the retry router."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.messaging.retry import (
+    ATTEMPTS_HEADER,
+    ERROR_HEADER,
+    RetryPolicy,
+    RetryRouter,
+)
+
+POLICY = RetryPolicy(max_attempts=4, base_delay_seconds=1, max_delay_seconds=3)
+
+
+def _delivery(attempts: int | None = None) -> MagicMock:
+    """Create an incoming delivery that failed a number of times before."""
+    message = MagicMock()
+    message.body = b"{}"
+    message.content_type = "application/json"
+    message.headers = (
+        {} if attempts is None else {ATTEMPTS_HEADER: attempts, "x-death": [{}]}
+    )
+    return message
+
+
+async def _router() -> tuple[RetryRouter, MagicMock, AsyncMock]:
+    """Create a declared router on a mocked channel."""
+    channel = MagicMock()
+    channel.declare_queue = AsyncMock()
+    dead_letter_exchange = AsyncMock()
+    channel.declare_exchange = AsyncMock(return_value=dead_letter_exchange)
+    channel.default_exchange = AsyncMock()
+    router = RetryRouter(channel, "transcription.completed", "notifications", POLICY)
+    await router.declare()
+    return router, channel, dead_letter_exchange
+
+
+def test_delay_doubles_up_to_the_maximum() -> None:
+    """Backoff should grow exponentially and be capped."""
+    assert [POLICY.delay_seconds(n) for n in range(1, 5)] == [1, 2, 3, 3]
+
+
+async def test_declare_creates_one_retry_queue_per_delay() -> None:
+    """Each retry queue should dead-letter back to the consumed queue."""
+    _, channel, _ = await _router()
+
+    retry_calls = channel.declare_queue.await_args_list[:-1]
+    assert [c.args[0] for c in retry_calls] == [
+        "notifications.retry.1",
+        "notifications.retry.2",
+        "notifications.retry.3",
+    ]
+    assert [c.kwargs["arguments"]["x-message-ttl"] for c in retry_calls] == [
+        1000,
+        2000,
+        3000,
+    ]
+    assert retry_calls[0].kwargs["arguments"]["x-dead-letter-routing-key"] == (
+        "notifications"
+    )
+    assert channel.declare_queue.await_args_list[-1].args == ("notifications.dead",)
+
+
+@pytest.mark.parametrize("attempts", [None, 2])
+async def test_retry_publishes_to_the_next_retry_queue(attempts: int | None) -> None:
+    """A failed message should go to the retry queue of its failure count."""
+    router, channel, _ = await _router()
+
+    await router.retry(_delivery(attempts), ValueError("boom"))
+
+    failures = (attempts or 0) + 1
+    published = channel.default_exchange.publish.await_args
+    assert published.kwargs["routing_key"] == f"notifications.retry.{failures}"
+    assert published.args[0].headers == {ATTEMPTS_HEADER: failures}
+
+
+async def test_retry_dead_letters_after_max_attempts() -> None:
+    """The last allowed failure should dead-letter the message with its error."""
+    router, channel, dead_letter_exchange = await _router()
+
+    await router.retry(_delivery(POLICY.max_attempts - 1), ValueError("boom"))
+
+    channel.default_exchange.publish.assert_not_awaited()
+    published = dead_letter_exchange.publish.await_args
+    assert published.kwargs["routing_key"] == "notifications"
+    assert published.args[0].headers == {
+        ATTEMPTS_HEADER: POLICY.max_attempts,
+        ERROR_HEADER: "ValueError('boom')",
+    }
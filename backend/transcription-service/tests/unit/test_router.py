@@ -1,14 +1,26 @@
 """Unit tests for src/transcription/router.py."""
 
-import os
+import json
+from datetime import datetime, timezone
 from http import HTTPStatus
+from typing import BinaryIO
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
+from fastapi import WebSocketDisconnect, status
 from fastapi.testclient import TestClient
 from httpx import Response
 
 from src.models.msg.transcript_message import TranscriptMessage
+from src.transcription.job_store import JobStatus, TranscriptionJob
+from src.transcription.jobs import JobBacklogFullError
+from src.transcription.whisper import TranscriptSegment
+from src.transcription.worker_pool import (
+    TRANSCRIPTION_RETRY_AFTER_SECONDS,
+    PoolClosedError,
+    PoolSaturatedError,
+)
 
 # ── App bootstrap (mock heavy deps before importing main) ─────────────────────
 
@@ -29,6 +41,7 @@ client = TestClient(app)
 FAKE_AUDIO: tuple[str, bytes, str] = ("audio.wav", b"fake-audio-bytes", "audio/wav")
 FAKE_TRANSCRIPTION: tuple[str, str, float] = ("Hello world", "en", 0.99)
 EXPECTED_TUPLE_LENGTH = 3
+TRANSCRIBE = "src.transcription.router.transcription_batcher.transcribe"
 
 
 def _post_audio(audio: tuple[str, bytes, str] = FAKE_AUDIO) -> Response:
@@ -76,7 +89,7 @@ class TestTranscribeEndpoint:
     """Tests for POST /transcription/."""
 
     @patch("src.transcription.router.messaging_manager")
-    @patch("src.transcription.router.transcribe_audio", return_value=FAKE_TRANSCRIPTION)
+    @patch(TRANSCRIBE, return_value=FAKE_TRANSCRIPTION)
     def test_returns_transcript(
         self, _mock_transcribe: MagicMock, mock_mm: MagicMock
     ) -> None:
@@ -87,7 +100,7 @@ class TestTranscribeEndpoint:
         assert response.json() == {"transcript": "Hello world"}
 
     @patch("src.transcription.router.messaging_manager")
-    @patch("src.transcription.router.transcribe_audio", return_value=("", "en", 0.99))
+    @patch(TRANSCRIBE, return_value=("", "en", 0.99))
     def test_returns_empty_transcript(
         self, _mock_transcribe: MagicMock, mock_mm: MagicMock
     ) -> None:
@@ -97,10 +110,7 @@ class TestTranscribeEndpoint:
         assert response.status_code == HTTPStatus.OK
         assert response.json() == {"transcript": ""}
 
-    @patch(
-        "src.transcription.router.transcribe_audio",
-        side_effect=RuntimeError("model error"),
-    )
+    @patch(TRANSCRIBE, side_effect=RuntimeError("model error"))
     def test_returns_500_on_transcription_failure(self, _mock: MagicMock) -> None:
         """Endpoint returns HTTP 500 when transcription raises an exception."""
         response = _post_audio()
@@ -113,48 +123,65 @@ class TestTranscribeEndpoint:
         assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
     @patch("src.transcription.router.messaging_manager")
-    @patch("src.transcription.router.transcribe_audio", return_value=FAKE_TRANSCRIPTION)
-    def test_temp_file_is_cleaned_up(
-        self, _mock_transcribe: MagicMock, mock_mm: MagicMock
+    @patch(TRANSCRIBE)
+    def test_transcribes_the_upload_stream(
+        self, mock_transcribe: MagicMock, mock_mm: MagicMock
     ) -> None:
-        """Temporary file is deleted after transcription."""
+        """The upload is handed to Whisper as a file object, from its start."""
         mock_mm.get_pubsub.return_value.publish = AsyncMock()
-        created_paths: list[str] = []
-        original_unlink = os.unlink
+        received: list[bytes] = []
 
-        def tracking_unlink(path: str) -> None:
-            created_paths.append(path)
-            original_unlink(path)
+        async def read_audio(audio: BinaryIO, *_: object) -> tuple[str, str, float]:
+            received.append(audio.read())
+            return FAKE_TRANSCRIPTION
 
-        with patch("src.transcription.router.os.unlink", side_effect=tracking_unlink):
-            _post_audio()
+        mock_transcribe.side_effect = read_audio
+        _post_audio()
 
-        assert len(created_paths) == 1
-        assert not os.path.exists(created_paths[0])
+        assert received == [FAKE_AUDIO[1]]
 
     @patch("src.transcription.router.messaging_manager")
-    @patch(
-        "src.transcription.router.transcribe_audio",
-        side_effect=RuntimeError("fail"),
-    )
-    def test_temp_file_cleaned_up_on_transcription_error(
-        self, _mock_transcribe: MagicMock, mock_mm: MagicMock
+    @patch(TRANSCRIBE, return_value=FAKE_TRANSCRIPTION)
+    def test_uses_requested_model(
+        self, mock_transcribe: MagicMock, mock_mm: MagicMock
     ) -> None:
-        """Temporary file is deleted even when transcription raises."""
-        created_paths: list[str] = []
-        original_unlink = os.unlink
-
-        def tracking_unlink(path: str) -> None:
-            created_paths.append(path)
-            original_unlink(path)
+        """The model query parameter is passed on to Whisper."""
+        mock_mm.get_pubsub.return_value.publish = AsyncMock()
+        with patch("src.transcription.router.model_registry") as mock_registry:
+            client.post(
+                "/transcription/", params={"model": "small"}, files={"file": FAKE_AUDIO}
+            )
+        mock_registry.resolve.assert_called_once_with("small")
+        assert mock_transcribe.await_args.args[2] == "small"
+
+    def test_returns_422_for_unknown_model(self) -> None:
+        """A model the service does not offer is rejected before decoding."""
+        response = client.post(
+            "/transcription/",
+            params={"model": "not-a-model"},
+            files={"file": FAKE_AUDIO},
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+        assert "not-a-model" in response.json()["detail"]
 
-        with patch("src.transcription.router.os.unlink", side_effect=tracking_unlink):
-            _post_audio()
+    @patch(TRANSCRIBE, side_effect=PoolSaturatedError("busy"))
+    def test_returns_429_with_retry_after_when_saturated(
+        self, _mock: MagicMock
+    ) -> None:
+        """A full worker pool turns the request away with a retry hint."""
+        response = _post_audio()
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert response.headers["Retry-After"] == str(TRANSCRIPTION_RETRY_AFTER_SECONDS)
 
-        assert len(created_paths) == 1
+    @patch(TRANSCRIBE, side_effect=PoolClosedError("closing"))
+    def test_returns_503_while_shutting_down(self, _mock: MagicMock) -> None:
+        """A closed worker pool reports the service as unavailable."""
+        response = _post_audio()
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert "Retry-After" in response.headers
 
     @patch("src.transcription.router.messaging_manager")
-    @patch("src.transcription.router.transcribe_audio", return_value=FAKE_TRANSCRIPTION)
+    @patch(TRANSCRIBE, return_value=FAKE_TRANSCRIPTION)
     def test_publishes_message_to_rabbitmq(
         self, _mock_transcribe: MagicMock, mock_mm: MagicMock
     ) -> None:
@@ -165,7 +192,7 @@ class TestTranscribeEndpoint:
         mock_publish.assert_awaited_once()
 
     @patch("src.transcription.router.messaging_manager")
-    @patch("src.transcription.router.transcribe_audio", return_value=FAKE_TRANSCRIPTION)
+    @patch(TRANSCRIBE, return_value=FAKE_TRANSCRIPTION)
     def test_publish_failure_returns_500(
         self, _mock_transcribe: MagicMock, mock_mm: MagicMock
     ) -> None:
@@ -178,7 +205,7 @@ class TestTranscribeEndpoint:
         assert "broker down" in response.json()["detail"]
 
     @patch("src.transcription.router.messaging_manager")
-    @patch("src.transcription.router.transcribe_audio", return_value=FAKE_TRANSCRIPTION)
+    @patch(TRANSCRIBE, return_value=FAKE_TRANSCRIPTION)
     def test_published_message_contains_transcript(
         self, _mock_transcribe: MagicMock, mock_mm: MagicMock
     ) -> None:
@@ -191,3 +218,190 @@ class TestTranscribeEndpoint:
         assert published_msg.transcript == "Hello world"
         assert published_msg.language == "en"
         assert published_msg.language_probability == pytest.approx(0.99)
+
+
+# ── POST /transcription/stream ────────────────────────────────────────────────
+
+
+class TestStreamEndpoint:
+    """Tests for POST /transcription/stream."""
+
+    @patch("src.transcription.router.messaging_manager")
+    @patch("src.transcription.router.transcribe_segments")
+    def test_streams_language_then_segments(
+        self, mock_segments: MagicMock, mock_mm: MagicMock
+    ) -> None:
+        """The response is NDJSON: the language first, then each segment."""
+        mock_mm.get_pubsub.return_value.publish = AsyncMock()
+        mock_segments.return_value = (
+            iter(
+                [
+                    TranscriptSegment(0.0, 1.0, "Hello"),
+                    TranscriptSegment(1.0, 2.0, "world"),
+                ]
+            ),
+            "en",
+            0.99,
+        )
+        response = client.post("/transcription/stream", files={"file": FAKE_AUDIO})
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {
+            "type": "language",
+            "language": "en",
+            "language_probability": 0.99,
+        }
+        assert [line["text"] for line in lines[1:]] == ["Hello", "world"]
+
+    @patch("src.transcription.router.messaging_manager")
+    @patch("src.transcription.router.transcribe_segments")
+    def test_publishes_segments_then_transcript(
+        self, mock_segments: MagicMock, mock_mm: MagicMock
+    ) -> None:
+        """Every segment is published, followed by the complete transcript."""
+        mock_publish = AsyncMock()
+        mock_mm.get_pubsub.return_value.publish = mock_publish
+        mock_segments.return_value = (
+            iter(
+                [
+                    TranscriptSegment(0.0, 1.0, "Hello"),
+                    TranscriptSegment(1.0, 2.0, "world"),
+                ]
+            ),
+            "en",
+            0.99,
+        )
+        client.post("/transcription/stream", files={"file": FAKE_AUDIO})
+
+        published = [call.args[0] for call in mock_publish.await_args_list]
+        assert [m.index for m in published[:2]] == [0, 1]
+        assert published[0].stream_id == published[1].stream_id
+        assert published[2].transcript == "Hello world"
+
+    @patch("src.transcription.router.transcription_pool")
+    def test_returns_429_when_saturated(self, mock_pool: MagicMock) -> None:
+        """A full worker pool refuses the stream before it starts."""
+        mock_pool.run = AsyncMock(side_effect=PoolSaturatedError("busy"))
+        response = client.post("/transcription/stream", files={"file": FAKE_AUDIO})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+# ── WS /transcription/realtime ────────────────────────────────────────────────
+
+
+class TestRealtimeEndpoint:
+    """Tests for WS /transcription/realtime."""
+
+    SPEECH = np.full(16000 // 2, 8000, dtype="<i2").tobytes()
+    SILENCE = np.zeros(16000, dtype="<i2").tobytes()
+
+    @patch("src.transcription.router.messaging_manager")
+    @patch("src.transcription.realtime.transcribe_samples", return_value="Hello")
+    def test_pushes_final_and_publishes_transcript(
+        self, _mock: MagicMock, mock_mm: MagicMock
+    ) -> None:
+        """A pause yields a final event; ending publishes the whole dictation."""
+        mock_publish = AsyncMock()
+        mock_mm.get_pubsub.return_value.publish = mock_publish
+        with client.websocket_connect("/transcription/realtime") as websocket:
+            websocket.send_bytes(self.SPEECH)
+            websocket.send_bytes(self.SILENCE)
+            event = json.loads(websocket.receive_text())
+            websocket.send_text("end")
+
+        assert event["type"] == "final"
+        assert event["text"] == "Hello"
+        published = [call.args[0] for call in mock_publish.await_args_list]
+        assert published[0].text == "Hello"
+        assert published[-1].transcript == "Hello"
+        assert published[-1].filename == "dictation"
+
+    @patch("src.transcription.router.messaging_manager")
+    @patch("src.transcription.realtime.transcribe_samples", return_value="Hello")
+    def test_disconnect_publishes_no_transcript(
+        self, _mock: MagicMock, mock_mm: MagicMock
+    ) -> None:
+        """An abandoned dictation is not published as a transcript."""
+        mock_publish = AsyncMock()
+        mock_mm.get_pubsub.return_value.publish = mock_publish
+        with client.websocket_connect("/transcription/realtime") as websocket:
+            websocket.send_bytes(self.SILENCE)
+
+        mock_publish.assert_not_awaited()
+
+    @patch(
+        "src.transcription.realtime.DictationSession.feed",
+        side_effect=PoolSaturatedError("busy"),
+    )
+    def test_closes_when_pool_stays_full(self, _mock: MagicMock) -> None:
+        """A final the pool keeps refusing closes the dictation with 1013."""
+        with (
+            pytest.raises(WebSocketDisconnect) as excinfo,
+            client.websocket_connect("/transcription/realtime") as websocket,
+        ):
+            websocket.send_bytes(self.SPEECH)
+            websocket.receive_text()
+        assert excinfo.value.code == status.WS_1013_TRY_AGAIN_LATER
+
+    def test_refuses_unknown_model(self) -> None:
+        """A dictation naming an unknown model is refused with 1008."""
+        with (
+            pytest.raises(WebSocketDisconnect) as excinfo,
+            client.websocket_connect("/transcription/realtime?model=not-a-model"),
+        ):
+            pass
+        assert excinfo.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+# ── /transcription/jobs ───────────────────────────────────────────────────────
+
+
+class TestJobEndpoints:
+    """Tests for POST /transcription/jobs and GET /transcription/jobs/{id}."""
+
+    @staticmethod
+    def _job(status: JobStatus = JobStatus.QUEUED) -> TranscriptionJob:
+        now = datetime.now(tz=timezone.utc)
+        return TranscriptionJob(
+            id="abc",
+            filename="audio.wav",
+            status=status,
+            created_at=now,
+            updated_at=now,
+        )
+
+    @patch("src.transcription.router.job_runner")
+    def test_submit_returns_202_with_job(self, mock_runner: MagicMock) -> None:
+        """Submitting an upload returns the queued job at once."""
+        mock_runner.submit = AsyncMock(return_value=self._job())
+        response = client.post("/transcription/jobs", files={"file": FAKE_AUDIO})
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert response.json()["id"] == "abc"
+        assert response.json()["status"] == "queued"
+
+    @patch("src.transcription.router.job_runner")
+    def test_submit_returns_429_when_backlog_is_full(
+        self, mock_runner: MagicMock
+    ) -> None:
+        """A full backlog turns the upload away with a retry hint."""
+        mock_runner.submit = AsyncMock(side_effect=JobBacklogFullError("full"))
+        response = client.post("/transcription/jobs", files={"file": FAKE_AUDIO})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert "Retry-After" in response.headers
+
+    @patch("src.transcription.router.job_runner")
+    def test_get_returns_job(self, mock_runner: MagicMock) -> None:
+        """Polling a job returns its status."""
+        mock_runner.get = AsyncMock(return_value=self._job(JobStatus.DONE))
+        response = client.get("/transcription/jobs/abc")
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["status"] == "done"
+
+    @patch("src.transcription.router.job_runner")
+    def test_get_unknown_job_returns_404(self, mock_runner: MagicMock) -> None:
+        """Polling an unknown job returns HTTP 404."""
+        mock_runner.get = AsyncMock(return_value=None)
+        response = client.get("/transcription/jobs/missing")
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,75 @@
+"""Unit tests for src/transcription/uploads.py."""
+
+from http import HTTPStatus
+from typing import Any
+from unittest.mock import patch
+
+from fastapi import Depends, FastAPI, UploadFile
+from fastapi.testclient import TestClient
+from starlette.formparsers import MultiPartParser
+
+from src.transcription.uploads import UPLOAD_OPENAPI, upload_file
+
+STARLETTE_SPOOL_MAX_SIZE = 1024 * 1024
+SPOOL_MAX_BYTES = 16
+AUDIO = b"0123456789" * 10
+UPLOAD = Depends(upload_file)
+
+app = FastAPI()
+
+
+@app.post("/upload", openapi_extra=UPLOAD_OPENAPI)
+async def upload(file: UploadFile = UPLOAD) -> dict[str, Any]:
+    """Describe the spooled upload."""
+    return {
+        "filename": file.filename,
+        "content": (await file.read()).decode(),
+        "on_disk": file.file._rolled,  # type: ignore[attr-defined]
+    }
+
+
+client = TestClient(app)
+
+
+class TestUploadFile:
+    """Tests for upload_file()."""
+
+    def test_small_upload_stays_in_memory(self) -> None:
+        """A file below the spool limit is read back whole from memory."""
+        response = client.post(
+            "/upload",
+            data={"note": "ignored"},
+            files={"file": ("audio.wav", b"short", "audio/wav")},
+        )
+        assert response.json() == {
+            "filename": "audio.wav",
+            "content": "short",
+            "on_disk": False,
+        }
+
+    @patch("src.transcription.uploads.UPLOAD_SPOOL_MAX_BYTES", SPOOL_MAX_BYTES)
+    def test_large_upload_rolls_over_to_disk(self) -> None:
+        """A file beyond the spool limit is written to disk intact."""
+        response = client.post(
+            "/upload", files={"file": ("audio.wav", AUDIO, "audio/wav")}
+        )
+        assert response.json()["content"] == AUDIO.decode()
+        assert response.json()["on_disk"] is True
+
+    def test_rejects_form_without_file(self) -> None:
+        """A form lacking the file field is refused with 422."""
+        response = client.post("/upload", data={"note": "no audio"})
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    def test_rejects_malformed_body(self) -> None:
+        """A multipart body that cannot be parsed is refused with 400."""
+        response = client.post(
+            "/upload",
+            content=b"not multipart",
+            headers={"Content-Type": "multipart/form-data; boundary=x"},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_leaves_starlette_parser_untouched(self) -> None:
+        """The spool limit is not applied to Starlette's own form parsing."""
+        assert MultiPartParser.spool_max_size == STARLETTE_SPOOL_MAX_SIZE
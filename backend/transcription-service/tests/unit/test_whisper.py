@@ -1,11 +1,22 @@
 """Unit tests for src/transcription/whisper.py."""
 
+from collections.abc import Iterator
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 import src.transcription.whisper as whisper_module
-from src.transcription.whisper import get_model, save_transcript, transcribe_audio
+from src.transcription.model_registry import UnknownModelError
+from src.transcription.whisper import (
+    SAMPLE_RATE,
+    TranscriptSegment,
+    get_model,
+    save_transcript,
+    transcribe_audio,
+    transcribe_batch,
+    transcribe_segments,
+)
 
 EXPECTED_TUPLE_LENGTH = 3
 
@@ -13,9 +24,9 @@ EXPECTED_TUPLE_LENGTH = 3
 @pytest.fixture(autouse=True)
 def reset_model_cache() -> None:
     """Reset the cached model before every test."""
-    whisper_module._model_cache[0] = None
+    whisper_module.model_registry.clear()
     yield
-    whisper_module._model_cache[0] = None
+    whisper_module.model_registry.clear()
 
 
 # ── get_model ─────────────────────────────────────────────────────────────────
@@ -39,11 +50,23 @@ class TestGetModel:
         mock_cls.assert_called_once()
 
     @patch("src.transcription.whisper.WhisperModel")
-    def test_uses_env_model_size(self, mock_cls: MagicMock) -> None:
-        """WhisperModel is initialised with MODEL_SIZE from the environment."""
-        whisper_module.MODEL_SIZE = "small"
+    def test_loads_default_model(self, mock_cls: MagicMock) -> None:
+        """Without a name, WhisperModel is initialised with MODEL_SIZE."""
         get_model()
-        mock_cls.assert_called_once_with("small", device="cpu", compute_type="int8")
+        mock_cls.assert_called_once_with(
+            whisper_module.MODEL_SIZE,
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=whisper_module.CPU_THREADS,
+            num_workers=whisper_module.TRANSCRIPTION_WORKERS,
+        )
+
+    @patch("src.transcription.whisper.WhisperModel")
+    def test_rejects_model_not_offered(self, mock_cls: MagicMock) -> None:
+        """Naming a model outside WHISPER_MODELS raises before loading."""
+        with pytest.raises(UnknownModelError):
+            get_model("not-a-model")
+        mock_cls.assert_not_called()
 
     @patch("src.transcription.whisper.WhisperModel")
     def test_returns_whisper_model_instance(self, mock_cls: MagicMock) -> None:
@@ -137,6 +160,69 @@ class TestTranscribeAudio:
         mock_cls.assert_called_once()
 
 
+# ── transcribe_segments ───────────────────────────────────────────────────────
+
+
+class TestTranscribeSegments:
+    """Tests for transcribe_segments()."""
+
+    @patch("src.transcription.whisper.WhisperModel")
+    def test_segments_are_decoded_lazily(self, mock_cls: MagicMock) -> None:
+        """Segments are pulled from Whisper only as the caller iterates."""
+        pulled: list[int] = []
+
+        def whisper_segments() -> Iterator[MagicMock]:
+            for i in range(2):
+                pulled.append(i)
+                yield MagicMock(text=f"s{i}", start=float(i), end=float(i + 1))
+
+        mock_info = MagicMock(language="en", language_probability=0.9)
+        mock_cls.return_value.transcribe.return_value = (whisper_segments(), mock_info)
+
+        segments, lang, _ = transcribe_segments("fake.wav")
+        assert lang == "en"
+        assert pulled == []
+        assert next(segments) == TranscriptSegment(0.0, 1.0, "s0")
+        assert pulled == [0]
+
+
+# ── transcribe_batch ──────────────────────────────────────────────────────────
+
+
+class TestTranscribeBatch:
+    """Tests for transcribe_batch()."""
+
+    @patch("src.transcription.whisper.BatchedInferencePipeline")
+    @patch("src.transcription.whisper.WhisperModel")
+    def test_decodes_clips_as_one_batch(
+        self, _mock_cls: MagicMock, mock_pipeline: MagicMock
+    ) -> None:
+        """Each clip is its own window, and texts are returned per clip."""
+        mock_pipeline.return_value.transcribe.return_value = (
+            [
+                MagicMock(text="first", start=0.0, end=1.0),
+                MagicMock(text="second", start=1.0, end=3.0),
+            ],
+            MagicMock(),
+        )
+        clips = [np.zeros(SAMPLE_RATE), np.zeros(0), np.zeros(2 * SAMPLE_RATE)]
+        texts = transcribe_batch(clips, "en")
+
+        assert texts == ["first", "", "second"]
+        kwargs = mock_pipeline.return_value.transcribe.call_args.kwargs
+        assert kwargs["clip_timestamps"] == [
+            {"start": 0.0, "end": 1.0},
+            {"start": 1.0, "end": 3.0},
+        ]
+        assert kwargs["batch_size"] == len(clips) - 1
+
+    @patch("src.transcription.whisper.BatchedInferencePipeline")
+    def test_skips_inference_without_audio(self, mock_pipeline: MagicMock) -> None:
+        """Only empty clips decode to empty texts without the model."""
+        assert transcribe_batch([np.zeros(0)]) == [""]
+        mock_pipeline.assert_not_called()
+
+
 # ── save_transcript ───────────────────────────────────────────────────────────
 
 
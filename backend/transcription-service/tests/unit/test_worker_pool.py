@@ -0,0 +1,84 @@
+"""Unit tests for src/transcription/worker_pool.py."""
+
+import asyncio
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from src.transcription.worker_pool import (
+    PoolClosedError,
+    PoolSaturatedError,
+    TranscriptionPool,
+)
+
+ITEMS = 2
+
+
+class TestTranscriptionPool:
+    """Tests for TranscriptionPool."""
+
+    @pytest.mark.asyncio
+    async def test_runs_function_on_a_worker_thread(self) -> None:
+        """run() returns the result computed off the event loop thread."""
+        pool = TranscriptionPool(workers=1, queue_size=0)
+        name = await pool.run(lambda: threading.current_thread().name)
+        assert name.startswith("transcription")
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_work_beyond_capacity(self) -> None:
+        """Jobs beyond workers + queue_size are refused immediately."""
+        pool = TranscriptionPool(workers=1, queue_size=1)
+        release = threading.Event()
+        running = [
+            asyncio.create_task(pool.run(release.wait)),
+            asyncio.create_task(pool.run(release.wait)),
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(release.wait)
+        assert pool.stats()["admitted"] == len(running)
+
+        release.set()
+        await asyncio.gather(*running)
+        assert pool.stats()["admitted"] == 0
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_admission_covers_several_calls(self) -> None:
+        """Work run under admit() takes one slot and is never refused."""
+        pool = TranscriptionPool(workers=1, queue_size=0)
+        async with pool.admit():
+            with pytest.raises(PoolSaturatedError):
+                await pool.run(lambda: None)
+            results = [await pool.run_admitted(lambda: ITEMS) for _ in range(ITEMS)]
+            assert pool.stats()["admitted"] == 1
+
+        assert results == [ITEMS] * ITEMS
+        assert pool.stats()["admitted"] == 0
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_work_after_shutdown(self) -> None:
+        """A shut-down pool raises PoolClosedError."""
+        pool = TranscriptionPool(workers=1, queue_size=0)
+        pool.shutdown()
+        with pytest.raises(PoolClosedError):
+            await pool.run(lambda: None)
+
+    @pytest.mark.asyncio
+    async def test_iterate_advances_iterator_off_the_loop(self) -> None:
+        """iterate() yields every item, each produced on a worker thread."""
+        pool = TranscriptionPool(workers=1, queue_size=0)
+
+        def produce() -> Iterator[str]:
+            for _ in range(ITEMS):
+                yield threading.current_thread().name
+
+        names = [name async for name in pool.iterate(produce())]
+        assert len(names) == ITEMS
+        assert all(name.startswith("transcription") for name in names)
+        assert pool.stats()["admitted"] == 0
+        pool.shutdown()